@@ -36,6 +36,178 @@ class Settings(BaseSettings):
 
     OCR_DEFAULT_MODEL: str = Field(default="qwen/qwen3.5-9b", description="Default OCR name")
 
+    SESSION_STORE_BACKEND: str = Field(
+        default="memory",
+        description="Exam session storage: memory (single worker) or postgres (shared)",
+    )
+    SESSION_MAX_ENTRIES: int = Field(
+        default=10000, description="Max exam sessions kept in memory per worker"
+    )
+    SESSION_IDLE_TTL_SECONDS: int = Field(
+        default=6 * 60 * 60,
+        description="Idle time after which a session expires (postgres: session age)",
+    )
+    SESSION_SWEEP_INTERVAL_SECONDS: int = Field(
+        default=60, description="How often expired sessions are swept"
+    )
+
+    STATS_FLUSH_MAX_PENDING: int = Field(
+        default=500, description="Buffered mistake counters that trigger a flush"
+    )
+    STATS_FLUSH_INTERVAL_SECONDS: int = Field(
+        default=5, description="Max age of buffered mistake counters before a flush"
+    )
+
+    CARDS_PAGE_SIZE: int = Field(default=100, description="Default cards page size")
+    CARDS_MAX_PAGE_SIZE: int = Field(default=1000, description="Max cards page size")
+
+    UPLOAD_CHUNK_SIZE: int = Field(
+        default=64 * 1024, description="Bytes read per chunk from uploaded card files"
+    )
+    UPLOAD_BATCH_SIZE: int = Field(
+        default=1000, description="Parsed cards inserted per batch during upload"
+    )
+
+    UPLOAD_WORKERS: int = Field(
+        default=4, description="Threads parsing and inserting uploaded card files"
+    )
+    UPLOAD_MAX_QUEUE: int = Field(
+        default=64, description="Upload tasks allowed to wait for a worker"
+    )
+
+    AI_MAX_IN_FLIGHT: int = Field(
+        default=8, description="Concurrent LLM requests per generate-answers batch"
+    )
+
+    AI_JOB_WORKERS: int = Field(
+        default=4, description="Generate-answers jobs processed at the same time"
+    )
+    AI_JOB_MAX_QUEUE: int = Field(
+        default=100, description="Generate-answers jobs allowed to wait for a worker"
+    )
+    AI_JOB_TTL_SECONDS: float = Field(
+        default=3600, description="How long finished generation jobs are kept"
+    )
+
+    AI_CACHE_ENABLED: bool = Field(
+        default=True, description="Reuse previously generated answers"
+    )
+    AI_CACHE_TTL_SECONDS: float = Field(
+        default=30 * 24 * 3600, description="Lifetime of a cached AI answer"
+    )
+    AI_CACHE_MAX_ENTRIES: int = Field(
+        default=100_000, description="Cached AI answers kept before eviction"
+    )
+    AI_CACHE_EVICT_INTERVAL_SECONDS: float = Field(
+        default=3600, description="How often the AI answer and OCR caches are evicted"
+    )
+
+    OPENROUTER_REQUESTS_PER_SECOND: float = Field(
+        default=5, description="Sustained OpenRouter requests per second per model"
+    )
+    OPENROUTER_BURST: int = Field(
+        default=5, description="OpenRouter requests allowed in a burst per model"
+    )
+    OPENROUTER_MAX_IN_FLIGHT: int = Field(
+        default=8, description="Concurrent OpenRouter requests per model"
+    )
+    OPENROUTER_MODEL_LIMITS: dict[str, dict[str, float]] = Field(
+        default_factory=dict,
+        description='Per-model overrides, e.g. {"model": {"requests_per_second": 2}}',
+    )
+    OPENROUTER_MAX_RETRIES: int = Field(
+        default=4, description="Retries of an OpenRouter call on 429/5xx"
+    )
+    OPENROUTER_BACKOFF_BASE_SECONDS: float = Field(
+        default=0.5, description="First retry delay ceiling, doubled each attempt"
+    )
+    OPENROUTER_BACKOFF_MAX_SECONDS: float = Field(
+        default=30, description="Upper bound of a retry delay"
+    )
+
+    OCR_PROVIDER: str = Field(
+        default="openrouter", description="OCR backend: openrouter or local"
+    )
+    OCR_OPENROUTER_URL: str = Field(
+        default="https://openrouter.ai/api/v1/chat/completions",
+        description="Chat completions endpoint of the openrouter OCR backend",
+    )
+    OCR_LOCAL_LATENCY_SECONDS: float = Field(
+        default=0.0, description="Simulated response time of the local OCR backend"
+    )
+    OCR_LOCAL_FIXTURES_DIR: str | None = Field(
+        default=None, description="Recorded OCR replies, <image name>.txt per image"
+    )
+    OCR_LOCAL_CARDS_PER_PAGE: int = Field(
+        default=3, description="Cards generated per image by the local OCR backend"
+    )
+    OCR_STREAM: bool = Field(
+        default=True, description="Stream OCR replies and keep cards of a cut-off reply"
+    )
+    OCR_HTTP2: bool = Field(
+        default=False,
+        description="Use HTTP/2 for OCR requests; needs the h2 package (httpx[http2])",
+    )
+    OCR_MAX_CONNECTIONS: int = Field(
+        default=20, description="Connections in the shared OCR HTTP client pool"
+    )
+    OCR_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=10, description="Idle OCR connections kept open for reuse"
+    )
+    OCR_KEEPALIVE_EXPIRY_SECONDS: float = Field(
+        default=30, description="How long an idle OCR connection is kept"
+    )
+
+    OCR_CACHE_ENABLED: bool = Field(
+        default=True, description="Reuse OCR results for identical images"
+    )
+    OCR_CACHE_TTL_SECONDS: float = Field(
+        default=30 * 24 * 3600, description="Lifetime of a cached OCR result"
+    )
+    OCR_CACHE_MAX_ENTRIES: int = Field(
+        default=10_000, description="Cached OCR results kept before eviction"
+    )
+
+    OCR_BATCH_CONCURRENCY: int = Field(
+        default=8, description="Images recognized at the same time in a batch OCR"
+    )
+
+    OCR_IMAGE_MAX_SIZE: int = Field(
+        default=1024, description="Longest side of an image sent to OCR, px"
+    )
+    OCR_IMAGE_MODE: str = Field(
+        default="rgb", description="OCR image colors: rgb, grayscale or binarize"
+    )
+    OCR_IMAGE_BINARIZE_THRESHOLD: int = Field(
+        default=160, description="Brightness above which a pixel becomes white"
+    )
+    OCR_IMAGE_QUALITY: int = Field(default=85, description="OCR image JPEG quality")
+    OCR_IMAGE_MIN_QUALITY: int = Field(
+        default=50, description="Lowest JPEG quality used to reach the size target"
+    )
+    OCR_IMAGE_TARGET_BYTES: int | None = Field(
+        default=None, description="Desired upper bound of an OCR image, bytes"
+    )
+    OCR_PREPROCESS_WORKERS: int = Field(
+        default=2, description="Processes preparing OCR images, 0 to use a thread"
+    )
+
+    NOTIFICATOR_BATCH_SIZE: int = Field(
+        default=100, description="Due notifications one notificator worker claims at once"
+    )
+    NOTIFICATOR_SEND_WORKERS: int = Field(
+        default=16, description="Push notifications sent at the same time per worker"
+    )
+    NOTIFICATOR_INTERVAL_SECONDS: float = Field(
+        default=30, description="Pause of the notificator when nothing is due"
+    )
+    NOTIFICATOR_MAX_ATTEMPTS: int = Field(
+        default=5, description="Failed deliveries after which a notification is dropped"
+    )
+    NOTIFICATOR_RETRY_DELAY_SECONDS: float = Field(
+        default=60, description="Delay before the first retry, doubled on each failure"
+    )
+
     CORS_ORIGINS: list[str] = [
         "http://localhost:5173",
         "http://127.0.0.1:5173",
@@ -0,0 +1,45 @@
+"""exam sessions table
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "exam_sessions",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column(
+            "user_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("users.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column(
+            "exam_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("exams.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("questions", postgresql.ARRAY(sa.BigInteger), nullable=False),
+        sa.Column("answers", postgresql.JSONB, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+    )
+    op.create_index("idx_exam_sessions_created_at", "exam_sessions", ["created_at"])
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS exam_sessions CASCADE")
@@ -0,0 +1,26 @@
+"""cards (exam_id, number, card_id) index
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "idx_cards_exam_id_number", "cards", ["exam_id", "number", "card_id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_cards_exam_id_number", table_name="cards")
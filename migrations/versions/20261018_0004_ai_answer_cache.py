@@ -0,0 +1,38 @@
+"""ai answer cache table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ai_answer_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("model", sa.String(255), nullable=False),
+        sa.Column("answer", sa.Text, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("last_used_at", sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        "idx_ai_answer_cache_created_at", "ai_answer_cache", ["created_at"]
+    )
+    op.create_index(
+        "idx_ai_answer_cache_last_used_at", "ai_answer_cache", ["last_used_at"]
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS ai_answer_cache CASCADE")
@@ -0,0 +1,39 @@
+"""ocr result cache table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ocr_result_cache",
+        sa.Column("key", sa.String(64), primary_key=True),
+        sa.Column("model", sa.String(255), nullable=False),
+        sa.Column("cards", postgresql.JSONB, nullable=False),
+        sa.Column("created_at", sa.DateTime, nullable=False),
+        sa.Column("last_used_at", sa.DateTime, nullable=False),
+    )
+    op.create_index(
+        "idx_ocr_result_cache_created_at", "ocr_result_cache", ["created_at"]
+    )
+    op.create_index(
+        "idx_ocr_result_cache_last_used_at", "ocr_result_cache", ["last_used_at"]
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS ocr_result_cache CASCADE")
@@ -0,0 +1,12 @@
+import pytest
+
+from tests.unit.conftest import db_engine, fake_openai, populate_db, test_db
+
+__all__ = ["db_engine", "fake_openai", "populate_db", "test_db"]
+
+
+def pytest_collection_modifyitems(items):
+    """Всё в tests/benchmarks — замеры времени, по умолчанию не запускаются."""
+    for item in items:
+        if "benchmarks" in item.path.parts:
+            item.add_marker(pytest.mark.benchmark)
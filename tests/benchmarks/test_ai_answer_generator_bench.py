@@ -0,0 +1,34 @@
+import time
+
+from tprep.domain.services.ai_answer_generator import AiAnswerGenerator
+
+CARDS = 40
+LATENCY = 0.05
+
+
+def run(generator: AiAnswerGenerator, cards: list[tuple[int, str]]) -> float:
+    started = time.perf_counter()
+    results = generator.generate_answers_batch(cards)
+    elapsed = time.perf_counter() - started
+    assert [r.card_id for r in results] == [card_id for card_id, _ in cards]
+    assert all(r.success for r in results)
+    return elapsed
+
+
+def test_concurrent_batch_vs_sequential(fake_openai):
+    fake_openai.latency = LATENCY
+    cards = [(i, f"Question {i}") for i in range(CARDS)]
+
+    sequential = run(
+        AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=1), cards
+    )
+    concurrent = run(
+        AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=8), cards
+    )
+
+    print(
+        f"\n{CARDS} cards at {LATENCY * 1000:.0f} ms each: "
+        f"sequential {sequential:.2f} s, 8 in flight {concurrent:.2f} s"
+    )
+    assert sequential >= CARDS * LATENCY
+    assert concurrent < sequential / 3
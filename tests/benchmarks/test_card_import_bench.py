@@ -0,0 +1,61 @@
+import time
+import uuid
+
+import pytest
+
+from tprep.infrastructure import Card
+from tprep.infrastructure.exam.exam_repo import ExamRepo
+
+CARDS = 5_000
+
+
+@pytest.fixture
+def exam_id(populate_db):
+    user_id = uuid.uuid4()
+    exam_id = uuid.uuid4()
+    populate_db(
+        users=[
+            {
+                "id": user_id,
+                "email": "bench@example.com",
+                "user_name": "Bench",
+                "password_hash": "hash",
+            }
+        ],
+        exams=[{"id": exam_id, "title": "Bench", "creator_id": user_id}],
+    )
+    return exam_id
+
+
+def test_import_5k_cards(test_db, exam_id):
+    cards_data = [(f"Question {i}", f"Answer {i}") for i in range(CARDS)]
+
+    started = time.perf_counter()
+    ExamRepo.create_card_by_list(exam_id, cards_data, test_db)
+    elapsed = time.perf_counter() - started
+
+    print(f"\nimported {CARDS} cards: {elapsed:.2f} s")
+    numbers = [n for (n,) in test_db.query(Card.number).filter(Card.exam_id == exam_id)]
+    assert sorted(numbers) == list(range(1, CARDS + 1))
+    # Одна вставка вместо CARDS коммитов
+    assert elapsed < 10
+
+
+def test_next_number_on_5k_card_exam(test_db, exam_id):
+    test_db.add_all(
+        Card(exam_id=exam_id, number=i, question=f"Q{i}", answer=f"A{i}")
+        for i in range(1, CARDS + 1)
+    )
+    test_db.commit()
+
+    calls = 200
+    started = time.perf_counter()
+    for _ in range(calls):
+        number = ExamRepo.count_next_number(exam_id, test_db)
+        test_db.rollback()
+    elapsed = time.perf_counter() - started
+
+    print(f"\ncount_next_number x{calls} on {CARDS} cards: {elapsed * 1000:.0f} ms")
+    assert number == CARDS + 1
+    # Раньше каждый вызов вытаскивал все карточки экзамена (O(N) строк)
+    assert elapsed < 2
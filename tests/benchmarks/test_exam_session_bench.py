@@ -0,0 +1,44 @@
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+
+from tprep.domain.exam_session import ExamSession
+
+CARDS = 10_000
+
+
+@pytest.fixture(autouse=True)
+def mock_mistake_buffer():
+    with patch("tprep.domain.exam_session.mistake_buffer") as mock:
+        yield mock
+
+
+def test_full_session_answers_10k_cards():
+    questions = list(range(1_000_000, 1_000_000 + CARDS))
+    session = ExamSession(1, 10, questions)
+
+    started = time.perf_counter()
+    for question_id in reversed(questions):
+        session.set_answer(question_id, True, None)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{CARDS} answers: {elapsed * 1000:.1f} ms")
+    assert session.is_finished
+    # Со списком и `in` это O(n^2) — порядка секунд на 10k карточек
+    assert elapsed < 0.5
+
+
+def test_session_memory_10k_cards():
+    questions = list(range(1_000_000, 1_000_000 + CARDS))
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    session = ExamSession(1, 10, questions)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"\nsession with {CARDS} cards: {(after - before) / 1024:.0f} KiB")
+    assert not hasattr(session, "__dict__")
+    assert session.questions == questions
@@ -0,0 +1,70 @@
+import io
+import time
+
+import pandas as pd
+import pytest
+
+from tprep.infrastructure.parser.file_parser import FileParser
+
+ROWS = 100_000
+
+
+def parse_with_iterrows(content: bytes, file_extension: str) -> list[tuple[str, str]]:
+    """Прежняя реализация parse_csv_xlsx — эталон для сравнения."""
+    data_io = io.BytesIO(content)
+    if file_extension == ".csv":
+        df = pd.read_csv(data_io, header=None)
+    else:
+        df = pd.read_excel(data_io, header=None)
+
+    cards_data: list[tuple[str, str]] = []
+    for _, row in df.iterrows():
+        question = str(row[0]).strip() if pd.notna(row[0]) else ""
+        answer = str(row[1]).strip() if pd.notna(row[1]) else ""
+        if question and answer:
+            cards_data.append((question, answer))
+    return cards_data
+
+
+@pytest.fixture(scope="module")
+def frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            0: [f" Question {i} " if i % 50 else None for i in range(ROWS)],
+            1: [f"Answer {i}" if i % 70 else "  " for i in range(ROWS)],
+            2: ["unused column"] * ROWS,
+        }
+    )
+
+
+@pytest.fixture(scope="module")
+def csv_fixture(frame) -> bytes:
+    return frame.to_csv(header=False, index=False).encode("utf-8")
+
+
+@pytest.fixture(scope="module")
+def xlsx_fixture(frame) -> bytes:
+    buffer = io.BytesIO()
+    frame.to_excel(buffer, header=False, index=False)
+    return buffer.getvalue()
+
+
+def timed(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - started
+
+
+@pytest.mark.parametrize("file_extension", [".csv", ".xlsx"])
+def test_parse_100k_rows(file_extension, csv_fixture, xlsx_fixture):
+    content = csv_fixture if file_extension == ".csv" else xlsx_fixture
+
+    new_cards, new_time = timed(FileParser.parse_csv_xlsx, content, file_extension)
+    old_cards, old_time = timed(parse_with_iterrows, content, file_extension)
+
+    print(
+        f"\n{file_extension} {ROWS} rows: iterrows {old_time:.2f} s, "
+        f"parse_csv_xlsx {new_time:.2f} s ({old_time / new_time:.1f}x)"
+    )
+    assert new_cards == old_cards
+    assert new_time < old_time
@@ -0,0 +1,100 @@
+import base64
+import random
+import time
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageDraw
+
+from tprep.infrastructure.image_preprocessing import (
+    PreprocessOptions,
+    preprocess_to_base64,
+)
+
+
+def legacy_image_to_base64(image_path, max_size=1024):
+    """Прежний _image_to_base64: RGB, LANCZOS до 1024px, JPEG q85."""
+    img = Image.open(str(image_path)).convert("RGB")
+    if max(img.size) > max_size:
+        ratio = max_size / max(img.size)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.resize(new_size, Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+
+
+def handwritten_page(size, seed):
+    """Фото тетрадной страницы: шум бумаги, клетка и «рукописные» штрихи."""
+    rnd = random.Random(seed)
+    noise = Image.effect_noise(size, 18).point(lambda v: 200 + v // 8)
+    page = Image.merge("RGB", (noise, noise, noise.point(lambda v: v - 12)))
+    draw = ImageDraw.Draw(page)
+    for x in range(0, size[0], 48):
+        draw.line((x, 0, x, size[1]), fill=(170, 190, 220), width=2)
+    for y in range(0, size[1], 48):
+        draw.line((0, y, size[0], y), fill=(170, 190, 220), width=2)
+    for y in range(120, size[1] - 120, 96):
+        x = 100
+        while x < size[0] - 200:
+            points = [
+                (x + i * 6, y + rnd.randint(-18, 18)) for i in range(rnd.randint(6, 14))
+            ]
+            draw.line(points, fill=(25, 35, 110), width=5)
+            x = points[-1][0] + rnd.randint(20, 50)
+    return page
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    root = tmp_path_factory.mktemp("ocr_corpus")
+    pages = []
+    for i, size in enumerate([(3024, 4032), (4032, 3024), (2448, 3264), (1600, 1200)]):
+        path = root / f"phone_{i}.jpg"
+        handwritten_page(size, i).save(path, quality=92)
+        pages.append(path)
+    small = root / "scan_small.jpg"
+    handwritten_page((900, 1200), 9).save(small, quality=85)
+    pages.append(small)
+    png = root / "screenshot.png"
+    handwritten_page((1920, 1080), 10).save(png)
+    pages.append(png)
+    return pages
+
+
+def measure(encode, corpus):
+    total_bytes = 0
+    started = time.process_time()
+    for path in corpus:
+        total_bytes += len(encode(path))
+    cpu_ms = (time.process_time() - started) * 1000
+    return total_bytes / len(corpus), cpu_ms / len(corpus)
+
+
+def test_preprocessing_bytes_and_cpu(corpus):
+    variants = {
+        "legacy rgb q85": legacy_image_to_base64,
+        "rgb + draft": lambda p: preprocess_to_base64(p, PreprocessOptions()),
+        "grayscale + draft": lambda p: preprocess_to_base64(
+            p, PreprocessOptions(mode="grayscale")
+        ),
+        "binarize + draft": lambda p: preprocess_to_base64(
+            p, PreprocessOptions(mode="binarize")
+        ),
+        "grayscale, 120 KB target": lambda p: preprocess_to_base64(
+            p, PreprocessOptions(mode="grayscale", target_bytes=120_000)
+        ),
+    }
+
+    results = {name: measure(encode, corpus) for name, encode in variants.items()}
+
+    print(f"\n{len(corpus)} images, per image (base64 payload):")
+    for name, (size, cpu_ms) in results.items():
+        print(f"  {name:<26} {size / 1024:8.1f} KB {cpu_ms:8.1f} CPU ms")
+
+    legacy_size, legacy_cpu = results["legacy rgb q85"]
+    gray_size, gray_cpu = results["grayscale + draft"]
+    assert results["rgb + draft"][1] < legacy_cpu
+    assert gray_size < legacy_size
+    assert gray_cpu < legacy_cpu
+    assert results["grayscale, 120 KB target"][0] <= gray_size
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+import pytest
+from PIL import Image
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from tprep.infrastructure import ocr
+from tprep.infrastructure.ai_cache.ocr_cache import OcrCache
+
+IMAGES = 24
+LATENCY = 0.05
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    names = []
+    for i in range(IMAGES):
+        name = f"page{i}.png"
+        Image.new("RGB", (600, 800), (i * 10 % 256, 255, 255)).save(tmp_path / name)
+        names.append(name)
+    monkeypatch.setattr(ocr, "_images_base_dir", lambda: tmp_path)
+    monkeypatch.setattr(settings, "OCR_PROVIDER", "local")
+    monkeypatch.setattr(settings, "OCR_LOCAL_LATENCY_SECONDS", LATENCY)
+    return names
+
+
+def run(names, concurrency, cache=None) -> float:
+    started = time.perf_counter()
+    pages = asyncio.run(
+        ocr.cards_from_images(names, concurrency=concurrency, model="m", cache=cache)
+    )
+    elapsed = time.perf_counter() - started
+    assert all(isinstance(page, list) and page for page in pages)
+    return elapsed
+
+
+def test_local_provider_throughput(images, db_engine, test_db):
+    cache = OcrCache(
+        ttl_seconds=3600, max_entries=1000, session_factory=sessionmaker(bind=db_engine)
+    )
+
+    sequential = run(images, concurrency=1)
+    concurrent = run(images, concurrency=8)
+    cold = run(images, concurrency=8, cache=cache)
+    warm = run(images, concurrency=8, cache=cache)
+
+    print(
+        f"\n{IMAGES} images at {LATENCY * 1000:.0f} ms each (local OCR): "
+        f"sequential {sequential:.2f} s, 8 at once {concurrent:.2f} s, "
+        f"cache cold {cold:.2f} s, warm {warm:.2f} s"
+    )
+    assert sequential >= IMAGES * LATENCY
+    assert concurrent < sequential / 3
+    assert warm < cold
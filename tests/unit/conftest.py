@@ -1,5 +1,10 @@
+import json
 import pytest
 import os
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
@@ -14,8 +19,8 @@ TEST_DATABASE_URL = os.getenv(
 
 
 @pytest.fixture
-def mock_stat_repo():
-    with patch("tprep.domain.exam_session.StatRepo.inc_mistakes") as mock:
+def mock_mistake_buffer():
+    with patch("tprep.domain.exam_session.mistake_buffer") as mock:
         yield mock
 
 
@@ -107,3 +112,170 @@ def populate_db(test_db: Session):
         test_db.commit()
 
     return _populate
+
+
+@pytest.fixture
+def editor_exam(populate_db, test_db):
+    """
+    Экзамен, создатель которого — текущий пользователь приложения.
+
+    Подменяет get_current_user_id и get_db, отдаёт (app, exam_id).
+    """
+    from tprep.app.main import app
+    from tprep.infrastructure.authorization import get_current_user_id
+    from tprep.infrastructure.database import get_db
+
+    user_id, exam_id = uuid.uuid4(), uuid.uuid4()
+    populate_db(
+        users=[
+            {
+                "id": user_id,
+                "email": "editor@example.com",
+                "user_name": "Editor",
+                "password_hash": "hash",
+            }
+        ],
+        exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+    )
+    app.dependency_overrides[get_current_user_id] = lambda: user_id
+    app.dependency_overrides[get_db] = lambda: test_db
+    yield app, exam_id
+    app.dependency_overrides.clear()
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    """Минимальный OpenAI-совместимый /chat/completions с задержкой ответа."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        question = body["messages"][-1]["content"]
+        server = self.server
+        with server.lock:
+            server.requests.append(question)
+            server.connections.add(self.client_address)
+            server.in_flight += 1
+            server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+        try:
+            time.sleep(server.latency)
+            if server.errors:
+                status, retry_after = server.errors.pop(0)
+                headers = {} if retry_after is None else {"Retry-After": retry_after}
+                self.send_json(status, {"error": {"message": "busy"}}, headers)
+                return
+            if "FAIL" in question:
+                self.send_json(400, {"error": {"message": "bad question"}})
+                return
+            if body.get("stream"):
+                self.send_stream(server.reply or f"answer: {question}")
+                return
+            self.send_json(
+                200,
+                {
+                    "id": "chatcmpl-test",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": server.reply or f"answer: {question}",
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                },
+            )
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def send_json(
+        self, status: int, payload: dict, headers: dict | None = None
+    ) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_stream(self, content: str) -> None:
+        """SSE как у OpenRouter: куски по server.chunk_size через server.chunk_delay."""
+        server = self.server
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        self.wfile.write(b": OPENROUTER PROCESSING\n\n")
+        if server.stream_garbage:
+            self.wfile.write(b'data: {"choices": [\n\n')
+        size = server.chunk_size
+        for start in range(0, len(content), size):
+            chunk = {
+                "choices": [
+                    {"index": 0, "delta": {"content": content[start : start + size]}}
+                ]
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+            time.sleep(server.chunk_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """
+    Локальный OpenAI-совместимый сервер.
+
+    server.latency — задержка каждого ответа, server.requests — присланные вопросы,
+    server.peak_in_flight — максимум одновременных запросов,
+    server.errors — очередь (status, Retry-After) для первых ответов,
+    server.reply — фиксированный текст ответа, server.connections — TCP-соединения,
+    server.chunk_size и server.chunk_delay — нарезка ответа при stream=true,
+    server.stream_garbage — битая строка data: в начале потока.
+    """
+    from config import settings
+    from tprep.domain.services import ai_answer_generator
+    from tprep.infrastructure import ocr_providers
+    from tprep.infrastructure.rate_limiter import OutboundLimiter, RateLimit
+
+    monkeypatch.setattr(settings, "OPENROUTER_API_KEY", "test-key")
+    limiter = OutboundLimiter(
+        RateLimit(requests_per_second=10_000, burst=100, max_in_flight=100),
+        backoff_base_seconds=0.01,
+    )
+    monkeypatch.setattr(ai_answer_generator, "openrouter_limiter", limiter)
+    monkeypatch.setattr(ocr_providers, "openrouter_limiter", limiter)
+    monkeypatch.setattr(settings, "OCR_PROVIDER", "openrouter")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOpenAIHandler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = []
+    server.in_flight = 0
+    server.peak_in_flight = 0
+    server.latency = 0.0
+    server.errors = []
+    server.reply = None
+    server.chunk_size = 16
+    server.chunk_delay = 0.0
+    server.stream_garbage = False
+    server.connections = set()
+    server.base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    monkeypatch.setattr(
+        settings, "OCR_OPENROUTER_URL", f"{server.base_url}/chat/completions"
+    )
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
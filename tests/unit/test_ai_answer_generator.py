@@ -0,0 +1,81 @@
+from tprep.domain.services.ai_answer_generator import (
+    AiAnswerGenerator,
+    GenerationResult,
+)
+
+
+class TestGenerateAnswersBatch:
+    def test_results_keep_input_order(self, fake_openai):
+        fake_openai.latency = 0.01
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=4)
+        cards = [(i, f"Question {i}") for i in range(12)]
+
+        results = generator.generate_answers_batch(cards)
+
+        assert [r.card_id for r in results] == list(range(12))
+        assert all(r.success for r in results)
+        assert results[3].answer == "answer: Question 3"
+
+    def test_in_flight_is_bounded(self, fake_openai):
+        fake_openai.latency = 0.05
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=3)
+
+        generator.generate_answers_batch([(i, f"Q{i}") for i in range(9)])
+
+        assert fake_openai.peak_in_flight == 3
+        assert len(fake_openai.requests) == 9
+
+    def test_failures_and_empty_questions_are_per_card(self, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=4)
+
+        results = generator.generate_answers_batch(
+            [(1, "ok"), (2, "   "), (3, "FAIL me"), (4, "fine")]
+        )
+
+        assert results[0] == GenerationResult(1, "answer: ok", True)
+        assert results[1] == GenerationResult(
+            2, None, False, "Empty question, cannot generate answer"
+        )
+        assert results[2].card_id == 3
+        assert not results[2].success
+        assert "OpenRouter API error" in results[2].error
+        assert results[3].success
+        assert "   " not in fake_openai.requests
+
+    def test_sequential_when_max_in_flight_is_one(self, fake_openai):
+        fake_openai.latency = 0.01
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=1)
+
+        results = generator.generate_answers_batch([(i, f"Q{i}") for i in range(5)])
+
+        assert fake_openai.peak_in_flight == 1
+        assert [r.card_id for r in results] == list(range(5))
+
+
+class TestDeduplication:
+    def test_duplicate_questions_call_model_once(self, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=4)
+        cards = [
+            (1, "What is HTTP?"),
+            (2, "What is TCP?"),
+            (3, "what is  http?"),
+            (4, "What is HTTP?"),
+            (5, ""),
+            (6, ""),
+        ]
+
+        results = generator.generate_answers_batch(cards)
+
+        assert sorted(fake_openai.requests) == ["What is HTTP?", "What is TCP?"]
+        assert [r.card_id for r in results] == [1, 2, 3, 4, 5, 6]
+        assert results[0].answer == results[2].answer == results[3].answer
+        assert results[1].answer == "answer: What is TCP?"
+        assert [r.success for r in results[4:]] == [False, False]
+
+    def test_failure_fans_out_to_duplicates(self, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=1)
+
+        results = generator.generate_answers_batch([(1, "FAIL"), (2, "fail")])
+
+        assert len(fake_openai.requests) == 1
+        assert [(r.card_id, r.success) for r in results] == [(1, False), (2, False)]
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from tprep.domain.services.ai_answer_generator import AiAnswerGenerator
+from tprep.infrastructure import AnswerCacheDB
+from tprep.infrastructure.ai_cache.answer_cache import AnswerCache, answer_cache_key
+
+
+@pytest.fixture
+def cache(db_engine, test_db):
+    return AnswerCache(
+        ttl_seconds=3600, max_entries=3, session_factory=sessionmaker(bind=db_engine)
+    )
+
+
+class TestAnswerCacheKey:
+    def test_normalizes_whitespace_and_case(self):
+        assert answer_cache_key("  What is  HTTP?\n", "m", "p") == answer_cache_key(
+            "what is http?", "m", "p"
+        )
+
+    def test_depends_on_model_and_prompt(self):
+        base = answer_cache_key("q", "m", "p")
+        assert answer_cache_key("q", "other", "p") != base
+        assert answer_cache_key("q", "m", "other") != base
+        assert len(base) == 64
+
+
+class TestAnswerCache:
+    def test_put_and_get_many(self, cache):
+        cache.put("a" * 64, "model", "first")
+        cache.put("b" * 64, "model", "second")
+
+        assert cache.get_many(["a" * 64, "b" * 64, "c" * 64]) == {
+            "a" * 64: "first",
+            "b" * 64: "second",
+        }
+        assert cache.get_many([]) == {}
+
+    def test_put_overwrites(self, cache):
+        cache.put("a" * 64, "model", "old")
+        cache.put("a" * 64, "model", "new")
+
+        assert cache.get_many(["a" * 64]) == {"a" * 64: "new"}
+
+    def test_expired_entry_is_miss_and_evicted(self, cache, test_db):
+        cache.put("a" * 64, "model", "stale")
+        test_db.execute(
+            update(AnswerCacheDB).values(
+                created_at=datetime.utcnow() - timedelta(hours=2)
+            )
+        )
+        test_db.commit()
+
+        assert cache.get_many(["a" * 64]) == {}
+        assert cache.evict() == 1
+
+    def test_evicts_least_recently_used_over_limit(self, cache, test_db):
+        for i, key in enumerate("abcd"):
+            cache.put(key * 64, "model", key)
+            test_db.execute(
+                update(AnswerCacheDB)
+                .where(AnswerCacheDB.key == key * 64)
+                .values(last_used_at=datetime(2026, 1, 1) + timedelta(minutes=i))
+            )
+        test_db.commit()
+        cache.get_many(["a" * 64])  # "a" становится самым свежим
+
+        assert cache.evict() == 1
+
+        keys = set(test_db.scalars(select(AnswerCacheDB.key)))
+        assert keys == {"a" * 64, "c" * 64, "d" * 64}
+
+
+class TestGeneratorWithCache:
+    def test_second_batch_skips_network(self, cache, fake_openai):
+        generator = AiAnswerGenerator(
+            base_url=fake_openai.base_url, max_in_flight=4, cache=cache
+        )
+        cards = [(1, "What is HTTP?"), (2, "What is TCP?"), (3, "  ")]
+
+        first = generator.generate_answers_batch(cards)
+        second = generator.generate_answers_batch(
+            [(4, "what is  http?"), (5, "What is TCP?"), (6, "What is UDP?")]
+        )
+
+        assert [r.cached for r in first] == [False, False, None]
+        assert [r.cached for r in second] == [True, True, False]
+        assert second[0].answer == "answer: What is HTTP?"
+        assert [r.card_id for r in second] == [4, 5, 6]
+        assert len(fake_openai.requests) == 3
+
+    def test_failed_answer_is_not_cached(self, cache, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, cache=cache)
+
+        generator.generate_answers_batch([(1, "FAIL")])
+        result = generator.generate_answers_batch([(1, "FAIL")])
+
+        assert result[0].cached is False
+        assert len(fake_openai.requests) == 2
+
+    def test_duplicates_are_one_miss(self, cache, fake_openai):
+        generator = AiAnswerGenerator(
+            base_url=fake_openai.base_url, max_in_flight=4, cache=cache
+        )
+
+        results = generator.generate_answers_batch(
+            [(1, "Same"), (2, "same"), (3, "Other"), (4, "SAME ")]
+        )
+
+        assert [r.cached for r in results] == [False] * 4
+        assert [r.deduplicated for r in results] == [False, True, False, True]
+        assert len(fake_openai.requests) == 2
@@ -1,9 +1,13 @@
 import pytest
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy.orm import sessionmaker
 
 from tprep.infrastructure import Exam, Card
 from tprep.infrastructure.exam.exam_repo import ExamRepo
 from tprep.infrastructure.exceptions.exam_not_found import ExamNotFound
+from tprep.infrastructure.exceptions.invalid_cursor import InvalidCursor
 from tprep.infrastructure.exceptions.user_not_found import UserNotFound
 from tprep.app.exam_schemas import ExamCreate
 from tprep.infrastructure.exceptions.card_not_found import CardNotFound
@@ -376,6 +380,61 @@ class TestExamRepoGetCardsByExamId:
         assert result == []
 
 
+class TestExamRepoGetCardsPage:
+    @pytest.fixture
+    def exam_with_cards(self, populate_db):
+        user_id = str(uuid.uuid4())
+        exam_id = str(uuid.uuid4())
+        # Номер 3 повторяется — курсор должен учитывать card_id
+        numbers = [1, 2, 3, 3, 4]
+        populate_db(
+            users=[
+                {
+                    "id": user_id,
+                    "email": f"user{user_id[:8]}@example.com",
+                    "user_name": "User",
+                    "password_hash": "hash",
+                }
+            ],
+            exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+            cards=[
+                {
+                    "exam_id": exam_id,
+                    "number": number,
+                    "question": f"Q{i}",
+                    "answer": f"A{i}",
+                }
+                for i, number in enumerate(numbers)
+            ],
+        )
+        return exam_id
+
+    def test_pages_cover_all_cards_in_order(self, test_db, exam_with_cards):
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            cards, cursor = ExamRepo.get_cards_page(exam_with_cards, 2, cursor, test_db)
+            pages += 1
+            seen.extend(cards)
+            if cursor is None:
+                break
+
+        assert pages == 3
+        assert [c.number for c in seen] == [1, 2, 3, 3, 4]
+        assert len({c.card_id for c in seen}) == 5
+
+    def test_last_full_page_has_no_cursor(self, test_db, exam_with_cards):
+        cards, cursor = ExamRepo.get_cards_page(exam_with_cards, 5, None, test_db)
+
+        assert len(cards) == 5
+        assert cursor is None
+
+    def test_invalid_cursor_raises(self, test_db, exam_with_cards):
+        with pytest.raises(InvalidCursor):
+            ExamRepo.get_cards_page(exam_with_cards, 2, "garbage", test_db)
+
+
 class TestExamRepoGetCard:
     def test_get_card_success(self, test_db, populate_db):
         user_id = str(uuid.uuid4())
@@ -461,6 +520,100 @@ class TestExamRepoCreateCard:
         assert card.number == 3
         assert str(card.exam_id) == exam_id
 
+    def test_create_card_after_delete_does_not_reuse_number(self, test_db, populate_db):
+        user_id = str(uuid.uuid4())
+        exam_id = str(uuid.uuid4())
+
+        populate_db(
+            users=[
+                {
+                    "id": user_id,
+                    "email": f"user{user_id[:8]}@example.com",
+                    "user_name": "User",
+                    "password_hash": "hash",
+                }
+            ],
+            exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+            cards=[
+                {"exam_id": exam_id, "number": 1, "question": "Q1", "answer": "A1"},
+                {"exam_id": exam_id, "number": 2, "question": "Q2", "answer": "A2"},
+            ],
+        )
+        first = test_db.query(Card).filter(Card.number == 1).first()
+        ExamRepo.delete_card(first.exam_id, first.card_id, test_db)
+
+        card = ExamRepo.create_card(exam_id, test_db)
+
+        assert card.number == 3
+
+
+class TestExamRepoCreateCardByList:
+    def test_numbers_continue_after_existing_cards(self, test_db, populate_db):
+        user_id = str(uuid.uuid4())
+        exam_id = str(uuid.uuid4())
+
+        populate_db(
+            users=[
+                {
+                    "id": user_id,
+                    "email": f"user{user_id[:8]}@example.com",
+                    "user_name": "User",
+                    "password_hash": "hash",
+                }
+            ],
+            exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+            cards=[
+                {"exam_id": exam_id, "number": 1, "question": "Q1", "answer": "A1"},
+            ],
+        )
+
+        cards = ExamRepo.create_card_by_list(
+            exam_id, [("Q2", "A2"), ("Q3", "A3"), ("Q4", "A4")], test_db
+        )
+
+        assert [c.number for c in cards] == [2, 3, 4]
+        assert [c.question for c in cards] == ["Q2", "Q3", "Q4"]
+        assert all(c.card_id is not None for c in cards)
+        assert test_db.query(Card).filter(Card.exam_id == exam_id).count() == 4
+
+    def test_empty_list_inserts_nothing(self, test_db):
+        assert ExamRepo.create_card_by_list(uuid.uuid4(), [], test_db) == []
+
+    def test_concurrent_imports_get_unique_numbers(
+        self, db_engine, test_db, populate_db
+    ):
+        user_id = uuid.uuid4()
+        exam_id = uuid.uuid4()
+        populate_db(
+            users=[
+                {
+                    "id": user_id,
+                    "email": f"user{str(user_id)[:8]}@example.com",
+                    "user_name": "User",
+                    "password_hash": "hash",
+                }
+            ],
+            exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+        )
+        make_session = sessionmaker(bind=db_engine)
+
+        def import_batch(batch: int) -> None:
+            with make_session() as db:
+                ExamRepo.create_card_by_list(
+                    exam_id, [(f"Q{batch}.{i}", "A") for i in range(5)], db
+                )
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(import_batch, b) for b in range(16)]:
+                future.result()
+
+        test_db.expire_all()
+        numbers = [
+            number
+            for (number,) in test_db.query(Card.number).filter(Card.exam_id == exam_id)
+        ]
+        assert sorted(numbers) == list(range(1, 16 * 5 + 1))
+
 
 class TestExamRepoUpdateCard:
     def test_update_card_updates_fields(self, test_db, populate_db):
@@ -508,6 +661,57 @@ class TestExamRepoUpdateCard:
             )
 
 
+class TestExamRepoUpdateCardAnswers:
+    def test_updates_only_given_cards_of_exam(self, test_db, populate_db):
+        user_id = str(uuid.uuid4())
+        exam_id = str(uuid.uuid4())
+        other_exam_id = str(uuid.uuid4())
+
+        populate_db(
+            users=[
+                {
+                    "id": user_id,
+                    "email": f"user{user_id[:8]}@example.com",
+                    "user_name": "User",
+                    "password_hash": "hash",
+                }
+            ],
+            exams=[
+                {"id": exam_id, "title": "Exam", "creator_id": user_id},
+                {"id": other_exam_id, "title": "Other", "creator_id": user_id},
+            ],
+            cards=[
+                {"exam_id": exam_id, "number": 1, "question": "Q1", "answer": ""},
+                {"exam_id": exam_id, "number": 2, "question": "Q2", "answer": ""},
+                {"exam_id": exam_id, "number": 3, "question": "Q3", "answer": "A3"},
+                {"exam_id": other_exam_id, "number": 1, "question": "Q", "answer": ""},
+            ],
+        )
+        cards = {(c.exam_id, c.number): c.card_id for c in test_db.query(Card).all()}
+        foreign_card = cards[(uuid.UUID(other_exam_id), 1)]
+
+        updated = ExamRepo.update_card_answers(
+            exam_id,
+            {
+                cards[(uuid.UUID(exam_id), 1)]: "New 1",
+                cards[(uuid.UUID(exam_id), 2)]: "New 2",
+                foreign_card: "Hijack",
+            },
+            test_db,
+        )
+
+        assert updated == 2
+        test_db.expire_all()
+        answers = {(c.exam_id, c.number): c.answer for c in test_db.query(Card).all()}
+        assert answers[(uuid.UUID(exam_id), 1)] == "New 1"
+        assert answers[(uuid.UUID(exam_id), 2)] == "New 2"
+        assert answers[(uuid.UUID(exam_id), 3)] == "A3"
+        assert answers[(uuid.UUID(other_exam_id), 1)] == ""
+
+    def test_empty_answers_update_nothing(self, test_db):
+        assert ExamRepo.update_card_answers(uuid.uuid4(), {}, test_db) == 0
+
+
 class TestExamRepoDeleteCard:
     def test_delete_card_removes_card(self, test_db, populate_db):
         user_id = str(uuid.uuid4())
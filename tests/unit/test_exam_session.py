@@ -1,7 +1,11 @@
+from unittest.mock import patch
+
 import pytest
 
 from tprep.domain.exam_session import ExamSession
 from tprep.infrastructure.exceptions.question_not_in_session import QuestionNotInSession
+from tprep.infrastructure.statistic.mistake_buffer import MistakeBuffer
+from tprep.infrastructure.statistic.stat_repo import StatRepo
 
 
 class TestExamSessionInitialization:
@@ -23,6 +27,14 @@ class TestExamSessionInitialization:
         assert session.user_id == 1
         assert session.exam_id == 10
 
+    def test_exam_session_has_no_instance_dict(self):
+        session = ExamSession(1, 10, [3, 1, 2])
+
+        assert not hasattr(session, "__dict__")
+        assert session.questions == [3, 1, 2]
+        assert session.has_question(1)
+        assert not session.has_question(4)
+
     def test_exam_session_unique_ids(self):
         session1 = ExamSession(1, 10, [1, 2, 3])
         session2 = ExamSession(1, 10, [1, 2, 3])
@@ -36,20 +48,20 @@ class TestExamSessionInitialization:
 
 
 class TestExamSessionSetAnswer:
-    def test_set_answer_correct_answer(self, mock_stat_repo, test_db):
+    def test_set_answer_correct_answer(self, mock_mistake_buffer, test_db):
         session = ExamSession(1, 10, [1, 2, 3])
 
         session.set_answer(1, True, test_db)
 
-        mock_stat_repo.assert_not_called()
+        mock_mistake_buffer.add.assert_not_called()
         assert session.answers[1] is True
 
-    def test_set_answer_incorrect_answer(self, mock_stat_repo, test_db):
+    def test_set_answer_incorrect_answer(self, mock_mistake_buffer, test_db):
         session = ExamSession(1, 10, [1, 2, 3])
 
         session.set_answer(1, False, test_db)
 
-        mock_stat_repo.assert_called_once_with(1, 1, test_db)
+        mock_mistake_buffer.add.assert_called_once_with(1, 1, 10, test_db)
         assert session.answers[1] is False
 
     def test_set_answer_question_not_in_session(self, test_db):
@@ -60,7 +72,7 @@ class TestExamSessionSetAnswer:
 
         assert "Question 999 is not part of this session" in str(exc_info.value)
 
-    def test_set_answer_multiple_questions(self, mock_stat_repo, test_db):
+    def test_set_answer_multiple_questions(self, mock_mistake_buffer, test_db):
         session = ExamSession(1, 10, [1, 2, 3, 4])
 
         session.set_answer(1, True, test_db)
@@ -69,7 +81,7 @@ class TestExamSessionSetAnswer:
         session.set_answer(4, False, test_db)
 
         # Two incorrect answers
-        assert mock_stat_repo.call_count == 2
+        assert mock_mistake_buffer.add.call_count == 2
 
         # Check all answers were recorded
         assert session.answers[1] is True
@@ -77,7 +89,7 @@ class TestExamSessionSetAnswer:
         assert session.answers[3] is True
         assert session.answers[4] is False
 
-    def test_set_answer_can_overwrite_answer(self, mock_stat_repo, test_db):
+    def test_set_answer_can_overwrite_answer(self, mock_mistake_buffer, test_db):
         session = ExamSession(1, 10, [1, 2, 3])
 
         # First answer: correct
@@ -88,10 +100,10 @@ class TestExamSessionSetAnswer:
         session.set_answer(1, False, test_db)
         assert session.answers[1] is False
 
-        # inc_mistakes should be called for the second (incorrect) answer
-        mock_stat_repo.assert_called_once_with(1, 1, test_db)
+        # A mistake should be buffered for the second (incorrect) answer
+        mock_mistake_buffer.add.assert_called_once_with(1, 1, 10, test_db)
 
-    def test_set_answer_all_questions_in_session(self, mock_stat_repo, test_db):
+    def test_set_answer_all_questions_in_session(self, mock_mistake_buffer, test_db):
         session = ExamSession(1, 10, [5, 10, 15])
 
         # These should work
@@ -107,7 +119,7 @@ class TestExamSessionSetAnswer:
             session.set_answer(20, True, test_db)
 
     def test_set_answer_increments_mistakes_with_correct_parameters(
-        self, mock_stat_repo, test_db
+        self, mock_mistake_buffer, test_db
     ):
         user_id = 42
         exam_id = 100
@@ -116,8 +128,10 @@ class TestExamSessionSetAnswer:
 
         session.set_answer(question_id, False, test_db)
 
-        # Verify inc_mistakes was called with correct user_id and question_id
-        mock_stat_repo.assert_called_once_with(user_id, question_id, test_db)
+        # Verify the mistake was buffered with the session's user and exam
+        mock_mistake_buffer.add.assert_called_once_with(
+            user_id, question_id, exam_id, test_db
+        )
 
     def test_set_answer_empty_session_raises_exception(self, test_db):
         session = ExamSession(1, 10, [])
@@ -125,14 +139,41 @@ class TestExamSessionSetAnswer:
         with pytest.raises(QuestionNotInSession):
             session.set_answer(1, True, test_db)
 
+    def test_set_answer_flushes_mistakes_when_session_finished(
+        self, mock_mistake_buffer, test_db
+    ):
+        session = ExamSession(1, 10, [1, 2])
+
+        session.set_answer(1, False, test_db)
+        mock_mistake_buffer.try_flush.assert_not_called()
+
+        session.set_answer(2, True, test_db)
+        mock_mistake_buffer.try_flush.assert_called_once_with(test_db)
+
+    def test_set_answer_survives_failed_statistics_flush(self, test_db):
+        buffer = MistakeBuffer(max_pending=1, flush_interval_seconds=3600)
+        session = ExamSession(1, 10, [1, 2])
+
+        with (
+            patch("tprep.domain.exam_session.mistake_buffer", buffer),
+            patch.object(StatRepo, "add_mistakes", side_effect=RuntimeError),
+        ):
+            session.set_answer(1, False, test_db)
+            session.set_answer(2, True, test_db)
+
+        assert session.answers == {1: False, 2: True}
+        assert len(buffer) == 1
+
 
 class TestExamSessionAnswersTracking:
-    def test_answers_dict_initially_empty(self, mock_stat_repo):
+    def test_answers_dict_initially_empty(self, mock_mistake_buffer):
         session = ExamSession(1, 10, [1, 2, 3])
 
         assert len(session.answers) == 0
 
-    def test_answers_dict_populated_after_set_answer(self, mock_stat_repo, test_db):
+    def test_answers_dict_populated_after_set_answer(
+        self, mock_mistake_buffer, test_db
+    ):
         session = ExamSession(1, 10, [1, 2, 3])
 
         session.set_answer(1, True, test_db)
@@ -142,7 +183,7 @@ class TestExamSessionAnswersTracking:
         assert 1 in session.answers
         assert 2 in session.answers
 
-    def test_can_retrieve_specific_answer(self, mock_stat_repo, test_db):
+    def test_can_retrieve_specific_answer(self, mock_mistake_buffer, test_db):
         session = ExamSession(1, 10, [1, 2, 3])
 
         session.set_answer(1, True, test_db)
@@ -150,3 +191,27 @@ class TestExamSessionAnswersTracking:
 
         assert session.answers[1] is True
         assert session.answers[2] is False
+
+
+class TestExamSessionSetAnswers:
+    def test_set_answers_records_all_and_writes_mistakes_once(self, test_db):
+        session = ExamSession(1, 10, [1, 2, 3])
+
+        with patch("tprep.domain.exam_session.StatRepo.add_mistakes") as add_mistakes:
+            session.set_answers(
+                [(1, True), (2, False), (3, False), (2, False)], test_db
+            )
+
+        assert session.answers == {1: True, 2: False, 3: False}
+        add_mistakes.assert_called_once_with({(1, 2, 10): 2, (1, 3, 10): 1}, test_db)
+
+    def test_set_answers_rejects_whole_batch_with_unknown_question(self, test_db):
+        session = ExamSession(1, 10, [1, 2, 3])
+
+        with patch("tprep.domain.exam_session.StatRepo.add_mistakes") as add_mistakes:
+            with pytest.raises(QuestionNotInSession) as exc_info:
+                session.set_answers([(1, False), (7, True), (9, False)], test_db)
+
+        assert "[7, 9]" in str(exc_info.value)
+        assert session.answers == {}
+        add_mistakes.assert_not_called()
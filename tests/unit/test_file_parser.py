@@ -0,0 +1,217 @@
+import io
+import threading
+
+import pandas as pd
+import pytest
+from fastapi import UploadFile
+from httpx import AsyncClient
+
+from config import settings
+from tprep.infrastructure import Card
+from tprep.infrastructure.exceptions.file_decode import FileDecode
+from tprep.infrastructure.exceptions.file_parsing import FileParsing
+from tprep.infrastructure.parser.file_parser import FileParser
+
+
+def upload(content: bytes, filename: str) -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+async def collect(file: UploadFile, chunk_size: int) -> list[tuple[str, str]]:
+    return [card async for card in FileParser.iter_cards(file, chunk_size)]
+
+
+class TestFileParserIterCards:
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64 * 1024])
+    async def test_txt_matches_parse_txt(self, chunk_size):
+        content = (
+            "Вопрос 1 | Ответ 1\r\n"
+            "no separator\n"
+            "\n"
+            "  Q2|A2 | with pipe  \r"
+            "Q3 | \n"
+            "Последний | без перевода строки"
+        ).encode("utf-8")
+
+        cards = await collect(upload(content, "cards.txt"), chunk_size)
+
+        assert cards == FileParser.parse_txt(content)
+        assert cards[-1] == ("Последний", "без перевода строки")
+
+    async def test_csv_with_quoted_multiline_field(self):
+        content = (
+            'q1,a1\n"multi\nline q","a, with comma"\n,empty question\n"say ""hi""",a4\n'
+        ).encode("utf-8")
+
+        cards = await collect(upload(content, "cards.csv"), 5)
+
+        assert cards == [
+            ("q1", "a1"),
+            ("multi\nline q", "a, with comma"),
+            ('say "hi"', "a4"),
+        ]
+
+    async def test_csv_quote_inside_unquoted_field_matches_pandas(self):
+        content = 'Monitor 27" size,large\nq2,a2\n"q3",a3\n'.encode("utf-8")
+
+        cards = await collect(upload(content, "cards.csv"), 4)
+
+        frame = pd.read_csv(
+            io.BytesIO(content), header=None, dtype=str, keep_default_na=False
+        )
+        assert cards == parse_row_by_row(frame)
+        assert cards[0] == ('Monitor 27" size', "large")
+
+    async def test_csv_unterminated_quote_raises(self):
+        with pytest.raises(FileParsing):
+            await collect(upload(b'q1,"a1\n', "cards.csv"), 4)
+
+    async def test_invalid_utf8_raises(self):
+        with pytest.raises(FileDecode):
+            await collect(upload(b"q | \xff\xfe", "cards.txt"), 4)
+
+    async def test_batches(self):
+        content = "".join(f"q{i} | a{i}\n" for i in range(5)).encode()
+
+        batches = [
+            batch
+            async for batch in FileParser.iter_card_batches(
+                upload(content, "cards.md"), batch_size=2, chunk_size=8
+            )
+        ]
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert batches[-1] == [("q4", "a4")]
+
+    async def test_csv_parsed_off_event_loop(self, monkeypatch):
+        threads = set()
+        card_from_row = FileParser.card_from_row
+
+        def recording_card_from_row(row):
+            threads.add(threading.get_ident())
+            return card_from_row(row)
+
+        monkeypatch.setattr(FileParser, "card_from_row", recording_card_from_row)
+        content = "".join(f"q{i},a{i}\n" for i in range(5)).encode()
+
+        batches = [
+            batch
+            async for batch in FileParser.iter_card_batches(
+                upload(content, "cards.csv"), batch_size=2
+            )
+        ]
+
+        assert [len(b) for b in batches] == [2, 2, 1]
+        assert threads and threading.get_ident() not in threads
+
+
+def parse_row_by_row(frame: pd.DataFrame) -> list[tuple[str, str]]:
+    """Прежний построчный разбор через iterrows — эталон для векторного."""
+    cards = []
+    for _, row in frame.iterrows():
+        question = str(row[0]).strip() if pd.notna(row[0]) else ""
+        answer = str(row[1]).strip() if pd.notna(row[1]) else ""
+        if question and answer:
+            cards.append((question, answer))
+    return cards
+
+
+class TestFileParserParseCsvXlsx:
+    @pytest.mark.parametrize("file_extension", [".csv", ".xlsx"])
+    def test_matches_row_by_row_parsing(self, file_extension):
+        frame = pd.DataFrame(
+            {
+                0: [f" Question {i} " if i % 5 else None for i in range(40)],
+                1: [f"Answer {i}" if i % 7 else "  " for i in range(40)],
+                2: ["unused"] * 40,
+            }
+        )
+        buffer = io.BytesIO()
+        if file_extension == ".csv":
+            frame.to_csv(buffer, header=False, index=False)
+            reference = pd.read_csv(io.BytesIO(buffer.getvalue()), header=None)
+        else:
+            frame.to_excel(buffer, header=False, index=False)
+            reference = pd.read_excel(io.BytesIO(buffer.getvalue()), header=None)
+
+        assert FileParser.parse_csv_xlsx(
+            buffer.getvalue(), file_extension
+        ) == parse_row_by_row(reference)
+
+    def test_csv_reads_first_two_columns(self):
+        content = b"q1, a1 ,extra\nq2,,x\n,a3,y\n 4 ,5,z\n  ,  ,w\n"
+
+        assert FileParser.parse_csv_xlsx(content, ".csv") == [
+            ("q1", "a1"),
+            ("4", "5"),
+        ]
+
+    def test_csv_single_column_returns_empty(self):
+        assert FileParser.parse_csv_xlsx(b"q1\nq2\n", ".csv") == []
+
+    def test_empty_csv_has_no_cards(self):
+        assert FileParser.parse_csv_xlsx(b"", ".csv") == []
+
+    async def test_csv_keeps_na_like_text_as_streaming(self):
+        content = b"NA,1\nq,null\n"
+
+        cards = await collect(upload(content, "cards.csv"), 4)
+
+        assert cards == [("NA", "1"), ("q", "null")]
+        assert FileParser.parse_content(content, ".csv") == cards
+
+    def test_xlsx_keeps_na_like_text(self):
+        buffer = io.BytesIO()
+        pd.DataFrame([["NA", "1"], ["q", "null"]]).to_excel(
+            buffer, header=False, index=False
+        )
+
+        assert FileParser.parse_csv_xlsx(buffer.getvalue(), ".xlsx") == [
+            ("NA", "1"),
+            ("q", "null"),
+        ]
+
+    def test_xlsx_reads_first_two_columns(self):
+        buffer = io.BytesIO()
+        pd.DataFrame(
+            [["q1", "a1", "x"], [None, "a2", "y"], ["q3", 3, "z"], [" q4 ", " ", "w"]]
+        ).to_excel(buffer, header=False, index=False)
+
+        assert FileParser.parse_csv_xlsx(buffer.getvalue(), ".xlsx") == [
+            ("q1", "a1"),
+            ("q3", "3"),
+        ]
+
+
+class TestUploadRoute:
+    @pytest.fixture(autouse=True)
+    def small_batches(self, monkeypatch):
+        monkeypatch.setattr(settings, "UPLOAD_BATCH_SIZE", 2)
+        monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 16)
+
+    async def post(self, app, exam_id, content):
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            return await ac.post(
+                f"/api/exams/{exam_id}/cards/upload",
+                files={"file": ("cards.txt", content, "text/plain")},
+            )
+
+    async def test_streams_all_batches(self, editor_exam, test_db):
+        app, exam_id = editor_exam
+        content = "".join(f"q{i} | a{i}\n" for i in range(5)).encode()
+
+        response = await self.post(app, exam_id, content)
+
+        assert response.status_code == 200
+        assert [c["number"] for c in response.json()] == [1, 2, 3, 4, 5]
+        assert test_db.query(Card).filter(Card.exam_id == exam_id).count() == 5
+
+    async def test_error_midway_imports_nothing(self, editor_exam, test_db):
+        app, exam_id = editor_exam
+        content = "".join(f"q{i} | a{i}\n" for i in range(10)).encode() + b"q | \xff\n"
+
+        response = await self.post(app, exam_id, content)
+
+        assert response.status_code == 400
+        test_db.expire_all()
+        assert test_db.query(Card).filter(Card.exam_id == exam_id).count() == 0
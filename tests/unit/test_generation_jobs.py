@@ -0,0 +1,359 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from tprep.domain.services.ai_answer_generator import AiAnswerGenerator
+from tprep.domain.services.generation_jobs import (
+    GenerationJobQueue,
+    JobCard,
+    JobStatus,
+)
+from tprep.infrastructure import Card
+from tprep.infrastructure.ai_cache.answer_cache import AnswerCache
+from tprep.infrastructure.exceptions.generation_job_not_found import (
+    GenerationJobNotFound,
+)
+from tprep.infrastructure.exceptions.worker_pool_busy import WorkerPoolBusy
+from tprep.infrastructure.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool("test-jobs", max_workers=2, max_queue=1)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture
+def queue(pool):
+    return GenerationJobQueue(pool, ttl_seconds=60)
+
+
+def wait_finished(job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not job.is_finished:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+
+
+def make_cards(n):
+    return [JobCard(card_id=i, number=i + 1, question=f"Q{i}") for i in range(n)]
+
+
+class TestGenerationJobQueue:
+    def test_submit_returns_immediately_and_completes(self, queue, fake_openai):
+        fake_openai.latency = 0.05
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=2)
+        exam_id, user_id = uuid.uuid4(), uuid.uuid4()
+
+        started = time.perf_counter()
+        job = queue.submit(exam_id, user_id, make_cards(6), generator)
+        assert time.perf_counter() - started < 0.05
+        assert job.total == 6
+
+        wait_finished(job)
+
+        assert job.status == JobStatus.DONE
+        assert job.done == 6
+        assert job.successful == 6
+        assert job.failed == 0
+        assert [card.card_id for card, _ in job.ordered_results()] == list(range(6))
+        assert queue.get(job.id, exam_id, user_id) is job
+
+    def test_partial_results_are_visible(self, queue, fake_openai):
+        fake_openai.latency = 0.05
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=1)
+
+        job = queue.submit(uuid.uuid4(), uuid.uuid4(), make_cards(10), generator)
+        deadline = time.monotonic() + 5
+        while job.done == 0:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+        assert 0 < job.done < job.total
+        assert job.status == JobStatus.RUNNING
+        wait_finished(job)
+
+    def test_failed_cards_are_counted(self, queue, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=2)
+        cards = [JobCard(1, 1, "ok"), JobCard(2, 2, "FAIL"), JobCard(3, 3, " ")]
+
+        job = queue.submit(uuid.uuid4(), uuid.uuid4(), cards, generator)
+        wait_finished(job)
+
+        assert job.status == JobStatus.DONE
+        assert job.successful == 1
+        assert job.failed == 2
+
+    def test_dedup_ratio(self, queue, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=2)
+        cards = [
+            JobCard(1, 1, "Same question"),
+            JobCard(2, 2, "same  QUESTION"),
+            JobCard(3, 3, "Same question"),
+            JobCard(4, 4, "Other"),
+        ]
+
+        job = queue.submit(uuid.uuid4(), uuid.uuid4(), cards, generator)
+        wait_finished(job)
+
+        assert job.unique_questions == 2
+        assert job.dedup_ratio == 0.5
+        assert job.successful == 4
+        assert len(fake_openai.requests) == 2
+
+    def test_cache_misses_count_unique_questions(
+        self, queue, db_engine, test_db, fake_openai
+    ):
+        cache = AnswerCache(
+            ttl_seconds=3600,
+            max_entries=100,
+            session_factory=sessionmaker(bind=db_engine),
+        )
+        generator = AiAnswerGenerator(
+            base_url=fake_openai.base_url, max_in_flight=2, cache=cache
+        )
+        cards = [JobCard(i, i + 1, "Same question") for i in range(10)]
+
+        job = queue.submit(uuid.uuid4(), uuid.uuid4(), cards, generator)
+        wait_finished(job)
+
+        assert len(fake_openai.requests) == 1
+        assert job.cache_misses == 1
+        assert job.cache_hits == 0
+        assert job.dedup_ratio == 0.9
+
+    def test_apply_writes_successful_answers(
+        self, pool, db_engine, test_db, populate_db, fake_openai
+    ):
+        user_id, exam_id = uuid.uuid4(), uuid.uuid4()
+        populate_db(
+            users=[
+                {
+                    "id": user_id,
+                    "email": "jobs@example.com",
+                    "user_name": "Jobs",
+                    "password_hash": "hash",
+                }
+            ],
+            exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+            cards=[
+                {"exam_id": exam_id, "number": 1, "question": "Q1", "answer": ""},
+                {"exam_id": exam_id, "number": 2, "question": "FAIL", "answer": "old"},
+            ],
+        )
+        cards = [
+            JobCard(c.card_id, c.number, c.question)
+            for c in test_db.query(Card).order_by(Card.number)
+        ]
+        queue = GenerationJobQueue(
+            pool, ttl_seconds=60, session_factory=sessionmaker(bind=db_engine)
+        )
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url)
+
+        job = queue.submit(exam_id, user_id, cards, generator, apply=True)
+        wait_finished(job)
+
+        assert job.status == JobStatus.DONE
+        assert job.applied == 1
+        test_db.expire_all()
+        answers = [c.answer for c in test_db.query(Card).order_by(Card.number)]
+        assert answers == ["answer: Q1", "old"]
+
+    def test_foreign_job_is_not_found(self, queue, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url)
+        exam_id, user_id = uuid.uuid4(), uuid.uuid4()
+        job = queue.submit(exam_id, user_id, make_cards(1), generator)
+        wait_finished(job)
+
+        with pytest.raises(GenerationJobNotFound):
+            queue.get(job.id, exam_id, uuid.uuid4())
+        with pytest.raises(GenerationJobNotFound):
+            queue.get(job.id, uuid.uuid4(), user_id)
+        with pytest.raises(GenerationJobNotFound):
+            queue.get("missing", exam_id, user_id)
+
+    def test_full_pool_rejects_job(self, queue, fake_openai):
+        fake_openai.latency = 0.2
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url)
+        exam_id, user_id = uuid.uuid4(), uuid.uuid4()
+        jobs = [
+            queue.submit(exam_id, user_id, make_cards(1), generator) for _ in range(3)
+        ]
+
+        with pytest.raises(WorkerPoolBusy):
+            queue.submit(exam_id, user_id, make_cards(1), generator)
+        assert len(queue) == 3
+        for job in jobs:
+            wait_finished(job)
+
+    def test_finished_jobs_are_pruned_after_ttl(self, queue, fake_openai):
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url)
+        job = queue.submit(uuid.uuid4(), uuid.uuid4(), make_cards(1), generator)
+        wait_finished(job)
+
+        job.finished_at = datetime.utcnow() - timedelta(seconds=30)
+        assert queue.prune() == 0
+        job.finished_at = datetime.utcnow() - timedelta(seconds=61)
+        assert queue.prune() == 1
+
+        assert len(queue) == 0
+
+
+async def poll_job(ac, url, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        body = (await ac.get(url)).json()
+        if body["status"] in ("done", "failed"):
+            return body
+        assert time.monotonic() < deadline, "job did not finish"
+        await asyncio.sleep(0.01)
+
+
+class TestGenerationJobRoutes:
+    @pytest.fixture
+    def exam_cards(self, editor_exam, populate_db, test_db, fake_openai, monkeypatch):
+        app, exam_id = editor_exam
+        populate_db(
+            cards=[
+                {"exam_id": exam_id, "number": i, "question": f"Q{i}", "answer": ""}
+                for i in (1, 2, 3)
+            ]
+        )
+        monkeypatch.setattr(AiAnswerGenerator, "BASE_URL", fake_openai.base_url)
+        monkeypatch.setattr(settings, "AI_CACHE_ENABLED", False)
+        card_ids = [c.card_id for c in test_db.query(Card).order_by(Card.number)]
+        return app, exam_id, card_ids
+
+    @pytest.fixture
+    def client_user(self):
+        from tprep.app.main import app
+        from tprep.infrastructure.authorization import get_current_user_id
+
+        user_id = uuid.uuid4()
+        app.dependency_overrides[get_current_user_id] = lambda: user_id
+        yield app, user_id
+        app.dependency_overrides.clear()
+
+    async def test_poll_and_stream_job(self, client_user, fake_openai, monkeypatch):
+        from httpx import AsyncClient
+
+        from tprep.app.api.routes import cards as cards_routes
+        from tprep.domain.services.generation_jobs import generation_jobs
+
+        monkeypatch.setattr(cards_routes, "JOB_EVENTS_POLL_SECONDS", 0.01)
+        app, user_id = client_user
+        exam_id = uuid.uuid4()
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, max_in_flight=2)
+        job = generation_jobs.submit(exam_id, user_id, make_cards(3), generator)
+        url = f"/api/exams/{exam_id}/cards/generate-answers/{job.id}"
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            stream = await ac.get(f"{url}/events")
+            polled = await ac.get(url)
+            missing = await ac.get(f"/api/exams/{exam_id}/cards/generate-answers/x")
+
+        assert stream.headers["content-type"].startswith("text/event-stream")
+        events = [
+            line.removeprefix("event: ")
+            for line in stream.text.splitlines()
+            if line.startswith("event: ")
+        ]
+        assert events == ["card", "card", "card", "done"]
+
+        body = polled.json()
+        assert body["status"] == "done"
+        assert body["total"] == body["done"] == body["successful"] == 3
+        assert [c["card_id"] for c in body["cards"]] == [0, 1, 2]
+        assert missing.status_code == 404
+
+    async def test_post_starts_job_and_poll_returns_answers(self, exam_cards):
+        app, exam_id, card_ids = exam_cards
+        url = f"/api/exams/{exam_id}/cards/generate-answers"
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            started = await ac.post(url)
+            body = await poll_job(ac, f"{url}/{started.json()['job_id']}")
+
+        assert started.status_code == 202
+        assert started.json()["total"] == 3
+        assert body["status"] == "done"
+        assert body["successful"] == 3
+        assert [c["card_id"] for c in body["cards"]] == card_ids
+        assert [c["answer"] for c in body["cards"]] == [
+            "answer: Q1",
+            "answer: Q2",
+            "answer: Q3",
+        ]
+
+    async def test_post_only_requested_cards(self, exam_cards):
+        app, exam_id, card_ids = exam_cards
+        url = f"/api/exams/{exam_id}/cards/generate-answers"
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            started = await ac.post(url, json={"card_ids": [card_ids[1]]})
+            body = await poll_job(ac, f"{url}/{started.json()['job_id']}")
+            missing = await ac.post(url, json={"card_ids": [card_ids[0], -1]})
+
+        assert started.status_code == 202
+        assert [c["card_id"] for c in body["cards"]] == [card_ids[1]]
+        assert missing.status_code == 404
+        assert missing.json()["error"] == "CardNotFound"
+
+    async def test_exam_without_cards(self, editor_exam, fake_openai):
+        app, exam_id = editor_exam
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post(f"/api/exams/{exam_id}/cards/generate-answers")
+
+        assert response.status_code == 422
+        assert response.json()["error"] == "ExamHasNoCards"
+
+    async def test_only_creator_can_generate(self, exam_cards):
+        from tprep.infrastructure.authorization import get_current_user_id
+
+        app, exam_id, _ = exam_cards
+        app.dependency_overrides[get_current_user_id] = lambda: uuid.uuid4()
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post(f"/api/exams/{exam_id}/cards/generate-answers")
+
+        assert response.status_code == 403
+
+    async def test_apply_flag_writes_answers_in_one_update(
+        self, exam_cards, db_engine, test_db, monkeypatch
+    ):
+        from tprep.domain.services.generation_jobs import generation_jobs
+
+        app, exam_id, _ = exam_cards
+        monkeypatch.setattr(
+            generation_jobs, "_session_factory", sessionmaker(bind=db_engine)
+        )
+        updates = []
+
+        def record_update(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("UPDATE CARDS"):
+                updates.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", record_update)
+        url = f"/api/exams/{exam_id}/cards/generate-answers"
+        try:
+            async with AsyncClient(app=app, base_url="http://test") as ac:
+                started = await ac.post(url, json={"apply": True})
+                body = await poll_job(ac, f"{url}/{started.json()['job_id']}")
+        finally:
+            event.remove(db_engine, "before_cursor_execute", record_update)
+
+        assert body["apply"] is True
+        assert body["applied"] == 3
+        assert len(updates) == 1
+        test_db.expire_all()
+        answers = [c.answer for c in test_db.query(Card).order_by(Card.number)]
+        assert answers == ["answer: Q1", "answer: Q2", "answer: Q3"]
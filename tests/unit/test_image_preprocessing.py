@@ -0,0 +1,115 @@
+import base64
+from io import BytesIO
+
+import pytest
+from PIL import Image, ImageDraw
+
+from config import settings
+from tprep.infrastructure import image_preprocessing
+from tprep.infrastructure.image_preprocessing import (
+    PreprocessOptions,
+    encode_image,
+    preprocess_image,
+)
+
+
+def make_page(path, size, fmt="JPEG"):
+    img = Image.new("RGB", size, (236, 230, 214))
+    draw = ImageDraw.Draw(img)
+    for y in range(40, size[1] - 40, 60):
+        draw.line((40, y, size[0] - 40, y + 10), fill=(30, 30, 90), width=6)
+    img.save(path, format=fmt, quality=95)
+    return path
+
+
+def decode(data):
+    return Image.open(BytesIO(data))
+
+
+class TestPreprocessImage:
+    def test_large_jpeg_is_downscaled(self, tmp_path):
+        path = make_page(tmp_path / "big.jpg", (3000, 2000))
+
+        result = decode(preprocess_image(path, PreprocessOptions(max_size=1024)))
+
+        assert result.format == "JPEG"
+        assert max(result.size) == 1024
+        assert result.size[0] / result.size[1] == pytest.approx(1.5, rel=0.01)
+
+    def test_small_jpeg_is_passed_through(self, tmp_path):
+        path = make_page(tmp_path / "small.jpg", (800, 600))
+
+        assert preprocess_image(path, PreprocessOptions()) == path.read_bytes()
+
+    def test_small_png_is_reencoded(self, tmp_path):
+        path = make_page(tmp_path / "small.png", (800, 600), fmt="PNG")
+
+        result = decode(preprocess_image(path, PreprocessOptions()))
+
+        assert result.format == "JPEG"
+        assert result.size == (800, 600)
+
+    def test_grayscale(self, tmp_path):
+        path = make_page(tmp_path / "page.jpg", (2000, 1500))
+
+        result = decode(preprocess_image(path, PreprocessOptions(mode="grayscale")))
+
+        assert result.mode == "L"
+
+    def test_binarize_leaves_only_dark_and_light(self, tmp_path):
+        path = make_page(tmp_path / "page.png", (600, 400), fmt="PNG")
+
+        result = decode(preprocess_image(path, PreprocessOptions(mode="binarize")))
+
+        histogram = result.histogram()
+        mid_tones = sum(histogram[64:192])
+        assert result.mode == "L"
+        assert mid_tones < sum(histogram) * 0.05
+
+    def test_quality_is_lowered_to_reach_target(self, tmp_path):
+        path = make_page(tmp_path / "page.jpg", (3000, 2000))
+        full = preprocess_image(path, PreprocessOptions(quality=95))
+
+        targeted = preprocess_image(
+            path, PreprocessOptions(quality=95, target_bytes=len(full) // 2)
+        )
+
+        assert len(targeted) < len(full)
+
+    def test_target_stops_at_min_quality(self, tmp_path):
+        path = make_page(tmp_path / "page.jpg", (3000, 2000))
+
+        data = preprocess_image(
+            path, PreprocessOptions(target_bytes=1, quality=85, min_quality=60)
+        )
+
+        assert decode(data).format == "JPEG"
+
+    def test_unknown_mode_in_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_IMAGE_MODE", "sepia")
+
+        with pytest.raises(ValueError):
+            PreprocessOptions.from_settings()
+
+
+class TestEncodeImage:
+    @pytest.fixture(params=[0, 1], ids=["thread", "process"])
+    def workers(self, request, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_PREPROCESS_WORKERS", request.param)
+        yield request.param
+        image_preprocessing.shutdown_preprocess_pool()
+
+    async def test_encodes_in_pool(self, tmp_path, workers):
+        path = make_page(tmp_path / "page.jpg", (2000, 1000))
+
+        encoded = await encode_image(path, PreprocessOptions(max_size=500))
+
+        assert decode(base64.b64decode(encoded)).size == (500, 250)
+
+    def test_pool_does_not_fork(self, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_PREPROCESS_WORKERS", 1)
+        pool = image_preprocessing.get_preprocess_pool()
+        try:
+            assert pool._mp_context.get_start_method() == "forkserver"
+        finally:
+            image_preprocessing.shutdown_preprocess_pool()
@@ -0,0 +1,221 @@
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+from pywebpush import WebPushException
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from tprep.infrastructure import NotificationDB
+from tprep.infrastructure.notification.notification_repo import NotificationRepo
+from tprep.notificator import notificator
+
+
+@pytest.fixture
+def session_factory(db_engine, test_db):
+    return sessionmaker(bind=db_engine)
+
+
+@pytest.fixture
+def due_notifications(populate_db, test_db):
+    user_id = uuid.uuid4()
+    exam_id = uuid.uuid4()
+    populate_db(
+        users=[
+            {
+                "id": user_id,
+                "email": "push@example.com",
+                "user_name": "Push",
+                "password_hash": "hash",
+                "push_key": "key",
+                "endpoint": "https://push.example.com",
+                "auth_token": "auth",
+            }
+        ],
+        exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+    )
+    past = datetime.utcnow() - timedelta(minutes=5)
+
+    def _create(count, future=0):
+        rows = [
+            NotificationDB(user_id=user_id, exam_id=exam_id, time=past)
+            for _ in range(count)
+        ] + [
+            NotificationDB(
+                user_id=user_id, exam_id=exam_id, time=past + timedelta(days=1)
+            )
+            for _ in range(future)
+        ]
+        test_db.add_all(rows)
+        test_db.commit()
+        return [row.id for row in rows[:count]]
+
+    return _create
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    sent = []
+    lock = threading.Lock()
+
+    def fake_send_push(user, notification):
+        with lock:
+            sent.append(notification.id)
+
+    monkeypatch.setattr(notificator, "send_push", fake_send_push)
+    return sent
+
+
+def push_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return WebPushException("Push failed", response=response)
+
+
+def remaining(test_db):
+    test_db.expire_all()
+    return set(test_db.scalars(select(NotificationDB.id)))
+
+
+class TestClaimDueNotifications:
+    def test_workers_claim_disjoint_batches(self, session_factory, due_notifications):
+        due_ids = due_notifications(5, future=2)
+
+        with session_factory() as first, session_factory() as second:
+            claimed_first = NotificationRepo.claim_due_notifications(3, first)
+            claimed_second = NotificationRepo.claim_due_notifications(3, second)
+
+            first_ids = {row.id for row in claimed_first}
+            second_ids = {row.id for row in claimed_second}
+            assert len(first_ids) == 3
+            assert len(second_ids) == 2
+            assert first_ids | second_ids == set(due_ids)
+            assert claimed_first[0].exam.title == "Exam"
+
+
+class TestProcessNotifications:
+    def test_sends_and_deletes_due(
+        self, session_factory, due_notifications, sent, test_db
+    ):
+        due_ids = due_notifications(7, future=1)
+
+        total = notificator.process_notifications(session_factory, batch_size=3)
+
+        assert total == 7
+        assert sorted(sent) == sorted(due_ids)
+        assert len(remaining(test_db)) == 1
+
+    def test_failed_delivery_stays_for_retry(
+        self, session_factory, due_notifications, monkeypatch, test_db
+    ):
+        due_ids = due_notifications(3)
+        failing = due_ids[1]
+
+        def flaky_send_push(user, notification):
+            if notification.id == failing:
+                raise ConnectionError("push service unavailable")
+
+        monkeypatch.setattr(notificator, "send_push", flaky_send_push)
+
+        assert notificator.process_notifications(session_factory, batch_size=10) == 2
+        assert remaining(test_db) == {failing}
+
+    def test_failing_batch_does_not_block_newer(
+        self, session_factory, due_notifications, monkeypatch, test_db
+    ):
+        failing = due_notifications(3)
+        good = due_notifications(4)
+        test_db.execute(
+            update(NotificationDB)
+            .where(NotificationDB.id.in_(failing))
+            .values(time=NotificationDB.time - timedelta(hours=1))
+        )
+        test_db.commit()
+        sent = []
+
+        def flaky_send_push(user, notification):
+            if notification.id in failing:
+                raise ConnectionError("push service unavailable")
+            sent.append(notification.id)
+
+        monkeypatch.setattr(notificator, "send_push", flaky_send_push)
+
+        assert notificator.process_notifications(session_factory, batch_size=3) == 4
+        assert sorted(sent) == sorted(good)
+        assert remaining(test_db) == set(failing)
+        postponed = test_db.scalars(select(NotificationDB)).all()
+        assert {row.attempts for row in postponed} == {1}
+        assert all(row.time > datetime.utcnow() for row in postponed)
+
+    def test_drops_after_max_attempts(
+        self, session_factory, due_notifications, monkeypatch, test_db
+    ):
+        (notification_id,) = due_notifications(1)
+        test_db.execute(
+            update(NotificationDB)
+            .where(NotificationDB.id == notification_id)
+            .values(attempts=settings.NOTIFICATOR_MAX_ATTEMPTS - 1)
+        )
+        test_db.commit()
+
+        def failing_send_push(user, notification):
+            raise ConnectionError("push service unavailable")
+
+        monkeypatch.setattr(notificator, "send_push", failing_send_push)
+
+        assert notificator.process_notifications(session_factory, batch_size=10) == 0
+        assert remaining(test_db) == set()
+
+    @pytest.mark.parametrize("status", [429, 503])
+    def test_push_service_error_is_retried(
+        self, session_factory, due_notifications, monkeypatch, test_db, status
+    ):
+        due_ids = due_notifications(2)
+
+        def failing_webpush(**kwargs):
+            raise push_error(status)
+
+        monkeypatch.setattr(notificator, "webpush", failing_webpush)
+
+        assert notificator.process_notifications(session_factory, batch_size=10) == 0
+        assert remaining(test_db) == set(due_ids)
+        postponed = test_db.scalars(select(NotificationDB)).all()
+        assert {row.attempts for row in postponed} == {1}
+
+    @pytest.mark.parametrize("status", [404, 410])
+    def test_dead_subscription_is_dropped(
+        self, session_factory, due_notifications, monkeypatch, test_db, status
+    ):
+        due_notifications(2)
+
+        def failing_webpush(**kwargs):
+            raise push_error(status)
+
+        monkeypatch.setattr(notificator, "webpush", failing_webpush)
+
+        assert notificator.process_notifications(session_factory, batch_size=10) == 2
+        assert remaining(test_db) == set()
+
+    def test_concurrent_workers_send_each_once(
+        self, session_factory, due_notifications, sent, test_db
+    ):
+        due_ids = due_notifications(60)
+
+        workers = [
+            threading.Thread(
+                target=notificator.process_notifications,
+                args=(session_factory,),
+                kwargs={"batch_size": 5, "send_workers": 4},
+            )
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert sorted(sent) == sorted(due_ids)
+        assert remaining(test_db) == set()
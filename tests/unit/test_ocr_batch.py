@@ -0,0 +1,109 @@
+import asyncio
+import time
+
+from httpx import AsyncClient
+from PIL import Image
+
+from config import settings
+from tprep.infrastructure import Card, ocr, ocr_providers
+
+
+class TestCardsFromImages:
+    async def test_pages_keep_order_and_run_concurrently(self, monkeypatch):
+        delays = {"p1": 0.15, "p2": 0.05, "p3": 0.1, "p4": 0.02}
+        running = 0
+        peak = 0
+
+        async def fake_cards_from_image(image_name, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(delays[image_name])
+            running -= 1
+            if image_name == "p3":
+                raise FileNotFoundError(image_name)
+            return [(f"{image_name}-Q", f"{image_name}-A")]
+
+        monkeypatch.setattr(ocr, "cards_from_image", fake_cards_from_image)
+
+        started = time.perf_counter()
+        pages = await ocr.cards_from_images(["p1", "p2", "p3", "p4"], concurrency=4)
+        elapsed = time.perf_counter() - started
+
+        assert pages[0] == [("p1-Q", "p1-A")]
+        assert pages[1] == [("p2-Q", "p2-A")]
+        assert isinstance(pages[2], FileNotFoundError)
+        assert pages[3] == [("p4-Q", "p4-A")]
+        # Время близко к самой медленной странице, а не к сумме
+        assert elapsed < sum(delays.values()) * 0.75
+        assert peak == 4
+
+    async def test_concurrency_is_bounded(self, monkeypatch):
+        running = 0
+        peak = 0
+
+        async def fake_cards_from_image(image_name, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return []
+
+        monkeypatch.setattr(ocr, "cards_from_image", fake_cards_from_image)
+
+        await ocr.cards_from_images([f"p{i}" for i in range(10)], concurrency=3)
+
+        assert peak == 3
+
+
+class TestOcrBatchRoute:
+    async def test_batch_inserts_pages_in_order(
+        self, editor_exam, populate_db, fake_openai, tmp_path, monkeypatch, test_db
+    ):
+        app, exam_id = editor_exam
+        populate_db(
+            cards=[{"exam_id": exam_id, "number": 1, "question": "Q", "answer": "A"}]
+        )
+        for name in ("p1.png", "p2.png"):
+            Image.new("RGB", (16, 16), "white").save(tmp_path / name)
+        monkeypatch.setattr(ocr, "_images_base_dir", lambda: tmp_path)
+        monkeypatch.setenv("OPENROUTER_API_KEY", "k")
+        monkeypatch.setattr(settings, "OCR_CACHE_ENABLED", False)
+        fake_openai.reply = '{"cards":[{"question":"Q1","answer":"A1"},{"question":"Q2","answer":"A2"}]}'
+
+        async with AsyncClient(app=app, base_url="http://test") as ac:
+            response = await ac.post(
+                f"/api/exams/{exam_id}/ocr/batch",
+                json={"image_names": ["p1.png", "missing.png", "p2.png"]},
+            )
+        await ocr_providers.close_ocr_client()
+
+        assert response.status_code == 200
+        body = response.json()
+        assert [c["number"] for c in body["cards"]] == [2, 3, 4, 5]
+        assert [c["question"] for c in body["cards"]] == ["Q1", "Q2", "Q1", "Q2"]
+        assert body["images"] == [
+            {
+                "image_name": "p1.png",
+                "success": True,
+                "cards_count": 2,
+                "status_code": None,
+                "error": None,
+            },
+            {
+                "image_name": "missing.png",
+                "success": False,
+                "cards_count": 0,
+                "status_code": 404,
+                "error": "Image file not found",
+            },
+            {
+                "image_name": "p2.png",
+                "success": True,
+                "cards_count": 2,
+                "status_code": None,
+                "error": None,
+            },
+        ]
+        assert test_db.query(Card).filter(Card.exam_id == exam_id).count() == 5
@@ -0,0 +1,158 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from PIL import Image
+from sqlalchemy import select, update
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from tprep.infrastructure import OcrCacheDB, ocr, ocr_providers
+from tprep.infrastructure.ai_cache.ocr_cache import OcrCache, ocr_cache_key
+from tprep.infrastructure.image_preprocessing import PreprocessOptions
+
+
+@pytest.fixture
+def cache(db_engine, test_db):
+    return OcrCache(
+        ttl_seconds=3600, max_entries=2, session_factory=sessionmaker(bind=db_engine)
+    )
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    Image.new("RGB", (32, 32), "white").save(tmp_path / "page1.png")
+    Image.new("RGB", (32, 32), "black").save(tmp_path / "page2.png")
+    (tmp_path / "copy.png").write_bytes((tmp_path / "page1.png").read_bytes())
+    monkeypatch.setattr(ocr, "_images_base_dir", lambda: tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+async def ocr_client():
+    yield
+    await ocr_providers.close_ocr_client()
+
+
+class TestOcrCacheKey:
+    def test_depends_on_everything_that_shapes_the_reply(self, images):
+        options = PreprocessOptions()
+
+        def key_for(name, model="m", prompt="p", provider="openrouter", opts=options):
+            return ocr_cache_key(images / name, model, prompt, provider, opts)
+
+        key = key_for("page1.png")
+
+        assert key_for("copy.png") == key
+        assert key_for("page2.png") != key
+        assert key_for("page1.png", model="other") != key
+        assert key_for("page1.png", prompt="other") != key
+        assert key_for("page1.png", provider="local") != key
+        assert key_for("page1.png", opts=PreprocessOptions(mode="grayscale")) != key
+        assert key_for("page1.png", opts=PreprocessOptions(max_size=512)) != key
+
+
+class TestOcrCache:
+    def test_put_and_get(self, cache):
+        cache.put("a" * 64, "m", [("Q1", "A1"), ("Q2", "A2")])
+
+        assert cache.get("a" * 64) == [("Q1", "A1"), ("Q2", "A2")]
+        assert cache.get("b" * 64) is None
+
+    def test_expired_entry_is_miss(self, cache, test_db):
+        cache.put("a" * 64, "m", [("Q", "A")])
+        test_db.execute(
+            update(OcrCacheDB).values(created_at=datetime.utcnow() - timedelta(hours=2))
+        )
+        test_db.commit()
+
+        assert cache.get("a" * 64) is None
+        assert cache.evict() == 1
+
+    def test_evicts_over_limit(self, cache, test_db):
+        for i, key in enumerate("abc"):
+            cache.put(key * 64, "m", [("Q", key)])
+            test_db.execute(
+                update(OcrCacheDB)
+                .where(OcrCacheDB.key == key * 64)
+                .values(last_used_at=datetime(2026, 1, 1) + timedelta(minutes=i))
+            )
+        test_db.commit()
+
+        assert cache.evict() == 1
+        assert set(test_db.scalars(select(OcrCacheDB.key))) == {"b" * 64, "c" * 64}
+
+
+class TestCardsFromImageWithCache:
+    async def test_repeat_image_skips_provider(
+        self, cache, images, fake_openai, ocr_client
+    ):
+        fake_openai.reply = '{"cards":[{"question":"Q1","answer":"A1"}]}'
+        fake_openai.latency = 0.2
+
+        first = await ocr.cards_from_image(
+            "page1.png", api_key="k", model="m", cache=cache
+        )
+        started = time.perf_counter()
+        second = await ocr.cards_from_image(
+            "copy.png", api_key="k", model="m", cache=cache
+        )
+        elapsed = time.perf_counter() - started
+
+        assert first == second == [("Q1", "A1")]
+        assert len(fake_openai.requests) == 1
+        assert elapsed < 0.1
+
+    async def test_other_model_is_a_miss(self, cache, images, fake_openai, ocr_client):
+        fake_openai.reply = '{"cards":[{"question":"Q1","answer":"A1"}]}'
+
+        await ocr.cards_from_image("page1.png", api_key="k", model="m", cache=cache)
+        await ocr.cards_from_image("page1.png", api_key="k", model="m2", cache=cache)
+
+        assert len(fake_openai.requests) == 2
+
+    async def test_local_provider_cards_are_not_served_by_openrouter(
+        self, cache, images, fake_openai, ocr_client, monkeypatch
+    ):
+        fake_openai.reply = '{"cards":[{"question":"Q1","answer":"A1"}]}'
+        monkeypatch.setattr(settings, "OCR_PROVIDER", "local")
+        fake = await ocr.cards_from_image(
+            "page1.png", api_key="k", model="m", cache=cache
+        )
+
+        monkeypatch.setattr(settings, "OCR_PROVIDER", "openrouter")
+        real = await ocr.cards_from_image(
+            "page1.png", api_key="k", model="m", cache=cache
+        )
+
+        assert fake != real == [("Q1", "A1")]
+        assert len(fake_openai.requests) == 1
+
+    async def test_empty_result_is_not_cached(
+        self, cache, images, fake_openai, ocr_client
+    ):
+        fake_openai.reply = '{"cards":[]}'
+
+        await ocr.cards_from_image("page1.png", api_key="k", model="m", cache=cache)
+        await ocr.cards_from_image("page1.png", api_key="k", model="m", cache=cache)
+
+        assert len(fake_openai.requests) == 2
+
+    @pytest.mark.parametrize("stream", [True, False])
+    async def test_truncated_reply_is_not_cached(
+        self, cache, images, fake_openai, ocr_client, monkeypatch, stream
+    ):
+        monkeypatch.setattr(settings, "OCR_STREAM", stream)
+        fake_openai.reply = (
+            '{"cards":[{"question":"Q1","answer":"A1"},{"question":"Q2","ans'
+        )
+
+        first = await ocr.cards_from_image(
+            "page1.png", api_key="k", model="m", cache=cache
+        )
+        second = await ocr.cards_from_image(
+            "page1.png", api_key="k", model="m", cache=cache
+        )
+
+        assert first == second == [("Q1", "A1")]
+        assert len(fake_openai.requests) == 2
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from PIL import Image
+
+from tprep.infrastructure import ocr, ocr_providers
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    path = tmp_path / "page.png"
+    Image.new("RGB", (64, 64), "white").save(path)
+    return path
+
+
+@pytest.fixture
+async def ocr_client():
+    yield
+    await ocr_providers.close_ocr_client()
+
+
+class TestRecognizeHandwriting:
+    async def test_returns_model_text(self, fake_openai, image_path, ocr_client):
+        fake_openai.reply = "  recognized text \n"
+
+        text = await ocr.recognize_handwriting(image_path, api_key="k", model="m")
+
+        assert text == "recognized text"
+        content = fake_openai.requests[0]
+        assert content[1]["image_url"]["url"].startswith("data:image/jpeg;base64,")
+
+    async def test_reuses_pooled_connection(self, fake_openai, image_path, ocr_client):
+        fake_openai.reply = "ok"
+
+        for _ in range(5):
+            await ocr.recognize_handwriting(image_path, api_key="k", model="m")
+
+        assert len(fake_openai.requests) == 5
+        assert len(fake_openai.connections) == 1
+
+    async def test_concurrent_calls_do_not_serialize(
+        self, fake_openai, image_path, ocr_client
+    ):
+        fake_openai.reply = "ok"
+        fake_openai.latency = 0.2
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                ocr.recognize_handwriting(image_path, api_key="k", model="m")
+                for _ in range(8)
+            )
+        )
+
+        assert time.perf_counter() - started < 0.2 * 8 / 2
+        assert fake_openai.peak_in_flight > 1
+
+    async def test_provider_error_raises_after_retries(
+        self, fake_openai, image_path, ocr_client
+    ):
+        fake_openai.errors = [(500, None)] * 10
+
+        with pytest.raises(httpx.HTTPStatusError):
+            await ocr.recognize_handwriting(image_path, api_key="k", model="m")
+
+    async def test_cards_from_image_parses_pairs(
+        self, fake_openai, image_path, ocr_client, monkeypatch
+    ):
+        monkeypatch.setattr(ocr, "_images_base_dir", lambda: image_path.parent)
+        fake_openai.reply = '{"cards":[{"question":"Q1","answer":"A1"}]}'
+
+        pairs = await ocr.cards_from_image("page.png", api_key="k", model="m")
+
+        assert pairs == [("Q1", "A1")]
+
+    async def test_missing_api_key(self, image_path, monkeypatch):
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+
+        with pytest.raises(ocr.OcrConfigurationError):
+            await ocr.recognize_handwriting(image_path, api_key="", model="m")
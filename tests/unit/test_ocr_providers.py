@@ -0,0 +1,101 @@
+import json
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from config import settings
+from tprep.infrastructure import ocr
+from tprep.infrastructure.ocr import OcrConfigurationError
+from tprep.infrastructure.ocr_providers import (
+    LocalOcrProvider,
+    OcrCall,
+    OpenRouterOcrProvider,
+    get_ocr_provider,
+)
+
+
+def make_call(image_b64="aGVsbG8=", name="page.png"):
+    return OcrCall(
+        image_path=Path(name),
+        image_b64=image_b64,
+        model="m",
+        prompt="p",
+        max_tokens=100,
+        timeout=5,
+    )
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    Image.new("RGB", (32, 32), "white").save(tmp_path / "page1.png")
+    Image.new("RGB", (32, 32), "black").save(tmp_path / "page2.png")
+    monkeypatch.setattr(ocr, "_images_base_dir", lambda: tmp_path)
+    monkeypatch.setattr(settings, "OCR_PROVIDER", "local")
+    monkeypatch.setattr(settings, "OCR_LOCAL_LATENCY_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "OCR_LOCAL_FIXTURES_DIR", None)
+    return tmp_path
+
+
+class TestLocalOcrProvider:
+    async def test_same_image_gives_same_cards(self):
+        provider = LocalOcrProvider(cards_per_page=2)
+
+        first = await provider.recognize(make_call("aaaa"))
+        again = await provider.recognize(make_call("aaaa"))
+        other = await provider.recognize(make_call("bbbb"))
+
+        assert first == again
+        assert first != other
+        assert len(json.loads(first)["cards"]) == 2
+
+    async def test_replays_fixture_by_image_name(self, tmp_path):
+        (tmp_path / "page.txt").write_text('{"cards":[]}', encoding="utf-8")
+        provider = LocalOcrProvider(fixtures_dir=tmp_path)
+
+        assert await provider.recognize(make_call(name="page.png")) == '{"cards":[]}'
+        assert "cards" in json.loads(
+            await provider.recognize(make_call(name="other.png"))
+        )
+
+    async def test_latency(self):
+        provider = LocalOcrProvider(latency_seconds=0.05)
+
+        started = time.perf_counter()
+        await provider.recognize(make_call())
+
+        assert time.perf_counter() - started >= 0.05
+
+
+class TestGetOcrProvider:
+    def test_builds_provider_from_settings(self, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_PROVIDER", "local")
+        monkeypatch.setattr(settings, "OCR_LOCAL_CARDS_PER_PAGE", 5)
+        provider = get_ocr_provider()
+        assert isinstance(provider, LocalOcrProvider)
+        assert provider.cards_per_page == 5
+
+        monkeypatch.setattr(settings, "OCR_PROVIDER", "openrouter")
+        assert isinstance(get_ocr_provider(), OpenRouterOcrProvider)
+
+    def test_unknown_provider(self, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_PROVIDER", "tesseract")
+        with pytest.raises(ValueError):
+            get_ocr_provider()
+
+
+class TestCardsFromImageWithLocalProvider:
+    async def test_works_offline_without_api_key(self, images):
+        pairs = await ocr.cards_from_image("page1.png", api_key="", model="m")
+
+        assert len(pairs) == settings.OCR_LOCAL_CARDS_PER_PAGE
+        assert pairs == await ocr.cards_from_image("page1.png", api_key="", model="m")
+        assert pairs != await ocr.cards_from_image("page2.png", api_key="", model="m")
+
+    async def test_openrouter_still_requires_api_key(self, images, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_PROVIDER", "openrouter")
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+
+        with pytest.raises(OcrConfigurationError):
+            await ocr.cards_from_image("page1.png", api_key="", model="m")
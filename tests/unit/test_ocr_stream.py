@@ -0,0 +1,146 @@
+import json
+import time
+
+import pytest
+from PIL import Image
+
+from config import settings
+from tprep.infrastructure import ocr, ocr_providers
+from tprep.infrastructure.ocr import (
+    CardStreamParser,
+    OcrParseError,
+    parse_cards_tolerant,
+)
+
+CARDS = [
+    {"question": "Что такое {x}?", "answer": 'Скобка } и кавычка \\" внутри'},
+    {"question": "Q2", "answer": "A2"},
+    {"question": "Q3", "answer": "A3"},
+]
+REPLY = json.dumps({"cards": CARDS}, ensure_ascii=False)
+EXPECTED = [(c["question"], c["answer"]) for c in CARDS]
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    Image.new("RGB", (32, 32), "white").save(tmp_path / "page1.png")
+    monkeypatch.setattr(ocr, "_images_base_dir", lambda: tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+async def ocr_client():
+    yield
+    await ocr_providers.close_ocr_client()
+
+
+class TestCardStreamParser:
+    def test_cards_arrive_as_objects_close(self):
+        parser = CardStreamParser()
+        seen = []
+        for i, ch in enumerate(REPLY):
+            for card in parser.feed(ch):
+                seen.append((i, card))
+
+        assert [card for _, card in seen] == EXPECTED
+        # Карточка отдаётся сразу на своей закрывающей скобке
+        assert seen[0][0] < REPLY.index('"Q2"')
+
+    def test_truncated_tail_keeps_complete_cards(self):
+        parser = CardStreamParser()
+        cut = REPLY.index('"Q3"') + 2
+
+        parser.feed(REPLY[:cut])
+
+        assert parser.cards == EXPECTED[:2]
+
+    def test_skips_malformed_card(self):
+        parser = CardStreamParser()
+
+        parser.feed(
+            '```json\n{"cards":[{"question":"Q1","answer":"A1",},'
+            '{"question":"","answer":"A"},{"question":"Q2","answer":"A2"}]}\n```'
+        )
+
+        assert parser.cards == [("Q2", "A2")]
+
+
+class TestParseCardsTolerant:
+    def test_complete_json(self):
+        assert parse_cards_tolerant(REPLY) == EXPECTED
+
+    def test_truncated_json(self):
+        assert parse_cards_tolerant(REPLY[:-10]) == EXPECTED[:2]
+
+    def test_garbage_still_raises(self):
+        with pytest.raises(OcrParseError):
+            parse_cards_tolerant('{"cards":[{"question":"Q1","ans')
+
+
+class TestCardsFromImageStreaming:
+    async def test_truncated_reply_keeps_complete_cards(
+        self, images, fake_openai, ocr_client
+    ):
+        fake_openai.reply = REPLY[:-10]
+
+        pairs = await ocr.cards_from_image("page1.png", api_key="k", model="m")
+
+        assert pairs == EXPECTED[:2]
+
+    async def test_malformed_sse_line_is_skipped(self, images, fake_openai, ocr_client):
+        fake_openai.reply = REPLY
+        fake_openai.stream_garbage = True
+
+        pairs = await ocr.cards_from_image("page1.png", api_key="k", model="m")
+
+        assert pairs == EXPECTED
+
+    async def test_empty_cards_and_garbage(self, images, fake_openai, ocr_client):
+        fake_openai.reply = '{"cards":[]}'
+        assert await ocr.cards_from_image("page1.png", api_key="k", model="m") == []
+
+        fake_openai.reply = "not json"
+        with pytest.raises(OcrParseError):
+            await ocr.cards_from_image("page1.png", api_key="k", model="m")
+
+    async def test_first_card_before_reply_ends(self, images, fake_openai, ocr_client):
+        fake_openai.reply = json.dumps(
+            {"cards": [{"question": f"Q{i}", "answer": f"A{i}"} for i in range(10)]}
+        )
+        fake_openai.chunk_delay = 0.02
+        started = time.perf_counter()
+        first_at = None
+
+        async for _ in ocr.stream_cards(images / "page1.png", api_key="k", model="m"):
+            if first_at is None:
+                first_at = time.perf_counter() - started
+        total = time.perf_counter() - started
+
+        assert first_at is not None
+        assert first_at < total / 2
+
+    async def test_non_streaming_mode_is_tolerant(
+        self, images, fake_openai, ocr_client, monkeypatch
+    ):
+        monkeypatch.setattr(settings, "OCR_STREAM", False)
+        fake_openai.reply = REPLY[:-10]
+
+        pairs = await ocr.cards_from_image("page1.png", api_key="k", model="m")
+
+        assert pairs == EXPECTED[:2]
+
+
+class TestLocalProviderStream:
+    async def test_streams_in_chunks(self, images, monkeypatch):
+        monkeypatch.setattr(settings, "OCR_PROVIDER", "local")
+        provider = ocr_providers.LocalOcrProvider(chunk_size=10)
+
+        chunks = [
+            chunk
+            async for chunk in ocr.stream_handwriting(
+                images / "page1.png", model="m", provider=provider
+            )
+        ]
+
+        assert len(chunks) > 1
+        assert len(json.loads("".join(chunks))["cards"]) == provider.cards_per_page
@@ -0,0 +1,223 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from tprep.domain.services.ai_answer_generator import AiAnswerGenerator
+from tprep.infrastructure.rate_limiter import (
+    OutboundLimiter,
+    RateLimit,
+    TokenBucket,
+    is_retryable,
+    retry_after_seconds,
+)
+
+
+class HttpError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+def flaky(errors, result="ok"):
+    calls = []
+
+    def func():
+        calls.append(time.monotonic())
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+
+    return func, calls
+
+
+@pytest.fixture
+def limiter():
+    return OutboundLimiter(
+        RateLimit(requests_per_second=1000, burst=10, max_in_flight=10),
+        per_model={
+            "slow": RateLimit(requests_per_second=20, burst=1, max_in_flight=10),
+            "narrow": RateLimit(requests_per_second=1000, burst=10, max_in_flight=2),
+        },
+        max_retries=3,
+        backoff_base_seconds=0.01,
+        backoff_max_seconds=0.05,
+    )
+
+
+class TestTokenBucket:
+    def test_rate_is_respected_after_burst(self):
+        bucket = TokenBucket(rate=50, burst=2)
+
+        started = time.monotonic()
+        for _ in range(7):
+            bucket.acquire()
+        elapsed = time.monotonic() - started
+
+        # 2 токена сразу, остальные 5 — по одному в 20 мс
+        assert 0.09 <= elapsed < 0.5
+
+    def test_pause_delays_next_token(self):
+        bucket = TokenBucket(rate=1000, burst=5)
+        bucket.pause(0.1)
+
+        started = time.monotonic()
+        bucket.acquire()
+
+        assert time.monotonic() - started >= 0.09
+
+
+class TestOutboundLimiter:
+    def test_per_model_limits(self, limiter):
+        assert limiter.limit_for("slow").requests_per_second == 20
+        assert limiter.limit_for("other") == limiter.default
+
+    def test_requests_per_second_per_model(self, limiter):
+        started = time.monotonic()
+        for _ in range(4):
+            limiter.call("slow", lambda: None)
+
+        assert time.monotonic() - started >= 0.14
+
+    def test_in_flight_is_bounded_per_model(self, limiter):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def work():
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.03)
+            with lock:
+                state["running"] -= 1
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            list(executor.map(lambda _: limiter.call("narrow", work), range(6)))
+
+        assert state["peak"] == 2
+
+    def test_retries_429_and_5xx(self, limiter):
+        func, calls = flaky([HttpError(429), HttpError(503)])
+
+        assert limiter.call("model", func) == "ok"
+        assert len(calls) == 3
+
+    def test_retries_transport_errors(self, limiter):
+        func, calls = flaky([httpx.ConnectError("reset")])
+
+        assert limiter.call("model", func) == "ok"
+        assert len(calls) == 2
+
+    def test_does_not_retry_client_errors(self, limiter):
+        func, calls = flaky([HttpError(400)])
+
+        with pytest.raises(HttpError):
+            limiter.call("model", func)
+        assert len(calls) == 1
+
+    def test_gives_up_after_max_retries(self, limiter):
+        func, calls = flaky([HttpError(500)] * 10)
+
+        with pytest.raises(HttpError):
+            limiter.call("model", func)
+        assert len(calls) == limiter.max_retries + 1
+
+    def test_honors_retry_after(self, limiter):
+        limiter.backoff_max_seconds = 1
+        func, calls = flaky([HttpError(429, {"Retry-After": "0.2"})])
+
+        assert limiter.call("model", func) == "ok"
+        assert calls[1] - calls[0] >= 0.19
+
+    def test_retry_after_is_capped(self, limiter):
+        func, calls = flaky([HttpError(429, {"Retry-After": "86400"})])
+
+        assert limiter.call("model", func) == "ok"
+        assert calls[1] - calls[0] < 1
+        started = time.monotonic()
+        limiter.call("model", lambda: None)
+        assert time.monotonic() - started < 1
+
+    def test_backoff_is_jittered_and_capped(self, limiter):
+        delays = [limiter.backoff_delay(attempt) for attempt in range(10)]
+
+        assert all(0 <= delay <= limiter.backoff_max_seconds for delay in delays)
+        assert len(set(delays)) > 1
+
+
+def flaky_stream(failures, fail_after_first=False):
+    opened = []
+
+    async def open_stream():
+        opened.append(time.monotonic())
+        if len(opened) <= failures:
+            if fail_after_first:
+                yield "first"
+            raise HttpError(503)
+        for item in ("a", "b"):
+            yield item
+
+    return open_stream, opened
+
+
+class TestOutboundLimiterStream:
+    async def test_retries_before_first_item(self, limiter):
+        open_stream, opened = flaky_stream(failures=2)
+
+        items = [item async for item in limiter.astream("model", open_stream)]
+
+        assert items == ["a", "b"]
+        assert len(opened) == 3
+
+    async def test_does_not_retry_started_stream(self, limiter):
+        open_stream, opened = flaky_stream(failures=1, fail_after_first=True)
+        items = []
+
+        with pytest.raises(HttpError):
+            async for item in limiter.astream("model", open_stream):
+                items.append(item)
+        assert items == ["first"]
+        assert len(opened) == 1
+
+
+class TestRetryHelpers:
+    def test_is_retryable(self):
+        assert is_retryable(HttpError(429))
+        assert is_retryable(HttpError(502))
+        assert not is_retryable(HttpError(404))
+        assert not is_retryable(ValueError("no response"))
+
+    def test_retry_after_seconds_and_http_date(self):
+        assert retry_after_seconds(HttpError(429, {"Retry-After": "3"})) == 3
+        when = datetime.now(timezone.utc) + timedelta(seconds=30)
+        parsed = retry_after_seconds(
+            HttpError(429, {"Retry-After": format_datetime(when, usegmt=True)})
+        )
+        assert 25 < parsed <= 30
+        assert retry_after_seconds(HttpError(429)) is None
+        assert retry_after_seconds(HttpError(429, {"Retry-After": "soon"})) is None
+
+
+class TestGeneratorRetries:
+    def test_generator_recovers_from_rate_limit(self, fake_openai, limiter):
+        fake_openai.errors = [(429, "0"), (503, None)]
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, limiter=limiter)
+
+        results = generator.generate_answers_batch([(1, "Q")])
+
+        assert results[0].success
+        assert len(fake_openai.requests) == 3
+
+    def test_generator_fails_card_after_retries(self, fake_openai, limiter):
+        fake_openai.errors = [(429, "0")] * 10
+        generator = AiAnswerGenerator(base_url=fake_openai.base_url, limiter=limiter)
+
+        results = generator.generate_answers_batch([(1, "Q")])
+
+        assert not results[0].success
+        assert len(fake_openai.requests) == limiter.max_retries + 1
@@ -1,6 +1,7 @@
+import asyncio
 import pytest
 import uuid
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from tprep.domain.services.session_factory import SessionFactory, strategy_enum
 from tprep.domain.exam_session import ExamSession
@@ -841,3 +842,29 @@ class TestSessionFactoryMultipleSessions:
         assert str(session1.user_id) == user_id_1
         assert str(session2.user_id) == user_id_2
         assert len(SessionFactory.session_ids) == 2
+
+
+class TestSweepSessionsLoop:
+    async def test_sweep_error_does_not_stop_loop_or_shutdown(self, monkeypatch):
+        from tprep.app import main
+
+        calls = []
+
+        def failing_sweep():
+            calls.append(1)
+            raise RuntimeError("database is unavailable")
+
+        monkeypatch.setattr(SessionFactory, "sweep_expired", failing_sweep)
+        monkeypatch.setattr(main.settings, "SESSION_SWEEP_INTERVAL_SECONDS", 0.01)
+        for name in ("mistake_buffer", "upload_pool", "generation_pool"):
+            monkeypatch.setattr(main, name, MagicMock())
+        monkeypatch.setattr(main, "close_ocr_client", AsyncMock())
+        monkeypatch.setattr(main, "shutdown_preprocess_pool", MagicMock())
+
+        async with main.lifespan(main.app):
+            await asyncio.sleep(0.1)
+
+        assert len(calls) >= 2
+        main.mistake_buffer.flush.assert_called_once()
+        main.upload_pool.shutdown.assert_called_once()
+        main.shutdown_preprocess_pool.assert_called_once()
@@ -0,0 +1,227 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from freezegun import freeze_time
+from sqlalchemy.orm import sessionmaker
+
+from tprep.domain.exam_session import ExamSession
+from tprep.domain.services.session_store import (
+    InMemorySessionStore,
+    PostgresSessionStore,
+    build_session_store,
+)
+
+
+@pytest.fixture
+def user_and_exam(populate_db):
+    user_id = uuid.uuid4()
+    exam_id = uuid.uuid4()
+    populate_db(
+        users=[
+            {
+                "id": user_id,
+                "email": "store@example.com",
+                "user_name": "Store",
+                "password_hash": "hash",
+            }
+        ],
+        exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+    )
+    return user_id, exam_id
+
+
+@pytest.fixture
+def postgres_store(db_engine, test_db):
+    return PostgresSessionStore(sessionmaker(bind=db_engine))
+
+
+class TestInMemorySessionStore:
+    def test_set_and_get(self):
+        store = InMemorySessionStore()
+        session = ExamSession(1, 10, [1, 2, 3])
+
+        store[session.id] = session
+
+        assert session.id in store
+        assert store[session.id] is session
+        assert len(store) == 1
+
+    def test_get_missing_raises_key_error(self):
+        store = InMemorySessionStore()
+
+        with pytest.raises(KeyError):
+            store["missing"]
+
+    def test_delete_and_clear(self):
+        store = InMemorySessionStore()
+        first = ExamSession(1, 10, [1])
+        second = ExamSession(1, 10, [2])
+        store[first.id] = first
+        store[second.id] = second
+
+        del store[first.id]
+        assert first.id not in store
+
+        store.clear()
+        assert len(store) == 0
+
+
+class TestInMemorySessionStoreEviction:
+    def test_lru_evicts_least_recently_used(self):
+        store = InMemorySessionStore(max_entries=2)
+        first = ExamSession(1, 10, [1])
+        second = ExamSession(1, 10, [2])
+        third = ExamSession(1, 10, [3])
+        store[first.id] = first
+        store[second.id] = second
+
+        store[first.id]  # first becomes most recently used
+        store[third.id] = third
+
+        assert first.id in store
+        assert second.id not in store
+        assert third.id in store
+        assert store.stats().evicted == 1
+
+    def test_idle_session_expires_on_access(self):
+        store = InMemorySessionStore(idle_ttl_seconds=60)
+        with freeze_time("2026-01-01 12:00:00") as frozen:
+            session = ExamSession(1, 10, [1])
+            store[session.id] = session
+
+            frozen.tick(timedelta(seconds=61))
+
+            with pytest.raises(KeyError):
+                store[session.id]
+        assert session.id not in store
+        assert store.stats().expired == 1
+
+    def test_activity_extends_lifetime(self, mock_mistake_buffer):
+        store = InMemorySessionStore(idle_ttl_seconds=60)
+        with freeze_time("2026-01-01 12:00:00") as frozen:
+            session = ExamSession(1, 10, [1, 2])
+            store[session.id] = session
+
+            frozen.tick(timedelta(seconds=50))
+            session.set_answer(1, True, None)
+            frozen.tick(timedelta(seconds=50))
+
+            assert store[session.id] is session
+
+    def test_sweep_removes_only_expired(self):
+        store = InMemorySessionStore(idle_ttl_seconds=60)
+        with freeze_time("2026-01-01 12:00:00") as frozen:
+            stale = ExamSession(1, 10, [1])
+            store[stale.id] = stale
+            frozen.tick(timedelta(seconds=45))
+            fresh = ExamSession(1, 10, [2])
+            store[fresh.id] = fresh
+            frozen.tick(timedelta(seconds=30))
+
+            assert store.sweep() == 1
+
+        assert stale.id not in store
+        assert fresh.id in store
+        stats = store.stats()
+        assert stats.size == 1
+        assert stats.expired == 1
+        assert stats.evicted == 0
+
+
+class TestPostgresSessionStore:
+    def test_round_trip_preserves_session(self, postgres_store, user_and_exam):
+        user_id, exam_id = user_and_exam
+        session = ExamSession(user_id, exam_id, [5, 6, 7])
+        session.answers = {5: True, 6: False}
+
+        postgres_store[session.id] = session
+        restored = postgres_store[session.id]
+
+        assert restored is not session
+        assert restored.id == session.id
+        assert restored.user_id == user_id
+        assert restored.exam_id == exam_id
+        assert restored.questions == [5, 6, 7]
+        assert restored.answers == {5: True, 6: False}
+        assert restored.created_at == session.created_at
+
+    def test_save_again_updates_answers(self, postgres_store, user_and_exam):
+        user_id, exam_id = user_and_exam
+        session = ExamSession(user_id, exam_id, [1, 2])
+        postgres_store[session.id] = session
+
+        session.answers[1] = False
+        postgres_store[session.id] = session
+
+        assert postgres_store[session.id].answers == {1: False}
+        assert len(postgres_store) == 1
+
+    def test_visible_from_another_store_instance(
+        self, db_engine, postgres_store, user_and_exam
+    ):
+        user_id, exam_id = user_and_exam
+        session = ExamSession(user_id, exam_id, [1])
+        postgres_store[session.id] = session
+
+        other_worker = PostgresSessionStore(sessionmaker(bind=db_engine))
+
+        assert session.id in other_worker
+        assert other_worker[session.id].questions == [1]
+
+    def test_workers_saving_own_copies_keep_both_answers(
+        self, db_engine, postgres_store, user_and_exam
+    ):
+        user_id, exam_id = user_and_exam
+        session = ExamSession(user_id, exam_id, [1, 2])
+        postgres_store[session.id] = session
+        other_worker = PostgresSessionStore(sessionmaker(bind=db_engine))
+
+        first_copy = postgres_store[session.id]
+        second_copy = other_worker[session.id]
+        first_copy.answers[1] = True
+        second_copy.answers[2] = False
+        postgres_store[session.id] = first_copy
+        other_worker[session.id] = second_copy
+
+        assert postgres_store[session.id].answers == {1: True, 2: False}
+
+    def test_sweep_deletes_old_sessions(self, db_engine, user_and_exam):
+        user_id, exam_id = user_and_exam
+        store = PostgresSessionStore(sessionmaker(bind=db_engine), ttl_seconds=60)
+        old = ExamSession.restore(
+            "old", user_id, exam_id, [1], {}, datetime.utcnow() - timedelta(minutes=5)
+        )
+        fresh = ExamSession(user_id, exam_id, [1])
+        store[old.id] = old
+        store[fresh.id] = fresh
+
+        assert store.sweep() == 1
+        assert old.id not in store
+        assert fresh.id in store
+        assert store.stats().expired == 1
+
+    def test_missing_and_delete(self, postgres_store, user_and_exam):
+        user_id, exam_id = user_and_exam
+        session = ExamSession(user_id, exam_id, [1])
+        postgres_store[session.id] = session
+
+        del postgres_store[session.id]
+
+        assert session.id not in postgres_store
+        with pytest.raises(KeyError):
+            postgres_store[session.id]
+        with pytest.raises(KeyError):
+            del postgres_store[session.id]
+
+
+class TestBuildSessionStore:
+    def test_memory_backend(self):
+        assert isinstance(build_session_store("memory"), InMemorySessionStore)
+
+    def test_postgres_backend(self):
+        assert isinstance(build_session_store("postgres"), PostgresSessionStore)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError):
+            build_session_store("redis")
@@ -1,12 +1,18 @@
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy.orm import sessionmaker
 
 from tprep.infrastructure import Card
+from tprep.infrastructure.statistic.mistake_buffer import MistakeBuffer
 from tprep.infrastructure.statistic.stat_repo import StatRepo
 from tprep.infrastructure.statistic.statistic import Statistic
 
 
-class TestStatRepoIncMistakes:
-    def test_inc_mistakes_increments_existing_statistic(self, test_db, populate_db):
+class TestStatRepoSingleMistake:
+    def test_single_mistake_increments_existing_statistic(self, test_db, populate_db):
         user_id = str(uuid.uuid4())
         exam_id = str(uuid.uuid4())
 
@@ -45,7 +51,7 @@ class TestStatRepoIncMistakes:
         test_db.add(stat)
         test_db.commit()
 
-        StatRepo.inc_mistakes(user_id, card_id, test_db)
+        StatRepo.add_mistakes({(user_id, card_id, exam_id): 1}, test_db)
 
         # Проверяем что счетчик увеличился
         updated_stat = (
@@ -58,7 +64,7 @@ class TestStatRepoIncMistakes:
         assert updated_stat is not None
         assert updated_stat.mistakes_count == 6
 
-    def test_inc_mistakes_creates_new_statistic_when_not_exists(
+    def test_single_mistake_creates_new_statistic_when_not_exists(
         self, test_db, populate_db
     ):
         user_id = str(uuid.uuid4())
@@ -87,7 +93,7 @@ class TestStatRepoIncMistakes:
         card = test_db.query(Card).filter(Card.exam_id == uuid.UUID(exam_id)).first()
         card_id = card.card_id
 
-        StatRepo.inc_mistakes(user_id, card_id, test_db)
+        StatRepo.add_mistakes({(user_id, card_id, exam_id): 1}, test_db)
 
         # Проверяем что статистика создана
         stat = (
@@ -100,7 +106,7 @@ class TestStatRepoIncMistakes:
         assert stat is not None
         assert stat.mistakes_count == 1
 
-    def test_inc_mistakes_increments_multiple_times(self, test_db, populate_db):
+    def test_single_mistake_increments_multiple_times(self, test_db, populate_db):
         user_id = str(uuid.uuid4())
         exam_id = str(uuid.uuid4())
 
@@ -139,7 +145,7 @@ class TestStatRepoIncMistakes:
 
         # Увеличиваем счетчик 3 раза
         for _ in range(3):
-            StatRepo.inc_mistakes(user_id, card_id, test_db)
+            StatRepo.add_mistakes({(user_id, card_id, exam_id): 1}, test_db)
 
         # Проверяем результат
         updated_stat = (
@@ -152,7 +158,7 @@ class TestStatRepoIncMistakes:
         assert updated_stat is not None
         assert updated_stat.mistakes_count == 8
 
-    def test_inc_mistakes_different_users_separate_statistics(
+    def test_single_mistake_different_users_separate_statistics(
         self, test_db, populate_db
     ):
         user_id_1 = str(uuid.uuid4())
@@ -205,7 +211,7 @@ class TestStatRepoIncMistakes:
         test_db.commit()
 
         # Увеличиваем счетчик только для пользователя 1
-        StatRepo.inc_mistakes(user_id_1, card_id, test_db)
+        StatRepo.add_mistakes({(user_id_1, card_id, exam_id): 1}, test_db)
 
         # Проверяем что изменилась только статистика пользователя 1
         updated_stat1 = (
@@ -225,3 +231,142 @@ class TestStatRepoIncMistakes:
 
         assert updated_stat1.mistakes_count == 6
         assert updated_stat2.mistakes_count == 3  # Не изменилось
+
+    def test_single_mistake_concurrent_first_mistake(
+        self, db_engine, test_db, populate_db
+    ):
+        user_id, exam_id, (card_id, _) = _user_exam_card(populate_db, test_db)
+        make_session = sessionmaker(bind=db_engine)
+
+        def submit() -> None:
+            with make_session() as db:
+                StatRepo.add_mistakes({(user_id, card_id, exam_id): 1}, db)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(submit) for _ in range(16)]:
+                future.result()
+
+        assert _mistakes(test_db, user_id, card_id) == 16
+
+
+def _user_exam_card(populate_db, test_db):
+    user_id = uuid.uuid4()
+    exam_id = uuid.uuid4()
+    populate_db(
+        users=[
+            {
+                "id": user_id,
+                "email": "user1@example.com",
+                "user_name": "User",
+                "password_hash": "hash",
+            }
+        ],
+        exams=[{"id": exam_id, "title": "Exam", "creator_id": user_id}],
+        cards=[
+            {"exam_id": exam_id, "question": "Q1?", "answer": "A1", "number": 1},
+            {"exam_id": exam_id, "question": "Q2?", "answer": "A2", "number": 2},
+        ],
+    )
+    cards = test_db.query(Card).filter(Card.exam_id == exam_id).all()
+    return user_id, exam_id, [c.card_id for c in cards]
+
+
+def _mistakes(test_db, user_id, card_id):
+    test_db.expire_all()
+    stat = (
+        test_db.query(Statistic)
+        .filter(Statistic.user_id == user_id, Statistic.card_id == card_id)
+        .first()
+    )
+    return stat.mistakes_count if stat else None
+
+
+class TestStatRepoAddMistakes:
+    def test_add_mistakes_inserts_and_increments(self, test_db, populate_db):
+        user_id, exam_id, (card_1, card_2) = _user_exam_card(populate_db, test_db)
+        test_db.add(
+            Statistic(
+                user_id=user_id, card_id=card_1, exam_id=exam_id, mistakes_count=5
+            )
+        )
+        test_db.commit()
+
+        StatRepo.add_mistakes(
+            {(user_id, card_1, exam_id): 2, (user_id, card_2, exam_id): 3}, test_db
+        )
+
+        assert _mistakes(test_db, user_id, card_1) == 7
+        assert _mistakes(test_db, user_id, card_2) == 3
+
+    def test_add_mistakes_skips_deleted_cards(self, test_db, populate_db):
+        user_id, exam_id, (card_1, _) = _user_exam_card(populate_db, test_db)
+
+        StatRepo.add_mistakes(
+            {(user_id, card_1, exam_id): 1, (user_id, 999999, exam_id): 1}, test_db
+        )
+
+        assert _mistakes(test_db, user_id, card_1) == 1
+        assert test_db.query(Statistic).count() == 1
+
+
+class TestMistakeBuffer:
+    def test_coalesces_until_flush(self, test_db, populate_db):
+        user_id, exam_id, (card_1, card_2) = _user_exam_card(populate_db, test_db)
+        buffer = MistakeBuffer(max_pending=100, flush_interval_seconds=3600)
+
+        for _ in range(3):
+            buffer.add(user_id, card_1, exam_id, test_db)
+        buffer.add(user_id, card_2, exam_id, test_db)
+
+        assert len(buffer) == 2
+        assert _mistakes(test_db, user_id, card_1) is None
+
+        assert buffer.flush(test_db) == 2
+        assert len(buffer) == 0
+        assert _mistakes(test_db, user_id, card_1) == 3
+        assert _mistakes(test_db, user_id, card_2) == 1
+
+    def test_flushes_on_size_threshold(self, test_db, populate_db):
+        user_id, exam_id, (card_1, card_2) = _user_exam_card(populate_db, test_db)
+        buffer = MistakeBuffer(max_pending=2, flush_interval_seconds=3600)
+
+        buffer.add(user_id, card_1, exam_id, test_db)
+        assert _mistakes(test_db, user_id, card_1) is None
+
+        buffer.add(user_id, card_2, exam_id, test_db)
+        assert len(buffer) == 0
+        assert _mistakes(test_db, user_id, card_1) == 1
+
+    def test_flushes_on_time_threshold(self, test_db, populate_db):
+        user_id, exam_id, (card_1, _) = _user_exam_card(populate_db, test_db)
+        buffer = MistakeBuffer(max_pending=100, flush_interval_seconds=0)
+
+        buffer.add(user_id, card_1, exam_id, test_db)
+
+        assert len(buffer) == 0
+        assert _mistakes(test_db, user_id, card_1) == 1
+
+    def test_failed_flush_keeps_increments(self):
+        buffer = MistakeBuffer(max_pending=100, flush_interval_seconds=3600)
+        key = (uuid.uuid4(), 1, uuid.uuid4())
+        buffer.add(*key)
+
+        db = MagicMock()
+
+        with patch.object(StatRepo, "add_mistakes", side_effect=RuntimeError):
+            with pytest.raises(RuntimeError):
+                buffer.flush(db)
+
+        assert len(buffer) == 1
+        db.rollback.assert_called_once()
+
+    def test_failed_flush_on_add_does_not_fail_request(self):
+        buffer = MistakeBuffer(max_pending=2, flush_interval_seconds=3600)
+        db = MagicMock()
+        buffer.add(uuid.uuid4(), 1, uuid.uuid4(), db)
+
+        with patch.object(StatRepo, "add_mistakes", side_effect=RuntimeError):
+            buffer.add(uuid.uuid4(), 2, uuid.uuid4(), db)
+
+        assert len(buffer) == 2
+        db.rollback.assert_called_once()
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tprep.infrastructure.exceptions.worker_pool_busy import WorkerPoolBusy
+from tprep.infrastructure.worker_pool import WorkerPool
+
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool("test", max_workers=2, max_queue=2)
+    yield pool
+    pool.shutdown()
+
+
+class TestWorkerPool:
+    async def test_runs_function_in_worker_thread(self, pool):
+        main_thread = threading.get_ident()
+
+        result = await pool.run(lambda a, b: (a + b, threading.get_ident()), 2, b=3)
+
+        assert result[0] == 5
+        assert result[1] != main_thread
+        assert pool.stats().completed == 1
+
+    async def test_concurrency_is_bounded(self):
+        pool = WorkerPool("bounded", max_workers=2)
+        lock = threading.Lock()
+        running = 0
+        peak = 0
+
+        def work():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.05)
+            with lock:
+                running -= 1
+
+        await asyncio.gather(*(pool.run(work) for _ in range(6)))
+        pool.shutdown()
+
+        assert peak == 2
+        assert pool.stats().completed == 6
+
+    async def test_full_queue_rejects_task(self, pool):
+        release = threading.Event()
+        tasks = [asyncio.ensure_future(pool.run(release.wait)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+
+        stats = pool.stats()
+        assert stats.running == 2
+        assert stats.queued == 2
+
+        with pytest.raises(WorkerPoolBusy):
+            await pool.run(release.wait)
+        assert pool.stats().rejected == 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+        stats = pool.stats()
+        assert stats.queued == 0
+        assert stats.running == 0
+        assert stats.completed == 4
+
+    async def test_exception_is_propagated(self, pool):
+        def fail():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await pool.run(fail)
+        assert pool.stats().running == 0
+
+    async def test_usable_after_shutdown(self, pool):
+        await pool.run(lambda: None)
+        pool.shutdown()
+
+        assert await pool.run(lambda: 42) == 42
@@ -1,16 +1,23 @@
-from typing import List
+import asyncio
+from typing import AsyncIterator, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, UploadFile, File
+from fastapi import APIRouter, Depends, Query, UploadFile, File
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from config import settings
 from tprep.app.card_schemas import (
     CardBase,
+    CardPageResponse,
     CardResponse,
     GenerateAnswersRequest,
-    GenerateAnswersResponse,
+    GenerationJobResponse,
     CardGenerationResult,
+    WorkerPoolStatsResponse,
 )
+from tprep.infrastructure.ai_cache.answer_cache import answer_cache
 from tprep.infrastructure.exam.exam import Card
 from tprep.infrastructure.authorization import get_current_user_id
 from tprep.infrastructure.exam.exam_repo import ExamRepo
@@ -21,11 +28,22 @@ from tprep.infrastructure.exceptions.file_extension import FileExtension
 from tprep.infrastructure.exceptions.user_is_not_creator import UserIsNotEditor
 from tprep.infrastructure.user.user_repo import UserRepo
 from tprep.infrastructure.parser.file_parser import FileParser
-from tprep.domain.services.ai_answer_generator import AiAnswerGenerator
+from tprep.infrastructure.worker_pool import upload_pool
+from tprep.domain.services.ai_answer_generator import (
+    AiAnswerGenerator,
+    GenerationResult,
+)
+from tprep.domain.services.generation_jobs import (
+    GenerationJob,
+    JobCard,
+    generation_jobs,
+)
 
 
 router = APIRouter(tags=["Cards"])
 
+JOB_EVENTS_POLL_SECONDS = 0.5
+
 
 @router.post("/exams/{exam_id}/cards", response_model=CardResponse)
 def create_card(
@@ -49,13 +67,41 @@ async def create_cards_from_file(
     user_id: UUID = Depends(get_current_user_id),
     file: UploadFile = File(...),
 ) -> List[Card]:
-    if not ExamRepo.user_can_edit_exam(user_id, exam_id, db):
+    # Парсинг и синхронный SQLAlchemy уходят в upload_pool, чтобы не блокировать event loop
+    if not await upload_pool.run(ExamRepo.user_can_edit_exam, user_id, exam_id, db):
         raise UserIsNotEditor("User has no rights to edit this exam")
     if not FileParser.check_extension(file.filename):
         raise FileExtension("Cant parse file with this extension")
-    cards_data = await FileParser.parse_file(file)
-    print(cards_data)
-    return ExamRepo.create_card_by_list(exam_id, cards_data, db)
+
+    if FileParser.supports_streaming(file.filename):
+        # Все пачки — одна транзакция: ошибка разбора в середине файла
+        # откатывает уже вставленные карточки, импорт всё или ничего
+        created: List[Card] = []
+        try:
+            async for batch in FileParser.iter_card_batches(
+                file, settings.UPLOAD_BATCH_SIZE, settings.UPLOAD_CHUNK_SIZE
+            ):
+                created.extend(
+                    await upload_pool.run(
+                        ExamRepo.create_card_by_list, exam_id, batch, db, False
+                    )
+                )
+            await upload_pool.run(db.commit)
+        except Exception:
+            await upload_pool.run(db.rollback)
+            raise
+        return created
+
+    content = await file.read()
+    cards_data = await upload_pool.run(
+        FileParser.parse_content, content, FileParser.get_extension(file.filename)
+    )
+    return await upload_pool.run(ExamRepo.create_card_by_list, exam_id, cards_data, db)
+
+
+@router.get("/cards/upload/stats", response_model=WorkerPoolStatsResponse)
+def get_upload_pool_stats() -> WorkerPoolStatsResponse:
+    return WorkerPoolStatsResponse.model_validate(upload_pool.stats())
 
 
 @router.get("/exams/{exam_id}/cards", response_model=List[CardResponse])
@@ -71,6 +117,24 @@ def get_cards_list(
     return cards
 
 
+@router.get("/exams/{exam_id}/cards/page", response_model=CardPageResponse)
+def get_cards_page(
+    exam_id: UUID,
+    cursor: str | None = Query(None, description="next_cursor from previous page"),
+    limit: int = Query(settings.CARDS_PAGE_SIZE, ge=1, le=settings.CARDS_MAX_PAGE_SIZE),
+    user_id: UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+) -> CardPageResponse:
+    exam = ExamRepo.get_exam(exam_id, db)
+    if not ExamRepo.user_can_view_exam(user_id, exam, db):
+        raise UserIsNotEditor("User has no rights to view this exam")
+    cards, next_cursor = ExamRepo.get_cards_page(exam_id, limit, cursor, db)
+    return CardPageResponse(
+        cards=[CardResponse.model_validate(c) for c in cards],
+        next_cursor=next_cursor,
+    )
+
+
 @router.get("/cards/{card_id}", response_model=CardBase)
 def get_card(
     card_id: int,
@@ -105,17 +169,54 @@ def delete_card(
     ExamRepo.delete_card(exam_id, card_id, db)
 
 
+def build_job_response(job: GenerationJob) -> GenerationJobResponse:
+    return GenerationJobResponse(
+        job_id=job.id,
+        status=job.status.value,
+        total=job.total,
+        done=job.done,
+        apply=job.apply,
+        applied=job.applied,
+        successful=job.successful,
+        failed=job.failed,
+        cache_hits=job.cache_hits,
+        cache_misses=job.cache_misses,
+        unique_questions=job.unique_questions,
+        dedup_ratio=job.dedup_ratio,
+        error=job.error,
+        cards=[
+            build_card_result(card, result) for card, result in job.ordered_results()
+        ],
+    )
+
+
+def build_card_result(card: JobCard, result: GenerationResult) -> CardGenerationResult:
+    return CardGenerationResult(
+        card_id=card.card_id,
+        number=card.number,
+        question=card.question,
+        answer=result.answer,
+        success=result.success,
+        error=result.error,
+    )
+
+
+def sse_event(event: str, payload: BaseModel) -> str:
+    return f"event: {event}\ndata: {payload.model_dump_json()}\n\n"
+
+
 @router.post(
     "/exams/{exam_id}/cards/generate-answers",
-    response_model=GenerateAnswersResponse,
-    description="Generate AI answers for exam cards using OpenRouter AI",
+    response_model=GenerationJobResponse,
+    status_code=202,
+    description="Start AI answer generation for exam cards, returns job to poll",
 )
 def generate_answers(
     exam_id: UUID,
     request: GenerateAnswersRequest | None = None,
     db: Session = Depends(get_db),
     user_id: UUID = Depends(get_current_user_id),
-) -> GenerateAnswersResponse:
+) -> GenerationJobResponse:
     if not UserRepo.check_that_user_is_creator(user_id, exam_id, db):
         raise UserIsNotEditor("User is not editor")
 
@@ -133,36 +234,53 @@ def generate_answers(
     else:
         cards = all_cards
 
-    ai_generator = AiAnswerGenerator()
-    card_pairs = [(c.card_id, c.question) for c in cards]
-    results = ai_generator.generate_answers_batch(card_pairs)
-
-    card_lookup = {c.card_id: c for c in cards}
-    response_cards: list[CardGenerationResult] = []
-    successful = 0
-    failed = 0
-
-    for result in results:
-        card = card_lookup[result.card_id]
-        if result.success:
-            successful += 1
-        else:
-            failed += 1
-
-        response_cards.append(
-            CardGenerationResult(
-                card_id=card.card_id,
-                number=card.number,
-                question=card.question,
-                answer=result.answer,
-                success=result.success,
-                error=result.error,
-            )
-        )
-
-    return GenerateAnswersResponse(
-        total=len(results),
-        successful=successful,
-        failed=failed,
-        cards=response_cards,
+    job = generation_jobs.submit(
+        exam_id,
+        user_id,
+        [JobCard(c.card_id, c.number, c.question) for c in cards],
+        AiAnswerGenerator(cache=answer_cache if settings.AI_CACHE_ENABLED else None),
+        apply=request is not None and request.apply,
     )
+    return build_job_response(job)
+
+
+@router.get(
+    "/exams/{exam_id}/cards/generate-answers/{job_id}",
+    response_model=GenerationJobResponse,
+    description="Progress and ready results of an answer generation job",
+)
+def get_generation_job(
+    exam_id: UUID,
+    job_id: str,
+    user_id: UUID = Depends(get_current_user_id),
+) -> GenerationJobResponse:
+    return build_job_response(generation_jobs.get(job_id, exam_id, user_id))
+
+
+@router.get(
+    "/exams/{exam_id}/cards/generate-answers/{job_id}/events",
+    description="Server-sent events: a `card` event per ready answer, then `done`",
+)
+async def stream_generation_job(
+    exam_id: UUID,
+    job_id: str,
+    user_id: UUID = Depends(get_current_user_id),
+) -> StreamingResponse:
+    job = generation_jobs.get(job_id, exam_id, user_id)
+
+    async def events() -> AsyncIterator[str]:
+        sent = 0
+        while True:
+            finished = job.is_finished
+            ready = job.completed[sent:]
+            for index in ready:
+                yield sse_event(
+                    "card", build_card_result(job.cards[index], job.results[index])
+                )
+            sent += len(ready)
+            if finished and sent == job.done:
+                yield sse_event("done", build_job_response(job))
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
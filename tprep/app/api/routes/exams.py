@@ -1,11 +1,12 @@
 from typing import List
 from uuid import UUID
 
+import httpx
 from fastapi import APIRouter, Depends, Query, HTTPException
-from requests import HTTPError
-from requests.exceptions import RequestException
 from sqlalchemy.orm import Session
 
+from config import settings
+from tprep.infrastructure.ai_cache.ocr_cache import ocr_cache
 from tprep.infrastructure.exam.exam import Card, Exam, UserExams
 from tprep.infrastructure.authorization import get_current_user_id
 from tprep.infrastructure.exam.exam_repo import ExamRepo
@@ -17,7 +18,9 @@ from tprep.infrastructure.ocr import (
     OcrConfigurationError,
     OcrParseError,
     cards_from_image,
+    cards_from_images,
 )
+from tprep.infrastructure.worker_pool import upload_pool
 
 from tprep.app.card_schemas import CardResponse
 from tprep.app.exam_schemas import (
@@ -26,7 +29,12 @@ from tprep.app.exam_schemas import (
     ExamPinStatus,
     ExamRightsResponse,
 )
-from tprep.app.ocr_schemas import OcrRequest
+from tprep.app.ocr_schemas import (
+    OcrBatchRequest,
+    OcrBatchResponse,
+    OcrImageResult,
+    OcrRequest,
+)
 
 router = APIRouter(tags=["Exams"])
 
@@ -244,42 +252,46 @@ def get_exam_editors(
     return ExamRightsResponse(user_id=editor_ids)
 
 
+# Порядок важен: FileNotFoundError — подкласс OSError, OcrParseError — ValueError
+OCR_ERRORS: list[tuple[type[Exception], int, str | None]] = [
+    (FileNotFoundError, 404, "Image file not found"),
+    (OcrParseError, 422, None),
+    (ValueError, 400, None),
+    (OSError, 400, "Cannot read image"),
+    (OcrConfigurationError, 503, None),
+    (RuntimeError, 502, None),
+    (httpx.HTTPStatusError, 502, "OCR provider returned an error"),
+    (httpx.HTTPError, 502, "OCR service request failed"),
+]
+OCR_EXCEPTIONS = tuple(exc_type for exc_type, _, _ in OCR_ERRORS)
+
+
+def ocr_http_error(exc: Exception) -> HTTPException:
+    for exc_type, status_code, detail in OCR_ERRORS:
+        if isinstance(exc, exc_type):
+            return HTTPException(status_code=status_code, detail=detail or str(exc))
+    raise exc
+
+
 @router.post("/exams/{exam_id}/ocr", response_model=list[CardResponse])
-def ocr_create_cards(
+async def ocr_create_cards(
     exam_id: UUID,
     payload: OcrRequest,
     user_id: UUID = Depends(get_current_user_id),
     db: Session = Depends(get_db),
 ) -> list[Card]:
-    if not ExamRepo.user_can_edit_exam(user_id, exam_id, db):
+    if not await upload_pool.run(ExamRepo.user_can_edit_exam, user_id, exam_id, db):
         raise UserIsNotEditor("User has no rights to edit this exam")
 
-    ExamRepo.get_exam(exam_id, db)
+    await upload_pool.run(ExamRepo.get_exam, exam_id, db)
 
     try:
-        cards_data = cards_from_image(payload.image_name)
-    except FileNotFoundError as exc:
-        raise HTTPException(status_code=404, detail="Image file not found") from exc
-    except OcrParseError as exc:
-        raise HTTPException(status_code=422, detail=str(exc)) from exc
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    except OSError as exc:
-        raise HTTPException(status_code=400, detail="Cannot read image") from exc
-    except OcrConfigurationError as exc:
-        raise HTTPException(status_code=503, detail=str(exc)) from exc
-    except RuntimeError as exc:
-        raise HTTPException(status_code=502, detail=str(exc)) from exc
-    except HTTPError as exc:
-        raise HTTPException(
-            status_code=502,
-            detail="OCR provider returned an error",
-        ) from exc
-    except RequestException as exc:
-        raise HTTPException(
-            status_code=502,
-            detail="OCR service request failed",
-        ) from exc
+        cards_data = await cards_from_image(
+            payload.image_name,
+            cache=ocr_cache if settings.OCR_CACHE_ENABLED else None,
+        )
+    except OCR_EXCEPTIONS as exc:
+        raise ocr_http_error(exc) from exc
 
     if not cards_data:
         raise HTTPException(
@@ -287,4 +299,50 @@ def ocr_create_cards(
             detail="No cards could be parsed from the image",
         )
 
-    return ExamRepo.create_card_by_list(exam_id, cards_data, db)
\ No newline at end of file
+    return await upload_pool.run(ExamRepo.create_card_by_list, exam_id, cards_data, db)
+
+
+@router.post("/exams/{exam_id}/ocr/batch", response_model=OcrBatchResponse)
+async def ocr_batch_create_cards(
+    exam_id: UUID,
+    payload: OcrBatchRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    db: Session = Depends(get_db),
+) -> OcrBatchResponse:
+    if not await upload_pool.run(ExamRepo.user_can_edit_exam, user_id, exam_id, db):
+        raise UserIsNotEditor("User has no rights to edit this exam")
+
+    await upload_pool.run(ExamRepo.get_exam, exam_id, db)
+
+    pages = await cards_from_images(
+        payload.image_names,
+        concurrency=settings.OCR_BATCH_CONCURRENCY,
+        cache=ocr_cache if settings.OCR_CACHE_ENABLED else None,
+    )
+
+    # Карточки склеиваются в порядке страниц и вставляются одним INSERT
+    cards_data: list[tuple[str, str]] = []
+    images: list[OcrImageResult] = []
+    for image_name, page in zip(payload.image_names, pages):
+        if isinstance(page, Exception):
+            if not isinstance(page, OCR_EXCEPTIONS):
+                raise page
+            error = ocr_http_error(page)
+            images.append(
+                OcrImageResult(
+                    image_name=image_name,
+                    success=False,
+                    status_code=error.status_code,
+                    error=str(error.detail),
+                )
+            )
+            continue
+        cards_data.extend(page)
+        images.append(
+            OcrImageResult(image_name=image_name, success=True, cards_count=len(page))
+        )
+
+    cards = await upload_pool.run(ExamRepo.create_card_by_list, exam_id, cards_data, db)
+    return OcrBatchResponse(
+        cards=[CardResponse.model_validate(card) for card in cards], images=images
+    )
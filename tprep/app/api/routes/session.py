@@ -6,7 +6,12 @@ from sqlalchemy.orm import Session
 from tprep.infrastructure.authorization import get_current_user_id
 from tprep.infrastructure.database import get_db
 from tprep.domain.services.session_factory import SessionFactory
-from tprep.app.session_schemas import ExamSessionResponse, ExamSessionStartRequest
+from tprep.app.session_schemas import (
+    ExamSessionAnswersRequest,
+    ExamSessionResponse,
+    ExamSessionStartRequest,
+    SessionStoreStatsResponse,
+)
 from tprep.infrastructure.exceptions.session_not_found import SessionNotFound
 from tprep.infrastructure.exceptions.user_not_found import UserNotFound
 from tprep.infrastructure.exceptions.exam_not_found import ExamNotFound
@@ -38,9 +43,14 @@ def start_exam_session(
     return ExamSessionResponse.model_validate(session)
 
 
+@router.get("/store/stats", response_model=SessionStoreStatsResponse)
+def get_session_store_stats() -> SessionStoreStatsResponse:
+    return SessionStoreStatsResponse.model_validate(SessionFactory.store_stats())
+
+
 @router.get("/{session_id}", response_model=ExamSessionResponse)
 def get_exam_session(session_id: str) -> ExamSessionResponse:
-    session = SessionFactory.get_session_by_id(session_id)
+    session = SessionFactory.find_session(session_id)
     if session is None:
         raise SessionNotFound("Session not found")
 
@@ -51,10 +61,27 @@ def get_exam_session(session_id: str) -> ExamSessionResponse:
 def set_answer(
     session_id: str, question_id: int, value: bool, db: Session = Depends(get_db)
 ) -> dict[str, str]:
-    session = SessionFactory.get_session_by_id(session_id)
+    session = SessionFactory.find_session(session_id)
     if session is None:
         raise SessionNotFound("Session not found")
 
     session.set_answer(question_id, value, db)
+    SessionFactory.save_session(session)
 
     return {"status": "ok"}
+
+
+@router.post("/{session_id}/answers", response_model=ExamSessionResponse)
+def set_answers(
+    session_id: str,
+    request: ExamSessionAnswersRequest,
+    db: Session = Depends(get_db),
+) -> ExamSessionResponse:
+    session = SessionFactory.find_session(session_id)
+    if session is None:
+        raise SessionNotFound("Session not found")
+
+    session.set_answers([(a.question_id, a.value) for a in request.answers], db)
+    SessionFactory.save_session(session)
+
+    return ExamSessionResponse.model_validate(session)
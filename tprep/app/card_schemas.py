@@ -14,15 +14,22 @@ class CardResponse(CardBase):
         from_attributes = True
 
 
+class CardPageResponse(BaseModel):
+    cards: list[CardResponse]
+    next_cursor: str | None = None
+
+
 class GenerateAnswersRequest(BaseModel):
     card_ids: list[int] | None = None
+    # Сразу записать успешные ответы в карточки одним UPDATE
+    apply: bool = False
 
 
 class CardGenerationResult(BaseModel):
     card_id: int
     number: int
     question: str
-    answer: str
+    answer: str | None = None
     success: bool
     error: str | None = None
 
@@ -34,4 +41,30 @@ class GenerateAnswersResponse(BaseModel):
     total: int
     successful: int
     failed: int
+    cache_hits: int = 0
+    cache_misses: int = 0
+    unique_questions: int = 0
+    dedup_ratio: float = 0.0
     cards: list[CardGenerationResult]
+
+
+class GenerationJobResponse(GenerateAnswersResponse):
+    job_id: str
+    status: str
+    done: int
+    apply: bool = False
+    applied: int = 0
+    error: str | None = None
+
+
+class WorkerPoolStatsResponse(BaseModel):
+    name: str
+    max_workers: int
+    max_queue: int | None = None
+    queued: int
+    running: int
+    completed: int
+    rejected: int
+
+    class Config:
+        from_attributes = True
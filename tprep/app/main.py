@@ -1,3 +1,4 @@
+import asyncio
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator, Callable, Coroutine
 
@@ -14,6 +15,11 @@ from tprep.app.api.routes.session import router as session_router
 from tprep.app.api.routes.users import router as users_router
 from tprep.app.api.routes.push import router as push_router
 from tprep.app.api.routes.notifications import router as notifications_router
+from tprep.domain.services.generation_jobs import generation_pool
+from tprep.domain.services.session_factory import SessionFactory
+from tprep.infrastructure.ai_cache.answer_cache import answer_cache
+from tprep.infrastructure.ai_cache.ocr_cache import ocr_cache
+from tprep.infrastructure.statistic.mistake_buffer import mistake_buffer
 from tprep.infrastructure.exceptions.UnexceptableStrategy import UnexceptableStrategy
 from tprep.infrastructure.exceptions.ai_generation_failed import AiGenerationFailed
 from tprep.infrastructure.exceptions.card_not_found import CardNotFound
@@ -22,9 +28,13 @@ from tprep.infrastructure.exceptions.exam_not_found import ExamNotFound
 from tprep.infrastructure.exceptions.file_decode import FileDecode
 from tprep.infrastructure.exceptions.file_extension import FileExtension
 from tprep.infrastructure.exceptions.file_parsing import FileParsing
+from tprep.infrastructure.exceptions.generation_job_not_found import (
+    GenerationJobNotFound,
+)
 from tprep.infrastructure.exceptions.invalid_authorization_header import (
     InvalidAuthorizationHeader,
 )
+from tprep.infrastructure.exceptions.invalid_cursor import InvalidCursor
 from tprep.infrastructure.exceptions.invalid_or_expired_token import (
     InvalidOrExpiredToken,
 )
@@ -34,7 +44,11 @@ from tprep.infrastructure.exceptions.user_already_exists import UserAlreadyExist
 from tprep.infrastructure.exceptions.user_is_not_creator import UserIsNotEditor
 from tprep.infrastructure.exceptions.user_not_found import UserNotFound
 from tprep.infrastructure.exceptions.wrong_login_or_password import WrongLoginOrPassword
+from tprep.infrastructure.exceptions.worker_pool_busy import WorkerPoolBusy
 from tprep.infrastructure.exceptions.wrong_n_value import WrongNValue
+from tprep.infrastructure.image_preprocessing import shutdown_preprocess_pool
+from tprep.infrastructure.ocr_providers import close_ocr_client
+from tprep.infrastructure.worker_pool import upload_pool
 
 APP_ERRORS = {
     Exception: status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -55,12 +69,72 @@ APP_ERRORS = {
     InvalidAuthorizationHeader: status.HTTP_401_UNAUTHORIZED,
     UnexceptableStrategy: status.HTTP_422_UNPROCESSABLE_ENTITY,
     AiGenerationFailed: status.HTTP_502_BAD_GATEWAY,
+    InvalidCursor: status.HTTP_400_BAD_REQUEST,
+    WorkerPoolBusy: status.HTTP_503_SERVICE_UNAVAILABLE,
+    GenerationJobNotFound: status.HTTP_404_NOT_FOUND,
 }
 
 
+async def sweep_sessions(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(SessionFactory.sweep_expired)
+        except Exception as e:
+            print(f"Failed to sweep exam sessions: {e}")
+
+
+async def evict_caches(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        for cache in (answer_cache, ocr_cache):
+            try:
+                await asyncio.to_thread(cache.evict)
+            except Exception as e:
+                print(f"Failed to evict {type(cache).__name__}: {e}")
+
+
+async def flush_mistakes(interval_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(mistake_buffer.flush)
+        except Exception as e:
+            print(f"Failed to flush mistake statistics: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, Any]:
+    background = [
+        asyncio.create_task(
+            sweep_sessions(settings.SESSION_SWEEP_INTERVAL_SECONDS),
+            name="sweep_sessions",
+        ),
+        asyncio.create_task(
+            flush_mistakes(settings.STATS_FLUSH_INTERVAL_SECONDS),
+            name="flush_mistakes",
+        ),
+        asyncio.create_task(
+            evict_caches(settings.AI_CACHE_EVICT_INTERVAL_SECONDS),
+            name="evict_caches",
+        ),
+    ]
     yield
+    for task in background:
+        task.cancel()
+    for task in background:
+        # Упавшая фоновая задача не должна помешать сбросить статистику ниже
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"Background task {task.get_name()} failed: {e}")
+    await asyncio.to_thread(mistake_buffer.flush)
+    await asyncio.to_thread(upload_pool.shutdown)
+    await asyncio.to_thread(generation_pool.shutdown)
+    await close_ocr_client()
+    await asyncio.to_thread(shutdown_preprocess_pool)
 
 
 def add_exception_handlers(
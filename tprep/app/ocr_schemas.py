@@ -1,5 +1,29 @@
 from pydantic import BaseModel, Field
 
+from tprep.app.card_schemas import CardResponse
+
 
 class OcrRequest(BaseModel):
     image_name: str = Field(..., description="File name or relative path under images/")
+
+
+class OcrBatchRequest(BaseModel):
+    image_names: list[str] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Pages in order: file names or relative paths under images/",
+    )
+
+
+class OcrImageResult(BaseModel):
+    image_name: str
+    success: bool
+    cards_count: int = 0
+    status_code: int | None = None
+    error: str | None = None
+
+
+class OcrBatchResponse(BaseModel):
+    cards: list[CardResponse]
+    images: list[OcrImageResult]
@@ -16,6 +16,26 @@ class ExamSessionResponse(BaseModel):
         from_attributes = True
 
 
+class SessionAnswer(BaseModel):
+    question_id: int
+    value: bool
+
+
+class ExamSessionAnswersRequest(BaseModel):
+    answers: List[SessionAnswer]
+
+
+class SessionStoreStatsResponse(BaseModel):
+    size: int
+    max_entries: Optional[int] = None
+    idle_ttl_seconds: Optional[float] = None
+    expired: int = 0
+    evicted: int = 0
+
+    class Config:
+        from_attributes = True
+
+
 class ExamSessionStartRequest(BaseModel):
     exam_id: UUID
     strategy: str = "full"
@@ -1,3 +1,4 @@
+from array import array
 from datetime import datetime
 from typing import List
 from uuid import UUID, uuid4
@@ -5,24 +6,93 @@ from uuid import UUID, uuid4
 from sqlalchemy.orm import Session
 
 from tprep.infrastructure.exceptions.question_not_in_session import QuestionNotInSession
-from tprep.infrastructure.statistic.stat_repo import StatRepo
+from tprep.infrastructure.statistic.mistake_buffer import mistake_buffer
+from tprep.infrastructure.statistic.stat_repo import MistakeKey, StatRepo
 
 
 class ExamSession:
+    # Тысячи сессий живут в одном воркере, поэтому без __dict__ на каждую
+    __slots__ = (
+        "user_id",
+        "exam_id",
+        "_question_ids",
+        "_question_set",
+        "id",
+        "created_at",
+        "last_activity_at",
+        "answers",
+    )
+
     def __init__(self, user_id: UUID, exam_id: UUID, questions: List[int]):
         self.user_id: UUID = user_id
         self.exam_id: UUID = exam_id
-        self.questions: List[int] = questions
+        # Порядок вопросов храним компактным массивом, проверку принадлежности — по set
+        self._question_ids = array("q", questions)
+        self._question_set = frozenset(questions)
 
         self.id = str(uuid4())
         self.created_at = datetime.utcnow()
+        self.last_activity_at = self.created_at
         self.answers: dict[int, bool] = {}
 
+    @classmethod
+    def restore(
+        cls,
+        session_id: str,
+        user_id: UUID,
+        exam_id: UUID,
+        questions: List[int],
+        answers: dict[int, bool],
+        created_at: datetime,
+    ) -> "ExamSession":
+        session = cls(user_id, exam_id, questions)
+        session.id = session_id
+        session.created_at = created_at
+        session.last_activity_at = created_at
+        session.answers = answers
+        return session
+
+    @property
+    def questions(self) -> List[int]:
+        return self._question_ids.tolist()
+
+    def has_question(self, question_id: int) -> bool:
+        return question_id in self._question_set
+
+    def touch(self) -> None:
+        self.last_activity_at = datetime.utcnow()
+
+    @property
+    def is_finished(self) -> bool:
+        return len(self.answers) >= len(self._question_set)
+
     def set_answer(self, question_id: int, is_right: bool, db: Session) -> None:
-        if question_id not in self.questions:
+        if not self.has_question(question_id):
             raise QuestionNotInSession(
                 f"Question {question_id} is not part of this session."
             )
         self.answers[question_id] = is_right
+        self.touch()
         if not is_right:
-            StatRepo.inc_mistakes(self.user_id, question_id, db)
+            mistake_buffer.add(self.user_id, question_id, self.exam_id, db)
+        if self.is_finished:
+            mistake_buffer.try_flush(db)
+
+    def set_answers(self, answers: List[tuple[int, bool]], db: Session) -> None:
+        """Записывает пачку ответов; статистика ошибок пишется одной транзакцией."""
+        missing = sorted(
+            {question_id for question_id, _ in answers} - self._question_set
+        )
+        if missing:
+            raise QuestionNotInSession(
+                f"Questions {missing} are not part of this session."
+            )
+
+        mistakes: dict[MistakeKey, int] = {}
+        for question_id, is_right in answers:
+            self.answers[question_id] = is_right
+            if not is_right:
+                key = (self.user_id, question_id, self.exam_id)
+                mistakes[key] = mistakes.get(key, 0) + 1
+        self.touch()
+        StatRepo.add_mistakes(mistakes, db)
@@ -1,9 +1,17 @@
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, replace
+from typing import Iterator
 
 from openai import OpenAI
 
 from config import settings
+from tprep.infrastructure.ai_cache.answer_cache import (
+    AnswerCache,
+    answer_cache_key,
+    normalize_question,
+)
 from tprep.infrastructure.exceptions.ai_generation_failed import AiGenerationFailed
+from tprep.infrastructure.rate_limiter import OutboundLimiter, openrouter_limiter
 
 
 @dataclass
@@ -12,9 +20,14 @@ class GenerationResult:
     answer: str | None
     success: bool
     error: str | None = None
+    # True — ответ из кэша, False — промах кэша, None — кэш не спрашивали
+    cached: bool | None = None
+    # True — копия результата для повторяющегося вопроса, модель не вызывалась
+    deduplicated: bool = False
 
 
 class AiAnswerGenerator:
+    BASE_URL = "https://openrouter.ai/api/v1"
     MODEL = "arcee-ai/trinity-large-preview:free"
     MAX_ANSWER_LENGTH = 490
 
@@ -26,24 +39,38 @@ class AiAnswerGenerator:
         "Answer in russian"
     )
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        base_url: str | None = None,
+        max_in_flight: int | None = None,
+        cache: AnswerCache | None = None,
+        limiter: OutboundLimiter | None = None,
+    ) -> None:
         if not settings.OPENROUTER_API_KEY:
             raise AiGenerationFailed("OPENROUTER_API_KEY is not configured")
+        self.max_in_flight = max_in_flight or settings.AI_MAX_IN_FLIGHT
+        self._cache = cache
+        self._limiter = limiter or openrouter_limiter
+        # Повторы делает limiter, чтобы учитывать общий лимит и Retry-After
         self._client = OpenAI(
-            base_url="https://openrouter.ai/api/v1",
+            base_url=base_url or self.BASE_URL,
             api_key=settings.OPENROUTER_API_KEY,
+            max_retries=0,
         )
 
     def generate_answer(self, question: str) -> str:
         try:
-            response = self._client.chat.completions.create(
-                model=self.MODEL,
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": question},
-                ],
-                max_tokens=256,
-                temperature=0.3,
+            response = self._limiter.call(
+                self.MODEL,
+                lambda: self._client.chat.completions.create(
+                    model=self.MODEL,
+                    messages=[
+                        {"role": "system", "content": self.SYSTEM_PROMPT},
+                        {"role": "user", "content": question},
+                    ],
+                    max_tokens=256,
+                    temperature=0.3,
+                ),
             )
             text = response.choices[0].message.content
             if text is None:
@@ -58,30 +85,97 @@ class AiAnswerGenerator:
                 f"OpenRouter API error for question '{question[:50]}...': {e}"
             )
 
-    def generate_answers_batch(
+    def generate_result(self, card_id: int, question: str) -> GenerationResult:
+        if not question.strip():
+            return GenerationResult(
+                card_id=card_id,
+                answer=None,
+                success=False,
+                error="Empty question, cannot generate answer",
+            )
+        cached = None if self._cache is None else False
+        try:
+            answer = self.generate_answer(question)
+        except AiGenerationFailed as e:
+            return GenerationResult(
+                card_id=card_id,
+                answer=None,
+                success=False,
+                error=e.message,
+                cached=cached,
+            )
+        if self._cache is not None:
+            self._cache.put(self.cache_key(question), self.MODEL, answer)
+        return GenerationResult(
+            card_id=card_id, answer=answer, success=True, cached=cached
+        )
+
+    def cache_key(self, question: str) -> str:
+        return answer_cache_key(question, self.MODEL, self.SYSTEM_PROMPT)
+
+    def iter_answers(
         self, cards: list[tuple[int, str]]
-    ) -> list[GenerationResult]:
-        results: list[GenerationResult] = []
-        for card_id, question in cards:
-            if not question.strip():
-                results.append(
+    ) -> Iterator[tuple[int, GenerationResult]]:
+        """Отдаёт (индекс карточки, результат) по мере готовности,
+        не больше max_in_flight запросов сразу. Ответы из кэша — первыми,
+        повторяющиеся вопросы генерируются один раз."""
+        pending = list(enumerate(cards))
+        if self._cache is not None:
+            keys = {
+                index: self.cache_key(question)
+                for index, (_, question) in pending
+                if question.strip()
+            }
+            hits = self._cache.get_many(list(set(keys.values())))
+            missed = []
+            for index, (card_id, question) in pending:
+                answer = hits.get(keys.get(index, ""))
+                if answer is None:
+                    missed.append((index, (card_id, question)))
+                    continue
+                yield (
+                    index,
                     GenerationResult(
-                        card_id=card_id,
-                        answer=None,
-                        success=False,
-                        error="Empty question, cannot generate answer",
-                    )
+                        card_id=card_id, answer=answer, success=True, cached=True
+                    ),
                 )
-                continue
-            try:
-                answer = self.generate_answer(question)
-                results.append(
-                    GenerationResult(card_id=card_id, answer=answer, success=True)
-                )
-            except AiGenerationFailed as e:
-                results.append(
-                    GenerationResult(
-                        card_id=card_id, answer=None, success=False, error=e.message
-                    )
-                )
-        return results
+            pending = missed
+
+        # Одинаковые (после нормализации) вопросы отправляем в модель один раз
+        groups: dict[str, list[tuple[int, int]]] = {}
+        unique: list[tuple[str, int, str]] = []
+        for index, (card_id, question) in pending:
+            group_key = normalize_question(question) or f"\0{index}"
+            if group_key not in groups:
+                groups[group_key] = []
+                unique.append((group_key, card_id, question))
+            groups[group_key].append((index, card_id))
+
+        def fan_out(
+            group_key: str, result: GenerationResult
+        ) -> Iterator[tuple[int, GenerationResult]]:
+            for position, (index, card_id) in enumerate(groups[group_key]):
+                yield index, replace(result, card_id=card_id, deduplicated=position > 0)
+
+        if self.max_in_flight <= 1 or len(unique) <= 1:
+            for group_key, card_id, question in unique:
+                yield from fan_out(group_key, self.generate_result(card_id, question))
+            return
+
+        workers = min(self.max_in_flight, len(unique))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.generate_result, card_id, question): group_key
+                for group_key, card_id, question in unique
+            }
+            for future in as_completed(futures):
+                yield from fan_out(futures[future], future.result())
+
+    def generate_answers_batch(
+        self, cards: list[tuple[int, str]]
+    ) -> list[GenerationResult]:
+        """Генерирует ответы параллельно, результаты — в порядке входных карточек."""
+        results: list[GenerationResult | None] = [None] * len(cards)
+        for index, result in self.iter_answers(cards):
+            results[index] = result
+        return [result for result in results if result is not None]
@@ -0,0 +1,198 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from threading import Lock
+from uuid import UUID, uuid4
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from config import settings
+from tprep.domain.services.ai_answer_generator import (
+    AiAnswerGenerator,
+    GenerationResult,
+)
+from tprep.infrastructure.ai_cache.answer_cache import normalize_question
+from tprep.infrastructure.database import SessionLocal
+from tprep.infrastructure.exam.exam_repo import ExamRepo
+from tprep.infrastructure.exceptions.generation_job_not_found import (
+    GenerationJobNotFound,
+)
+from tprep.infrastructure.worker_pool import WorkerPool
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class JobCard:
+    card_id: int
+    number: int
+    question: str
+
+
+@dataclass
+class GenerationJob:
+    exam_id: UUID
+    user_id: UUID
+    cards: list[JobCard]
+    # Записать успешные ответы в карточки после генерации
+    apply: bool = False
+    applied: int = 0
+    id: str = field(default_factory=lambda: str(uuid4()))
+    status: JobStatus = JobStatus.QUEUED
+    error: str | None = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    finished_at: datetime | None = None
+    # Индексы карточек в порядке готовности и результаты по индексу
+    completed: list[int] = field(default_factory=list)
+    results: dict[int, GenerationResult] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return len(self.cards)
+
+    @property
+    def done(self) -> int:
+        return len(self.completed)
+
+    @property
+    def successful(self) -> int:
+        return sum(1 for r in list(self.results.values()) if r.success)
+
+    @property
+    def failed(self) -> int:
+        return self.done - self.successful
+
+    @property
+    def unique_questions(self) -> int:
+        return len(
+            {
+                normalize_question(card.question) or f"\0{index}"
+                for index, card in enumerate(self.cards)
+            }
+        )
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Доля карточек, ответ для которых переиспользован от дубликата."""
+        if not self.cards:
+            return 0.0
+        return 1 - self.unique_questions / self.total
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for r in list(self.results.values()) if r.cached is True)
+
+    @property
+    def cache_misses(self) -> int:
+        """Промахи по уникальным вопросам: копии для дубликатов учтены в dedup_ratio."""
+        return sum(
+            1
+            for r in list(self.results.values())
+            if r.cached is False and not r.deduplicated
+        )
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.DONE, JobStatus.FAILED)
+
+    def ordered_results(self) -> list[tuple[JobCard, GenerationResult]]:
+        """Готовые результаты в порядке карточек."""
+        return [
+            (self.cards[index], self.results[index]) for index in sorted(self.completed)
+        ]
+
+
+class GenerationJobQueue:
+    """In-process очередь генерации ответов.
+
+    Задачи выполняет ограниченный WorkerPool, готовые задачи хранятся
+    `ttl_seconds` после завершения, чтобы клиент успел забрать результат.
+    """
+
+    def __init__(
+        self,
+        pool: WorkerPool,
+        ttl_seconds: float,
+        session_factory: sessionmaker[Session] = SessionLocal,
+    ) -> None:
+        self._pool = pool
+        self._session_factory = session_factory
+        self._ttl = timedelta(seconds=ttl_seconds)
+        self._jobs: dict[str, GenerationJob] = {}
+        self._lock = Lock()
+
+    def submit(
+        self,
+        exam_id: UUID,
+        user_id: UUID,
+        cards: list[JobCard],
+        generator: AiAnswerGenerator,
+        apply: bool = False,
+    ) -> GenerationJob:
+        self.prune()
+        job = GenerationJob(exam_id=exam_id, user_id=user_id, cards=cards, apply=apply)
+        self._pool.submit(self._run, job, generator)
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str, exam_id: UUID, user_id: UUID) -> GenerationJob:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.exam_id != exam_id or job.user_id != user_id:
+            raise GenerationJobNotFound(f"Generation job {job_id} not found")
+        return job
+
+    def prune(self) -> int:
+        """Удаляет завершённые задачи старше ttl."""
+        threshold = datetime.utcnow() - self._ttl
+        with self._lock:
+            stale = [
+                job_id
+                for job_id, job in self._jobs.items()
+                if job.finished_at is not None and job.finished_at < threshold
+            ]
+            for job_id in stale:
+                del self._jobs[job_id]
+        return len(stale)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def _run(self, job: GenerationJob, generator: AiAnswerGenerator) -> None:
+        job.status = JobStatus.RUNNING
+        try:
+            pairs = [(card.card_id, card.question) for card in job.cards]
+            for index, result in generator.iter_answers(pairs):
+                job.results[index] = result
+                job.completed.append(index)
+            if job.apply:
+                self._apply(job)
+            job.status = JobStatus.DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+
+    def _apply(self, job: GenerationJob) -> None:
+        answers = {
+            result.card_id: result.answer
+            for result in job.results.values()
+            if result.success and result.answer is not None
+        }
+        with self._session_factory() as db:
+            job.applied = ExamRepo.update_card_answers(job.exam_id, answers, db)
+
+
+generation_pool = WorkerPool(
+    "ai-jobs",
+    max_workers=settings.AI_JOB_WORKERS,
+    max_queue=settings.AI_JOB_MAX_QUEUE,
+)
+generation_jobs = GenerationJobQueue(generation_pool, settings.AI_JOB_TTL_SECONDS)
@@ -1,10 +1,17 @@
 from random import sample
+from typing import MutableMapping
 from uuid import UUID
 
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
+from config import settings
 from tprep.domain.exam_session import ExamSession
+from tprep.domain.services.session_store import (
+    SessionStore,
+    SessionStoreStats,
+    build_session_store,
+)
 from tprep.infrastructure import Exam, Card, User, Statistic
 from tprep.infrastructure.exceptions.UnexceptableStrategy import UnexceptableStrategy
 from tprep.infrastructure.exceptions.exam_has_no_cards import ExamHasNoCards
@@ -15,7 +22,11 @@ strategy_enum = ["full", "random", "smart"]
 
 
 class SessionFactory:
-    session_ids: dict[str, ExamSession] = {}
+    session_ids: MutableMapping[str, ExamSession] = build_session_store(
+        settings.SESSION_STORE_BACKEND,
+        max_entries=settings.SESSION_MAX_ENTRIES,
+        idle_ttl_seconds=settings.SESSION_IDLE_TTL_SECONDS,
+    )
 
     @staticmethod
     def create_session(
@@ -54,6 +65,28 @@ class SessionFactory:
     def get_session_by_id(session_id: str) -> ExamSession | None:
         return SessionFactory.session_ids[session_id]
 
+    @staticmethod
+    def find_session(session_id: str) -> ExamSession | None:
+        return SessionFactory.session_ids.get(session_id)
+
+    @staticmethod
+    def save_session(session: ExamSession) -> None:
+        SessionFactory.session_ids[session.id] = session
+
+    @staticmethod
+    def sweep_expired() -> int:
+        store = SessionFactory.session_ids
+        if isinstance(store, SessionStore):
+            return store.sweep()
+        return 0
+
+    @staticmethod
+    def store_stats() -> SessionStoreStats:
+        store = SessionFactory.session_ids
+        if isinstance(store, SessionStore):
+            return store.stats()
+        return SessionStoreStats(size=len(store))
+
     @staticmethod
     def get_smart_cards(
         user_id: UUID, exam_id: UUID, limit: int, db: Session = Depends(get_db)
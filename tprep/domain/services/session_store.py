@@ -0,0 +1,228 @@
+from abc import ABC
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Iterator, MutableMapping
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from tprep.domain.exam_session import ExamSession
+from tprep.infrastructure import ExamSessionDB
+from tprep.infrastructure.database import SessionLocal
+
+
+@dataclass
+class SessionStoreStats:
+    size: int
+    max_entries: int | None = None
+    idle_ttl_seconds: float | None = None
+    expired: int = 0
+    evicted: int = 0
+
+
+class SessionStore(MutableMapping[str, ExamSession], ABC):
+    """Хранилище активных ExamSession, ключ — id сессии."""
+
+    def sweep(self) -> int:
+        """Удаляет протухшие сессии, возвращает их количество."""
+        return 0
+
+    def stats(self) -> SessionStoreStats:
+        return SessionStoreStats(size=len(self))
+
+
+class InMemorySessionStore(SessionStore):
+    """Сессии живут в памяти текущего воркера.
+
+    Размер ограничен `max_entries` (вытесняется давно не использованная сессия),
+    сессия без активности дольше `idle_ttl_seconds` считается протухшей.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        idle_ttl_seconds: float | None = None,
+    ) -> None:
+        self._sessions: OrderedDict[str, ExamSession] = OrderedDict()
+        self._lock = Lock()
+        self.max_entries = max_entries
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.expired = 0
+        self.evicted = 0
+
+    def _is_expired(self, session: ExamSession, now: datetime) -> bool:
+        if self.idle_ttl_seconds is None:
+            return False
+        last_seen = max(session.created_at, session.last_activity_at)
+        return now - last_seen > timedelta(seconds=self.idle_ttl_seconds)
+
+    def __getitem__(self, session_id: str) -> ExamSession:
+        with self._lock:
+            session = self._sessions[session_id]
+            if self._is_expired(session, datetime.utcnow()):
+                del self._sessions[session_id]
+                self.expired += 1
+                raise KeyError(session_id)
+            self._sessions.move_to_end(session_id)
+            session.touch()
+            return session
+
+    def __setitem__(self, session_id: str, session: ExamSession) -> None:
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            if self.max_entries is not None:
+                while len(self._sessions) > self.max_entries:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+
+    def __delitem__(self, session_id: str) -> None:
+        with self._lock:
+            del self._sessions[session_id]
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._lock:
+            return session_id in self._sessions
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+    def sweep(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            expired_ids = [
+                session_id
+                for session_id, session in self._sessions.items()
+                if self._is_expired(session, now)
+            ]
+            for session_id in expired_ids:
+                del self._sessions[session_id]
+            self.expired += len(expired_ids)
+        return len(expired_ids)
+
+    def stats(self) -> SessionStoreStats:
+        return SessionStoreStats(
+            size=len(self._sessions),
+            max_entries=self.max_entries,
+            idle_ttl_seconds=self.idle_ttl_seconds,
+            expired=self.expired,
+            evicted=self.evicted,
+        )
+
+
+class PostgresSessionStore(SessionStore):
+    """Сессии хранятся в таблице exam_sessions и видны всем воркерам.
+
+    Строки старше `ttl_seconds` (по created_at) удаляет sweep().
+    """
+
+    def __init__(
+        self, session_factory: sessionmaker[Session], ttl_seconds: float | None = None
+    ) -> None:
+        self._session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.expired = 0
+
+    def __getitem__(self, session_id: str) -> ExamSession:
+        with self._session_factory() as db:
+            row = db.get(ExamSessionDB, session_id)
+            if row is None:
+                raise KeyError(session_id)
+            return ExamSession.restore(
+                session_id=row.id,
+                user_id=row.user_id,
+                exam_id=row.exam_id,
+                questions=list(row.questions),
+                answers={int(k): v for k, v in row.answers.items()},
+                created_at=row.created_at,
+            )
+
+    def __setitem__(self, session_id: str, session: ExamSession) -> None:
+        answers = {str(k): v for k, v in session.answers.items()}
+        stmt = insert(ExamSessionDB).values(
+            id=session_id,
+            user_id=session.user_id,
+            exam_id=session.exam_id,
+            questions=session.questions,
+            answers=answers,
+            created_at=session.created_at,
+        )
+        # Ответы сливаются с уже сохранёнными: воркеры пишут каждый свою копию сессии
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ExamSessionDB.id],
+            set_={"answers": ExamSessionDB.answers.op("||")(stmt.excluded.answers)},
+        )
+        with self._session_factory() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def __delitem__(self, session_id: str) -> None:
+        with self._session_factory() as db:
+            result = db.execute(
+                delete(ExamSessionDB).where(ExamSessionDB.id == session_id)
+            )
+            db.commit()
+        if not result.rowcount:
+            raise KeyError(session_id)
+
+    def __contains__(self, session_id: object) -> bool:
+        with self._session_factory() as db:
+            return (
+                db.scalar(
+                    select(ExamSessionDB.id).where(ExamSessionDB.id == session_id)
+                )
+                is not None
+            )
+
+    def __iter__(self) -> Iterator[str]:
+        with self._session_factory() as db:
+            return iter(db.scalars(select(ExamSessionDB.id)).all())
+
+    def __len__(self) -> int:
+        with self._session_factory() as db:
+            return db.scalar(select(func.count()).select_from(ExamSessionDB)) or 0
+
+    def clear(self) -> None:
+        with self._session_factory() as db:
+            db.execute(delete(ExamSessionDB))
+            db.commit()
+
+    def sweep(self) -> int:
+        if self.ttl_seconds is None:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        with self._session_factory() as db:
+            result = db.execute(
+                delete(ExamSessionDB).where(ExamSessionDB.created_at < cutoff)
+            )
+            db.commit()
+        self.expired += result.rowcount
+        return result.rowcount
+
+    def stats(self) -> SessionStoreStats:
+        return SessionStoreStats(
+            size=len(self), idle_ttl_seconds=self.ttl_seconds, expired=self.expired
+        )
+
+
+def build_session_store(
+    backend: str,
+    max_entries: int | None = None,
+    idle_ttl_seconds: float | None = None,
+) -> SessionStore:
+    if backend == "memory":
+        return InMemorySessionStore(max_entries, idle_ttl_seconds)
+    if backend == "postgres":
+        return PostgresSessionStore(SessionLocal, idle_ttl_seconds)
+    raise ValueError(f"Unknown session store backend: {backend}")
@@ -4,6 +4,9 @@ from tprep.infrastructure.user.user import User
 from tprep.infrastructure.exam.exam import Exam, Card, UserExams
 from tprep.infrastructure.notification.notificationdb import NotificationDB
 from tprep.infrastructure.statistic.statistic import Statistic
+from tprep.infrastructure.session.exam_sessiondb import ExamSessionDB
+from tprep.infrastructure.ai_cache.answer_cachedb import AnswerCacheDB
+from tprep.infrastructure.ai_cache.ocr_cachedb import OcrCacheDB
 
 __all__ = [
     "Base",
@@ -13,4 +16,7 @@ __all__ = [
     "UserExams",
     "NotificationDB",
     "Statistic",
+    "ExamSessionDB",
+    "AnswerCacheDB",
+    "OcrCacheDB",
 ]
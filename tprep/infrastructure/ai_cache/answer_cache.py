@@ -0,0 +1,98 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from config import settings
+from tprep.infrastructure.ai_cache.answer_cachedb import AnswerCacheDB
+from tprep.infrastructure.ai_cache.eviction import evict_expired_and_overflow
+from tprep.infrastructure.database import SessionLocal
+
+
+def normalize_question(question: str) -> str:
+    return " ".join(question.split()).casefold()
+
+
+def answer_cache_key(question: str, model: str, system_prompt: str) -> str:
+    payload = "\0".join((normalize_question(question), model, system_prompt))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """Кэш сгенерированных ответов в таблице ai_answer_cache.
+
+    Запись живёт `ttl_seconds` с момента создания, при превышении
+    `max_entries` вытесняются давно не использованные. Ошибки БД
+    не ломают генерацию: промах при чтении, пропуск при записи.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        session_factory: sessionmaker[Session] = SessionLocal,
+    ) -> None:
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self._session_factory = session_factory
+
+    def get_many(self, keys: list[str]) -> dict[str, str]:
+        if not keys:
+            return {}
+        now = datetime.utcnow()
+        try:
+            with self._session_factory() as db:
+                rows = db.execute(
+                    select(AnswerCacheDB.key, AnswerCacheDB.answer).where(
+                        AnswerCacheDB.key.in_(keys),
+                        AnswerCacheDB.created_at > now - self.ttl,
+                    )
+                ).all()
+                found = {key: answer for key, answer in rows}
+                if found:
+                    db.execute(
+                        update(AnswerCacheDB)
+                        .where(AnswerCacheDB.key.in_(found))
+                        .values(last_used_at=now)
+                    )
+                    db.commit()
+                return found
+        except SQLAlchemyError as e:
+            print(f"Answer cache lookup failed: {e}")
+            return {}
+
+    def put(self, key: str, model: str, answer: str) -> None:
+        now = datetime.utcnow()
+        stmt = insert(AnswerCacheDB).values(
+            key=key, model=model, answer=answer, created_at=now, last_used_at=now
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AnswerCacheDB.key],
+            set_={
+                "answer": stmt.excluded.answer,
+                "created_at": stmt.excluded.created_at,
+                "last_used_at": stmt.excluded.last_used_at,
+            },
+        )
+        try:
+            with self._session_factory() as db:
+                db.execute(stmt)
+                db.commit()
+        except SQLAlchemyError as e:
+            print(f"Answer cache write failed: {e}")
+
+    def evict(self) -> int:
+        """Удаляет протухшие записи и самые старые сверх max_entries."""
+        with self._session_factory() as db:
+            return evict_expired_and_overflow(
+                AnswerCacheDB, self.ttl, self.max_entries, db
+            )
+
+
+answer_cache = AnswerCache(
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    max_entries=settings.AI_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from tprep.infrastructure.models import Base
+
+
+class AnswerCacheDB(Base):
+    __tablename__ = "ai_answer_cache"
+
+    # sha256 от нормализованного вопроса, модели и системного промпта
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(255), nullable=False)
+    answer: Mapped[str] = mapped_column(Text, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_ai_answer_cache_created_at", "created_at"),
+        Index("idx_ai_answer_cache_last_used_at", "last_used_at"),
+    )
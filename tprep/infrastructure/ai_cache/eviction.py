@@ -0,0 +1,21 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+
+def evict_expired_and_overflow(
+    table: Any, ttl: timedelta, max_entries: int, db: Session
+) -> int:
+    """Удаляет записи старше ttl и самые давно использованные сверх max_entries.
+
+    Таблица должна иметь колонки key, created_at и last_used_at.
+    """
+    expired = db.execute(
+        delete(table).where(table.created_at <= datetime.utcnow() - ttl)
+    ).rowcount
+    keep = select(table.key).order_by(table.last_used_at.desc()).limit(max_entries)
+    overflow = db.execute(delete(table).where(table.key.not_in(keep))).rowcount
+    db.commit()
+    return expired + overflow
@@ -0,0 +1,109 @@
+import hashlib
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+
+from config import settings
+from tprep.infrastructure.ai_cache.eviction import evict_expired_and_overflow
+from tprep.infrastructure.ai_cache.ocr_cachedb import OcrCacheDB
+from tprep.infrastructure.database import SessionLocal
+from tprep.infrastructure.image_preprocessing import PreprocessOptions
+
+
+def ocr_cache_key(
+    image_path: str | Path,
+    model: str,
+    prompt: str,
+    provider: str,
+    preprocess: PreprocessOptions,
+) -> str:
+    """sha256 байтов изображения и всего, что влияет на ответ: модель, промпт,
+    провайдер (локальные фейковые карточки не должны попасть к пользователям)
+    и предобработка (от неё зависит, что видит модель)."""
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as image:
+        for chunk in iter(lambda: image.read(1024 * 1024), b""):
+            digest.update(chunk)
+    for part in (model, prompt, provider, repr(preprocess)):
+        digest.update(b"\0" + part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class OcrCache:
+    """Кэш распознанных карточек в таблице ocr_result_cache.
+
+    Как и AnswerCache: запись живёт `ttl_seconds`, сверх `max_entries`
+    вытесняются давно не использованные, ошибки БД — просто промах.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        session_factory: sessionmaker[Session] = SessionLocal,
+    ) -> None:
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self._session_factory = session_factory
+
+    def get(self, key: str) -> list[tuple[str, str]] | None:
+        now = datetime.utcnow()
+        try:
+            with self._session_factory() as db:
+                cards = db.scalar(
+                    select(OcrCacheDB.cards).where(
+                        OcrCacheDB.key == key, OcrCacheDB.created_at > now - self.ttl
+                    )
+                )
+                if cards is None:
+                    return None
+                db.execute(
+                    update(OcrCacheDB)
+                    .where(OcrCacheDB.key == key)
+                    .values(last_used_at=now)
+                )
+                db.commit()
+                return [(question, answer) for question, answer in cards]
+        except SQLAlchemyError as e:
+            print(f"OCR cache lookup failed: {e}")
+            return None
+
+    def put(self, key: str, model: str, cards: list[tuple[str, str]]) -> None:
+        now = datetime.utcnow()
+        stmt = insert(OcrCacheDB).values(
+            key=key,
+            model=model,
+            cards=[list(card) for card in cards],
+            created_at=now,
+            last_used_at=now,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OcrCacheDB.key],
+            set_={
+                "cards": stmt.excluded.cards,
+                "created_at": stmt.excluded.created_at,
+                "last_used_at": stmt.excluded.last_used_at,
+            },
+        )
+        try:
+            with self._session_factory() as db:
+                db.execute(stmt)
+                db.commit()
+        except SQLAlchemyError as e:
+            print(f"OCR cache write failed: {e}")
+
+    def evict(self) -> int:
+        with self._session_factory() as db:
+            return evict_expired_and_overflow(
+                OcrCacheDB, self.ttl, self.max_entries, db
+            )
+
+
+ocr_cache = OcrCache(
+    ttl_seconds=settings.OCR_CACHE_TTL_SECONDS,
+    max_entries=settings.OCR_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from tprep.infrastructure.models import Base
+
+
+class OcrCacheDB(Base):
+    __tablename__ = "ocr_result_cache"
+
+    # sha256 от байтов изображения, модели и промпта
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    model: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Список пар [question, answer]
+    cards: Mapped[list[list[str]]] = mapped_column(JSONB, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_used_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_ocr_result_cache_created_at", "created_at"),
+        Index("idx_ocr_result_cache_last_used_at", "last_used_at"),
+    )
@@ -109,7 +109,10 @@ class Card(Base):
 
     exam: Mapped["Exam"] = relationship("Exam", back_populates="cards")
 
-    __table_args__ = (Index("idx_cards_exam_id", "exam_id"),)
+    __table_args__ = (
+        Index("idx_cards_exam_id", "exam_id"),
+        Index("idx_cards_exam_id_number", "exam_id", "number", "card_id"),
+    )
 
     related_stat: Mapped[list["Statistic"]] = relationship(
         "Statistic",
@@ -1,6 +1,7 @@
 from uuid import UUID
 
 from fastapi import Depends
+from sqlalchemy import BigInteger, String, column, func, insert, tuple_, update, values
 from sqlalchemy.orm import Session
 
 from tprep.app.card_schemas import CardBase
@@ -9,6 +10,7 @@ from tprep.infrastructure import Exam, UserExams, Card
 from tprep.infrastructure.database import get_db
 from tprep.infrastructure.exceptions.card_not_found import CardNotFound
 from tprep.infrastructure.exceptions.exam_not_found import ExamNotFound
+from tprep.infrastructure.exceptions.invalid_cursor import InvalidCursor
 from tprep.infrastructure.exceptions.user_not_found import UserNotFound
 from tprep.infrastructure.user.user_repo import UserRepo
 
@@ -79,6 +81,31 @@ class ExamRepo:
         cards = db.query(Card).filter(Card.exam_id == exam_id).all()
         return cards
 
+    @staticmethod
+    def get_cards_page(
+        exam_id: UUID, limit: int, cursor: str | None, db: Session
+    ) -> tuple[list[Card], str | None]:
+        """Страница карточек по (number, card_id); курсор — ключ последней карточки."""
+        query = db.query(Card).filter(Card.exam_id == exam_id)
+        if cursor is not None:
+            number, card_id = ExamRepo.decode_cursor(cursor)
+            query = query.filter(tuple_(Card.number, Card.card_id) > (number, card_id))
+
+        cards = query.order_by(Card.number, Card.card_id).limit(limit + 1).all()
+        if len(cards) <= limit:
+            return cards, None
+        cards = cards[:limit]
+        last = cards[-1]
+        return cards, f"{last.number}:{last.card_id}"
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[int, int]:
+        try:
+            number, card_id = cursor.split(":")
+            return int(number), int(card_id)
+        except ValueError:
+            raise InvalidCursor(f"Invalid cursor: {cursor}")
+
     @staticmethod
     def get_card(card_id: int, db: Session) -> Card:
         card = db.query(Card).filter(Card.card_id == card_id).first()
@@ -97,19 +124,40 @@ class ExamRepo:
 
     @staticmethod
     def create_card_by_list(
-        exam_id: UUID, cards_data: list[tuple[str, str]], db: Session
+        exam_id: UUID,
+        cards_data: list[tuple[str, str]],
+        db: Session,
+        commit: bool = True,
     ) -> list[Card]:
-        cards = []
-        for card_data in cards_data:
-            question, answer = card_data
-            number = ExamRepo.count_next_number(exam_id, db)
-            new_card = Card(
-                number=number, exam_id=exam_id, question=question, answer=answer
+        """Вставляет все карточки одним INSERT ... RETURNING в одной транзакции.
+
+        С `commit=False` транзакция (и блокировка экзамена) остаётся открытой,
+        чтобы несколько пачек зафиксировать или откатить вместе.
+        """
+        if not cards_data:
+            return []
+
+        first_number = ExamRepo.count_next_number(exam_id, db)
+        cards = list(
+            db.scalars(
+                insert(Card).returning(Card, sort_by_parameter_order=True),
+                [
+                    {
+                        "number": first_number + i,
+                        "exam_id": exam_id,
+                        "question": question,
+                        "answer": answer,
+                    }
+                    for i, (question, answer) in enumerate(cards_data)
+                ],
             )
-            cards.append(new_card)
-            db.add(new_card)
+        )
+        # Отвязываем карточки от сессии, чтобы commit не сбросил уже
+        # загруженные из RETURNING поля и не вызвал по SELECT на каждую
+        for card in cards:
+            db.expunge(card)
+        if commit:
             db.commit()
-            db.refresh(new_card)
         return cards
 
     @staticmethod
@@ -131,6 +179,23 @@ class ExamRepo:
         db.refresh(card)
         return card
 
+    @staticmethod
+    def update_card_answers(exam_id: UUID, answers: dict[int, str], db: Session) -> int:
+        """Записывает ответы одним UPDATE ... FROM (VALUES ...), возвращает число строк."""
+        if not answers:
+            return 0
+        new_answers = values(
+            column("card_id", BigInteger), column("answer", String), name="new_answers"
+        ).data(list(answers.items()))
+        result = db.execute(
+            update(Card)
+            .where(Card.exam_id == exam_id, Card.card_id == new_answers.c.card_id)
+            .values(answer=new_answers.c.answer)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        return result.rowcount
+
     @staticmethod
     def delete_card(exam_id: UUID, card_id: int, db: Session = Depends(get_db)) -> None:
         card = (
@@ -143,7 +208,13 @@ class ExamRepo:
 
     @staticmethod
     def count_next_number(exam_id: UUID, db: Session) -> int:
-        return len(db.query(Card).filter(Card.exam_id == exam_id).all()) + 1
+        # Блокируем экзамен до конца транзакции, чтобы параллельные вставки
+        # не получили одинаковый номер; MAX читается по idx_cards_exam_id_number
+        db.query(Exam.id).filter(Exam.id == exam_id).with_for_update().first()
+        last_number = (
+            db.query(func.max(Card.number)).filter(Card.exam_id == exam_id).scalar()
+        )
+        return (last_number or 0) + 1
 
     @staticmethod
     def user_can_edit_exam(user_id: UUID, exam_id: UUID, db: Session) -> bool:
@@ -0,0 +1,4 @@
+class GenerationJobNotFound(Exception):
+    def __init__(self, message: str = "Generation job not found"):
+        self.message = message
+        super().__init__(self.message)
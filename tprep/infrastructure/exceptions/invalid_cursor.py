@@ -0,0 +1,4 @@
+class InvalidCursor(Exception):
+    def __init__(self, message: str = "Invalid pagination cursor"):
+        self.message = message
+        super().__init__(self.message)
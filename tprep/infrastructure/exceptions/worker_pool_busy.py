@@ -0,0 +1,4 @@
+class WorkerPoolBusy(Exception):
+    def __init__(self, message: str = "Server is busy, try again later"):
+        self.message = message
+        super().__init__(self.message)
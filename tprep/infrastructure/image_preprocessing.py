@@ -0,0 +1,130 @@
+import asyncio
+import base64
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+from config import settings
+
+IMAGE_MODES = ("rgb", "grayscale", "binarize")
+
+
+@dataclass(frozen=True)
+class PreprocessOptions:
+    max_size: int = 1024
+    # rgb — как есть, grayscale — оттенки серого, binarize — чёрно-белое по порогу
+    mode: str = "rgb"
+    binarize_threshold: int = 160
+    quality: int = 85
+    min_quality: int = 50
+    # Если задан, качество снижается шагами, пока JPEG не станет не больше target_bytes
+    target_bytes: int | None = None
+
+    @classmethod
+    def from_settings(cls) -> "PreprocessOptions":
+        if settings.OCR_IMAGE_MODE not in IMAGE_MODES:
+            raise ValueError(f"Unknown OCR image mode: {settings.OCR_IMAGE_MODE}")
+        return cls(
+            max_size=settings.OCR_IMAGE_MAX_SIZE,
+            mode=settings.OCR_IMAGE_MODE,
+            binarize_threshold=settings.OCR_IMAGE_BINARIZE_THRESHOLD,
+            quality=settings.OCR_IMAGE_QUALITY,
+            min_quality=settings.OCR_IMAGE_MIN_QUALITY,
+            target_bytes=settings.OCR_IMAGE_TARGET_BYTES,
+        )
+
+
+QUALITY_STEP = 10
+
+
+def preprocess_image(image_path: str | Path, options: PreprocessOptions) -> bytes:
+    """Готовит изображение для OCR и возвращает байты JPEG.
+
+    JPEG, который уже помещается в max_size и target_bytes и не требует
+    смены цвета, отдаётся без перекодирования.
+    """
+    raw = Path(image_path).read_bytes()
+    img: Image.Image = Image.open(BytesIO(raw))
+    is_jpeg = img.format == "JPEG"
+    target_mode = "RGB" if options.mode == "rgb" else "L"
+
+    fits = max(img.size) <= options.max_size
+    if (
+        is_jpeg
+        and fits
+        and img.mode == target_mode
+        and (options.target_bytes is None or len(raw) <= options.target_bytes)
+    ):
+        return raw
+
+    if is_jpeg and not fits:
+        # Декодер JPEG сразу уменьшает в 2/4/8 раз — дешевле полного декодирования
+        img.draft(target_mode, (options.max_size, options.max_size))
+
+    img = img.convert(target_mode)
+    if options.mode == "binarize":
+        threshold = options.binarize_threshold
+        img = img.point(lambda value: 255 if value > threshold else 0)
+    if max(img.size) > options.max_size:
+        img.thumbnail((options.max_size, options.max_size), Image.Resampling.LANCZOS)
+
+    quality = options.quality
+    while True:
+        buffer = BytesIO()
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+        data = buffer.getvalue()
+        if (
+            options.target_bytes is None
+            or len(data) <= options.target_bytes
+            or quality - QUALITY_STEP < options.min_quality
+        ):
+            return data
+        quality -= QUALITY_STEP
+
+
+def preprocess_to_base64(image_path: str | Path, options: PreprocessOptions) -> str:
+    return base64.b64encode(preprocess_image(image_path, options)).decode("ascii")
+
+
+_pool: ProcessPoolExecutor | None = None
+
+
+def get_preprocess_pool() -> ProcessPoolExecutor | None:
+    """Пул процессов для сжатия картинок; None — считать в потоке."""
+    global _pool
+    if settings.OCR_PREPROCESS_WORKERS <= 0:
+        return None
+    if _pool is None:
+        # fork из многопоточного воркера uvicorn может повиснуть на чужих блокировках
+        context = multiprocessing.get_context("forkserver")
+        # Модуль импортируется один раз в forkserver, а не в каждом воркере
+        context.set_forkserver_preload([__name__])
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.OCR_PREPROCESS_WORKERS, mp_context=context
+        )
+    return _pool
+
+
+def shutdown_preprocess_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+
+
+async def encode_image(
+    image_path: str | Path, options: PreprocessOptions | None = None
+) -> str:
+    """Предобработка и base64 вне event loop: в пуле процессов или потоке."""
+    options = options or PreprocessOptions.from_settings()
+    pool = get_preprocess_pool()
+    if pool is None:
+        return await asyncio.to_thread(preprocess_to_base64, str(image_path), options)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        pool, preprocess_to_base64, str(image_path), options
+    )
@@ -3,7 +3,8 @@ from typing import List
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session, joinedload
 
 from tprep.infrastructure.database import get_db
 from tprep.infrastructure import NotificationDB
@@ -57,3 +58,45 @@ class NotificationRepo:
         user_id: UUID, db: Session = Depends(get_db)
     ) -> List[NotificationDB]:
         return db.query(NotificationDB).filter(NotificationDB.user_id == user_id).all()
+
+    @staticmethod
+    def claim_due_notifications(batch_size: int, db: Session) -> List[NotificationDB]:
+        """Блокирует до `batch_size` наступивших уведомлений вместе с user и exam.
+
+        Строки, уже захваченные другим воркером, пропускаются (SKIP LOCKED),
+        поэтому реплики нотификатора разбирают непересекающиеся пачки.
+        Блокировка держится до commit/rollback сессии.
+        """
+        now = datetime.now(timezone.utc)
+        stmt = (
+            select(NotificationDB)
+            .options(joinedload(NotificationDB.user), joinedload(NotificationDB.exam))
+            .where(NotificationDB.time <= now)
+            .order_by(NotificationDB.time)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True, of=NotificationDB)
+        )
+        return list(db.scalars(stmt).unique())
+
+    @staticmethod
+    def delete_notifications_by_ids(notification_ids: List[int], db: Session) -> None:
+        """Удаляет без commit: вызывающий фиксирует пачку вместе с блокировкой."""
+        if not notification_ids:
+            return
+        db.execute(
+            delete(NotificationDB).where(NotificationDB.id.in_(notification_ids))
+        )
+
+    @staticmethod
+    def postpone_notifications(
+        notifications: List[NotificationDB], base_delay: timedelta, db: Session
+    ) -> None:
+        """Сдвигает недоставленные вперёд, удваивая задержку с каждой попыткой.
+
+        Без commit, как и delete_notifications_by_ids.
+        """
+        now = datetime.now(timezone.utc)
+        for notification in notifications:
+            notification.attempts += 1
+            notification.time = now + base_delay * 2 ** (notification.attempts - 1)
+        db.flush()
@@ -2,7 +2,7 @@ from typing import TYPE_CHECKING
 from uuid import UUID
 
 from datetime import datetime
-from sqlalchemy import BigInteger, ForeignKey, DateTime, Index
+from sqlalchemy import BigInteger, ForeignKey, DateTime, Index, Integer
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -23,6 +23,9 @@ class NotificationDB(Base):
         PG_UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE")
     )
     time: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    attempts: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
 
     user: Mapped["User"] = relationship("User", back_populates="related_notification")
     exam: Mapped["Exam"] = relationship("Exam", back_populates="related_notification")
@@ -1,21 +1,18 @@
+import asyncio
 import json
 import os
-import base64
 import re
-import requests
 from pathlib import Path
-from typing import Any, Optional
-from PIL import Image
-from io import BytesIO
+from typing import AsyncIterator, Optional
 
 from dotenv import load_dotenv
 
-load_dotenv()
+from config import settings
+from tprep.infrastructure.ai_cache.ocr_cache import OcrCache, ocr_cache_key
+from tprep.infrastructure.image_preprocessing import PreprocessOptions, encode_image
+from tprep.infrastructure.ocr_providers import OcrCall, OcrProvider, get_ocr_provider
 
-_HEADERS = {
-    "HTTP-Referer": "https://tprep.local",
-    "X-Title": "Backend OCR Service",
-}
+load_dotenv()
 
 _CARD_FIELD_MAX_LEN = 500
 
@@ -41,19 +38,6 @@ class OcrParseError(ValueError):
     """Ответ модели не удалось разобрать в список карточек."""
 
 
-def _image_to_base64(image_path: str | Path, max_size: int = 1024) -> str:
-    """Сжимает изображение (если нужно) и кодирует в base64"""
-    img = Image.open(str(image_path)).convert("RGB")
-    if max(img.size) > max_size:
-        ratio = max_size / max(img.size)
-        new_size = (int(img.width * ratio), int(img.height * ratio))
-        img = img.resize(new_size, Image.Resampling.LANCZOS)
-
-    buffer = BytesIO()
-    img.save(buffer, format="JPEG", quality=85)
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-
 def _images_base_dir() -> Path:
     return (Path(__file__).resolve().parents[2] / "images").resolve()
 
@@ -74,7 +58,7 @@ def _resolve_image_path(image_name: str) -> Path:
     return resolved
 
 
-def extract_text_from_image(
+async def extract_text_from_image(
     image_name: str,
     *,
     api_key: Optional[str] = os.getenv("OPENROUTER_API_KEY")
@@ -82,7 +66,7 @@ def extract_text_from_image(
     """Распознаёт текст с изображения через OpenRouter; `image_name` — имя или путь относительно images/."""
     path = _resolve_image_path(image_name)
     resolved_model = os.getenv("OCR_DEFAULT_MODEL")
-    text = recognize_handwriting(path, api_key=api_key, model=resolved_model)
+    text = await recognize_handwriting(path, api_key=api_key, model=resolved_model)
     return text.splitlines()
 
 
@@ -134,43 +118,235 @@ def parse_cards_json_response(raw: str) -> list[tuple[str, str]]:
     return pairs
 
 
-def cards_from_image(
+def _card_from_fragment(fragment: str) -> Optional[tuple[str, str]]:
+    try:
+        item = json.loads(fragment)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(item, dict):
+        return None
+    q = item.get("question")
+    a = item.get("answer")
+    if q is None or a is None:
+        return None
+    question = _clip_field(str(q))
+    answer = _clip_field(str(a))
+    if not question or not answer:
+        return None
+    return question, answer
+
+
+class CardStreamParser:
+    """Инкрементально достаёт завершённые объекты {"question","answer"} из ответа модели.
+
+    Кавычки и экранирование учитываются, поэтому скобки внутри текста не мешают.
+    Битый объект пропускается, обрезанный по max_tokens хвост просто не даёт карточки.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.cards: list[tuple[str, str]] = []
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._starts: list[int] = []
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        """Добавляет кусок ответа, возвращает карточки, завершённые в нём."""
+        self.text += chunk
+        text = self.text
+        new: list[tuple[str, str]] = []
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._starts.append(i)
+            elif ch == "}" and self._starts:
+                card = _card_from_fragment(text[self._starts.pop() : i + 1])
+                if card is not None:
+                    new.append(card)
+        self._pos = len(text)
+        self.cards.extend(new)
+        return new
+
+    @property
+    def complete(self) -> bool:
+        """Ответ — целый валидный JSON, а не обрезанный по max_tokens или битый."""
+        try:
+            parse_cards_json_response(self.text)
+        except OcrParseError:
+            return False
+        return True
+
+
+def parse_cards_tolerant(raw: str) -> list[tuple[str, str]]:
+    """Как parse_cards_json_response, но при битом или обрезанном JSON
+    возвращает все целые карточки; ошибка — только если их нет совсем."""
+    try:
+        return parse_cards_json_response(raw)
+    except OcrParseError:
+        parser = CardStreamParser()
+        parser.feed(raw)
+        if not parser.cards:
+            raise
+        return parser.cards
+
+
+async def stream_cards(
+    image_path: str | Path,
+    *,
+    model: str,
+    api_key: Optional[str] = os.getenv("OPENROUTER_API_KEY"),
+    preprocess: Optional[PreprocessOptions] = None,
+    provider: Optional[OcrProvider] = None,
+    parser: Optional[CardStreamParser] = None,
+) -> AsyncIterator[tuple[str, str]]:
+    """Отдаёт пары (question, answer) по мере того, как модель их дописывает.
+
+    По переданному `parser` после конца потока видно, был ли ответ целым.
+    """
+    parser = parser or CardStreamParser()
+    async for chunk in stream_handwriting(
+        image_path,
+        api_key=api_key,
+        model=model,
+        prompt=CARD_STRUCTURE_PROMPT,
+        max_tokens=2048,
+        preprocess=preprocess,
+        provider=provider,
+    ):
+        for card in parser.feed(chunk):
+            yield card
+    if not parser.cards:
+        # Ни одной карточки: {"cards":[]} или мусор — решает строгий разбор
+        for card in parse_cards_json_response(parser.text):
+            yield card
+
+
+async def cards_from_image(
     image_name: str,
     *,
     api_key: Optional[str] = os.getenv("OPENROUTER_API_KEY"),
     model: Optional[str] = os.getenv("OCR_DEFAULT_MODEL"),
+    cache: Optional[OcrCache] = None,
 ) -> list[tuple[str, str]]:
-    """Распознаёт изображение и возвращает пары (question, answer) для ExamRepo.create_card_by_list."""
+    """Распознаёт изображение и возвращает пары (question, answer) для ExamRepo.create_card_by_list.
+
+    С `cache` повторный запрос того же изображения (по sha256 байтов) не идёт в модель.
+    """
     path = _resolve_image_path(image_name)
     resolved_model: str = model or os.getenv("OCR_DEFAULT_MODEL")
-    raw = recognize_handwriting(
-        path,
-        api_key=api_key,
-        model=resolved_model,
-        prompt=CARD_STRUCTURE_PROMPT,
-        max_tokens=2048,
+    provider = get_ocr_provider()
+    preprocess = PreprocessOptions.from_settings()
+    key = None
+    if cache is not None:
+        key = await asyncio.to_thread(
+            ocr_cache_key,
+            path,
+            resolved_model,
+            CARD_STRUCTURE_PROMPT,
+            provider.cache_namespace,
+            preprocess,
+        )
+        cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
+
+    complete = True
+    if settings.OCR_STREAM:
+        parser = CardStreamParser()
+        pairs = [
+            pair
+            async for pair in stream_cards(
+                path,
+                api_key=api_key,
+                model=resolved_model,
+                preprocess=preprocess,
+                provider=provider,
+                parser=parser,
+            )
+        ]
+        complete = parser.complete
+    else:
+        raw = await recognize_handwriting(
+            path,
+            api_key=api_key,
+            model=resolved_model,
+            prompt=CARD_STRUCTURE_PROMPT,
+            max_tokens=2048,
+            preprocess=preprocess,
+            provider=provider,
+        )
+        try:
+            pairs = parse_cards_json_response(raw)
+        except OcrParseError:
+            pairs = parse_cards_tolerant(raw)
+            complete = False
+    # Обрезанный ответ отдаём, но не кэшируем: повтор может дать всю колоду
+    if cache is not None and key is not None and pairs and complete:
+        await asyncio.to_thread(cache.put, key, resolved_model, pairs)
+    return pairs
+
+
+async def cards_from_images(
+    image_names: list[str],
+    *,
+    concurrency: int,
+    api_key: Optional[str] = os.getenv("OPENROUTER_API_KEY"),
+    model: Optional[str] = os.getenv("OCR_DEFAULT_MODEL"),
+    cache: Optional[OcrCache] = None,
+) -> list[list[tuple[str, str]] | Exception]:
+    """Распознаёт несколько изображений, не больше `concurrency` одновременно.
+
+    Результаты в порядке `image_names`; ошибка одной страницы возвращается
+    вместо её пар и не прерывает остальные.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def recognize(image_name: str) -> list[tuple[str, str]]:
+        async with semaphore:
+            return await cards_from_image(
+                image_name, api_key=api_key, model=model, cache=cache
+            )
+
+    results = await asyncio.gather(
+        *(recognize(name) for name in image_names), return_exceptions=True
     )
-    return parse_cards_json_response(raw)
+    pages: list[list[tuple[str, str]] | Exception] = []
+    for result in results:
+        # Отмену и прочие BaseException не прячем в результаты
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+        pages.append(result)
+    return pages
 
 
-def recognize_handwriting(
+async def _prepare_call(
     image_path: str | Path,
-    api_key: Optional[str] = os.getenv("OPENROUTER_API_KEY"),
-    model: str = os.getenv("OCR_DEFAULT_MODEL"),
-    prompt: Optional[str] = None,
-    timeout: int = 60,
-    max_tokens: int = 2048,
-) -> str:
-    """Отправляет изображение на OCR через OpenRouter API"""
+    api_key: Optional[str],
+    model: str,
+    prompt: Optional[str],
+    timeout: int,
+    max_tokens: int,
+    preprocess: Optional[PreprocessOptions],
+    provider: Optional[OcrProvider],
+) -> tuple[OcrProvider, OcrCall]:
+    provider = provider or get_ocr_provider()
     api_key = api_key or os.getenv("OPENROUTER_API_KEY")
-    if not api_key:
+    if provider.requires_api_key and not api_key:
         raise OcrConfigurationError(
             "Не указан API_KEY. Передайте параметром `api_key=` "
             "или установите переменную OPENROUTER_API_KEY в .env"
         )
 
-    print(api_key)
-
     prompt = prompt or (
         "Ты специалист по распознаванию рукописного текста на русском языке. "
         "Транскрибируй весь текст с изображения, сохраняя структуру, пунктуацию и регистр. "
@@ -178,33 +354,51 @@ def recognize_handwriting(
         "Выводи ТОЛЬКО распознанный текст, без пояснений."
     )
 
-    img_b64 = _image_to_base64(image_path)
-
-    response = requests.post(
-        "https://openrouter.ai/api/v1/chat/completions",
-        headers={**_HEADERS, "Authorization": f"Bearer {api_key}"},
-        json={
-            "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {"url": f"data:image/jpeg;base64,{img_b64}"},
-                        },
-                    ],
-                }
-            ],
-            "max_tokens": max_tokens,
-            "temperature": 0.1,
-        },
+    # Сжатие картинки — CPU-работа, она идёт в пуле процессов
+    img_b64 = await encode_image(image_path, preprocess)
+    return provider, OcrCall(
+        image_path=Path(image_path),
+        image_b64=img_b64,
+        model=model,
+        prompt=prompt,
+        max_tokens=max_tokens,
         timeout=timeout,
+        api_key=api_key,
     )
-    response.raise_for_status()
-    payload: Any = response.json()
-    content = payload["choices"][0]["message"]["content"]
-    if not isinstance(content, str):
-        raise RuntimeError("Неожиданный формат ответа OpenRouter (content не строка)")
+
+
+async def recognize_handwriting(
+    image_path: str | Path,
+    api_key: Optional[str] = os.getenv("OPENROUTER_API_KEY"),
+    model: str = os.getenv("OCR_DEFAULT_MODEL"),
+    prompt: Optional[str] = None,
+    timeout: int = 60,
+    max_tokens: int = 2048,
+    preprocess: Optional[PreprocessOptions] = None,
+    provider: Optional[OcrProvider] = None,
+) -> str:
+    """Отправляет изображение на OCR через провайдера из настроек (по умолчанию OpenRouter)"""
+    provider, call = await _prepare_call(
+        image_path, api_key, model, prompt, timeout, max_tokens, preprocess, provider
+    )
+    content = await provider.recognize(call)
     return content.strip()
+
+
+async def stream_handwriting(
+    image_path: str | Path,
+    *,
+    model: str,
+    api_key: Optional[str] = os.getenv("OPENROUTER_API_KEY"),
+    prompt: Optional[str] = None,
+    timeout: int = 60,
+    max_tokens: int = 2048,
+    preprocess: Optional[PreprocessOptions] = None,
+    provider: Optional[OcrProvider] = None,
+) -> AsyncIterator[str]:
+    """Как recognize_handwriting, но отдаёт текст кусками по мере генерации."""
+    provider, call = await _prepare_call(
+        image_path, api_key, model, prompt, timeout, max_tokens, preprocess, provider
+    )
+    async for chunk in provider.stream(call):
+        yield chunk
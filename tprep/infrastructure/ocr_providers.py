@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import importlib.util
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import httpx
+
+from config import settings
+from tprep.infrastructure.rate_limiter import openrouter_limiter
+
+_HEADERS = {
+    "HTTP-Referer": "https://tprep.local",
+    "X-Title": "Backend OCR Service",
+}
+
+
+@dataclass(frozen=True)
+class OcrCall:
+    image_path: Path
+    image_b64: str
+    model: str
+    prompt: str
+    max_tokens: int
+    timeout: float
+    api_key: str | None = None
+
+
+class OcrProvider(ABC):
+    """Бэкенд распознавания: получает подготовленное изображение, возвращает текст модели."""
+
+    name: str
+    requires_api_key: bool = False
+
+    @property
+    def cache_namespace(self) -> str:
+        """Часть ключа OCR-кэша: ответы разных бэкендов не смешиваются."""
+        return self.name
+
+    @abstractmethod
+    async def recognize(self, call: OcrCall) -> str: ...
+
+    async def stream(self, call: OcrCall) -> AsyncIterator[str]:
+        """Ответ модели кусками по мере генерации; по умолчанию — одним куском."""
+        yield await self.recognize(call)
+
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_ocr_client() -> httpx.AsyncClient:
+    """Общий keep-alive клиент с пулом соединений; HTTP/2, если установлен h2."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=settings.OCR_HTTP2 and importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=settings.OCR_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OCR_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OCR_KEEPALIVE_EXPIRY_SECONDS,
+            ),
+            headers=_HEADERS,
+        )
+    return _client
+
+
+async def close_ocr_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class OpenRouterOcrProvider(OcrProvider):
+    """OpenAI-совместимый chat/completions; `url` можно направить на локальную заглушку."""
+
+    name = "openrouter"
+    requires_api_key = True
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+
+    @property
+    def cache_namespace(self) -> str:
+        # URL может указывать на локальную заглушку
+        return f"{self.name}:{self.url}"
+
+    def _payload(self, call: OcrCall) -> dict[str, Any]:
+        return {
+            "model": call.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": call.prompt},
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": f"data:image/jpeg;base64,{call.image_b64}"
+                            },
+                        },
+                    ],
+                }
+            ],
+            "max_tokens": call.max_tokens,
+            "temperature": 0.1,
+        }
+
+    async def recognize(self, call: OcrCall) -> str:
+        client = get_ocr_client()
+
+        async def send() -> httpx.Response:
+            response = await client.post(
+                self.url,
+                headers={"Authorization": f"Bearer {call.api_key}"},
+                json=self._payload(call),
+                timeout=call.timeout,
+            )
+            response.raise_for_status()
+            return response
+
+        response = await openrouter_limiter.acall(call.model, send)
+        payload: Any = response.json()
+        content = payload["choices"][0]["message"]["content"]
+        if not isinstance(content, str):
+            raise RuntimeError(
+                "Неожиданный формат ответа OpenRouter (content не строка)"
+            )
+        return content
+
+    async def stream(self, call: OcrCall) -> AsyncIterator[str]:
+        """stream=true: читает SSE-чанки и отдаёт `delta.content`."""
+        client = get_ocr_client()
+
+        async def open_stream() -> AsyncIterator[str]:
+            async with client.stream(
+                "POST",
+                self.url,
+                headers={"Authorization": f"Bearer {call.api_key}"},
+                json={**self._payload(call), "stream": True},
+                timeout=call.timeout,
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    # Строки-комментарии (": OPENROUTER PROCESSING") пропускаем
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:") :].strip()
+                    if data == "[DONE]":
+                        return
+                    try:
+                        chunk = json.loads(data)
+                    except json.JSONDecodeError:
+                        # Битый чанк не должен стоить уже полученных карточек
+                        continue
+                    if "error" in chunk:
+                        # Ошибка посреди генерации: уже пришедший текст остаётся у вызывающего
+                        print(f"OpenRouter stream error: {chunk['error']}")
+                        return
+                    choices = chunk.get("choices") or []
+                    content = (
+                        choices[0].get("delta", {}).get("content") if choices else None
+                    )
+                    if content:
+                        yield content
+
+        async for content in openrouter_limiter.astream(call.model, open_stream):
+            yield content
+
+
+class LocalOcrProvider(OcrProvider):
+    """Детерминированный офлайн-бэкенд для тестов и нагрузочных прогонов.
+
+    Если в `fixtures_dir` есть `<имя изображения>.txt`, возвращает его содержимое.
+    Иначе генерирует `cards_per_page` карточек из sha256 изображения. Каждый
+    ответ приходит через `latency_seconds`; stream() отдаёт его по `chunk_size` символов.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        fixtures_dir: str | Path | None = None,
+        cards_per_page: int = 3,
+        chunk_size: int = 64,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.fixtures_dir = Path(fixtures_dir) if fixtures_dir else None
+        self.cards_per_page = cards_per_page
+        self.chunk_size = chunk_size
+
+    async def recognize(self, call: OcrCall) -> str:
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        if self.fixtures_dir is not None:
+            fixture = self.fixtures_dir / f"{call.image_path.stem}.txt"
+            if fixture.is_file():
+                return fixture.read_text(encoding="utf-8")
+        page = hashlib.sha256(call.image_b64.encode("ascii")).hexdigest()[:8]
+        cards = [
+            {"question": f"Page {page} question {i}", "answer": f"Answer {i}"}
+            for i in range(1, self.cards_per_page + 1)
+        ]
+        return json.dumps({"cards": cards}, ensure_ascii=False)
+
+    async def stream(self, call: OcrCall) -> AsyncIterator[str]:
+        content = await self.recognize(call)
+        for start in range(0, len(content), self.chunk_size):
+            yield content[start : start + self.chunk_size]
+
+
+def get_ocr_provider() -> OcrProvider:
+    if settings.OCR_PROVIDER == "openrouter":
+        return OpenRouterOcrProvider(settings.OCR_OPENROUTER_URL)
+    if settings.OCR_PROVIDER == "local":
+        return LocalOcrProvider(
+            latency_seconds=settings.OCR_LOCAL_LATENCY_SECONDS,
+            fixtures_dir=settings.OCR_LOCAL_FIXTURES_DIR,
+            cards_per_page=settings.OCR_LOCAL_CARDS_PER_PAGE,
+        )
+    raise ValueError(f"Unknown OCR provider: {settings.OCR_PROVIDER}")
@@ -1,3 +1,8 @@
+import codecs
+import csv
+import itertools
+from typing import AsyncIterator, BinaryIO, Iterator
+
 from fastapi import UploadFile
 from docx import Document
 import pandas as pd
@@ -5,14 +10,25 @@ import io
 from tprep.infrastructure.exceptions.file_decode import FileDecode
 from tprep.infrastructure.exceptions.file_extension import FileExtension
 from tprep.infrastructure.exceptions.file_parsing import FileParsing
+from tprep.infrastructure.worker_pool import upload_pool
+
+
+STREAMING_EXTENSIONS = {".txt", ".log", ".md", ".csv"}
+CSV_PARSE_BATCH_SIZE = 1000
 
 
 class FileParser:
     @staticmethod
     async def parse_file(file: UploadFile) -> list[tuple[str, str]]:
         content = await file.read()
-        file_extension = FileParser.get_extension(file.filename)
+        return FileParser.parse_content(
+            content, FileParser.get_extension(file.filename)
+        )
 
+    @staticmethod
+    def parse_content(
+        content: bytes, file_extension: str | None
+    ) -> list[tuple[str, str]]:
         if file_extension in (".txt", ".log", ".md"):
             return FileParser.parse_txt(content)
 
@@ -27,26 +43,33 @@ class FileParser:
 
     @staticmethod
     def parse_csv_xlsx(content: bytes, file_extension: str) -> list[tuple[str, str]]:
+        if file_extension == ".csv":
+            # Тот же разбор, что и при потоковой загрузке CSV
+            return list(FileParser.iter_csv_cards(io.BytesIO(content)))
+
         try:
             data_io = io.BytesIO(content)
 
-            if file_extension == ".csv":
-                df = pd.read_csv(data_io, header=None)
-            elif file_extension == ".xlsx":
-                df = pd.read_excel(data_io, header=None)
+            if file_extension == ".xlsx":
+                # keep_default_na=False: "NA" и "null" — текст карточки, как в CSV
+                df = pd.read_excel(
+                    data_io,
+                    header=None,
+                    usecols=lambda c: c in (0, 1),
+                    dtype=str,
+                    keep_default_na=False,
+                )
             else:
                 return []
 
-            cards_data: list[tuple[str, str]] = []
-            if df.shape[1] >= 2:
-                for index, row in df.iterrows():
-                    question = str(row[0]).strip() if pd.notna(row[0]) else ""
-                    answer = str(row[1]).strip() if pd.notna(row[1]) else ""
-
-                    if question and answer:
-                        cards_data.append((question, answer))
+            if df.shape[1] < 2:
+                return []
 
-            return cards_data
+            pairs = df.iloc[:, :2].dropna()
+            questions = pairs.iloc[:, 0].str.strip()
+            answers = pairs.iloc[:, 1].str.strip()
+            keep = (questions != "") & (answers != "")
+            return list(zip(questions[keep].tolist(), answers[keep].tolist()))
 
         except Exception:
             raise FileParsing(f"Error parsing {file_extension} file")
@@ -84,22 +107,157 @@ class FileParser:
             raise FileDecode("Cant decode this file (UTF-8 expected)")
 
         cards_data: list[tuple[str, str]] = []
-        lines = text.split("\n")
-        for line in lines:
-            line = line.strip()
-            if not line or "|" not in line:
-                continue
-            try:
-                question, answer = line.split("|", 1)
-                question = question.strip()
-                answer = answer.strip()
-                if question and answer:
-                    cards_data.append((question, answer))
-            except ValueError:
-                continue
+        for line in text.split("\n"):
+            card = FileParser.parse_line(line)
+            if card:
+                cards_data.append(card)
 
         return cards_data
 
+    @staticmethod
+    def parse_line(line: str) -> tuple[str, str] | None:
+        line = line.strip()
+        if not line or "|" not in line:
+            return None
+        question, answer = line.split("|", 1)
+        question = question.strip()
+        answer = answer.strip()
+        if question and answer:
+            return question, answer
+        return None
+
+    @staticmethod
+    def supports_streaming(filename: str | None) -> bool:
+        return FileParser.get_extension(filename) in STREAMING_EXTENSIONS
+
+    @staticmethod
+    async def iter_lines(file: UploadFile, chunk_size: int) -> AsyncIterator[str]:
+        """Читает файл кусками и отдаёт строки, не держа весь файл в памяти."""
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        tail = ""
+        while True:
+            chunk = await file.read(chunk_size)
+            try:
+                text = tail + decoder.decode(chunk, final=not chunk)
+            except UnicodeDecodeError:
+                raise FileDecode("Cant decode this file (UTF-8 expected)")
+
+            if chunk and text.endswith("\r"):
+                # \r\n может разорваться между кусками
+                text, tail = text[:-1], "\r"
+            else:
+                tail = ""
+            lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+
+            if not chunk:
+                for line in lines:
+                    yield line
+                return
+            tail = lines.pop() + tail
+            for line in lines:
+                yield line
+
+    @staticmethod
+    async def iter_cards(
+        file: UploadFile, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[tuple[str, str]]:
+        """Потоково разбирает .txt/.md/.log/.csv в пары (question, answer)."""
+        file_extension = FileParser.get_extension(file.filename)
+        if file_extension not in STREAMING_EXTENSIONS:
+            raise FileExtension(f"Streaming is not supported for: {file_extension}")
+
+        if file_extension != ".csv":
+            async for line in FileParser.iter_lines(file, chunk_size):
+                card = FileParser.parse_line(line)
+                if card:
+                    yield card
+            return
+
+        async for batch in FileParser.iter_csv_card_batches(file, CSV_PARSE_BATCH_SIZE):
+            for card in batch:
+                yield card
+
+    @staticmethod
+    async def iter_csv_card_batches(
+        file: UploadFile, batch_size: int
+    ) -> AsyncIterator[list[tuple[str, str]]]:
+        """Разбирает CSV пачками в upload_pool: чтение загрузки с диска
+        и csv.reader не блокируют event loop."""
+        cards = FileParser.iter_csv_cards(file.file)
+        while batch := await upload_pool.run(list, itertools.islice(cards, batch_size)):
+            yield batch
+
+    @staticmethod
+    def iter_csv_cards(stream: BinaryIO) -> Iterator[tuple[str, str]]:
+        """Разбирает CSV через csv.reader, читая загруженный файл построчно.
+
+        Кавычки трактуются как в pandas: особые только в начале поля, поэтому
+        `27" monitor` — обычный текст, а поле в кавычках может занимать
+        несколько строк. Незакрытая кавычка в конце файла — FileParsing.
+        """
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+        record_lines: list[str] = []
+
+        def lines() -> Iterator[str]:
+            for line in text:
+                record_lines.append(line)
+                yield line
+
+        record = ""
+        try:
+            # csv.reader не читает вперёд: в record_lines строки ровно одной записи
+            for row in csv.reader(lines()):
+                record = "".join(record_lines)
+                record_lines.clear()
+                card = FileParser.card_from_row(row)
+                if card:
+                    yield card
+        except UnicodeDecodeError:
+            raise FileDecode("Cant decode this file (UTF-8 expected)")
+        except csv.Error:
+            raise FileParsing("Error parsing .csv file")
+        finally:
+            # Не даём обёртке закрыть чужой файл
+            text.detach()
+        if FileParser.has_unterminated_quote(record):
+            raise FileParsing("Error parsing .csv file")
+
+    @staticmethod
+    def has_unterminated_quote(record: str) -> bool:
+        try:
+            list(csv.reader([record], strict=True))
+        except csv.Error as exc:
+            return "unexpected end of data" in str(exc)
+        return False
+
+    @staticmethod
+    def card_from_row(row: list[str]) -> tuple[str, str] | None:
+        if len(row) < 2:
+            return None
+        question = row[0].strip()
+        answer = row[1].strip()
+        if question and answer:
+            return question, answer
+        return None
+
+    @staticmethod
+    async def iter_card_batches(
+        file: UploadFile, batch_size: int, chunk_size: int = 64 * 1024
+    ) -> AsyncIterator[list[tuple[str, str]]]:
+        if FileParser.get_extension(file.filename) == ".csv":
+            async for parsed in FileParser.iter_csv_card_batches(file, batch_size):
+                yield parsed
+            return
+
+        batch: list[tuple[str, str]] = []
+        async for card in FileParser.iter_cards(file, chunk_size):
+            batch.append(card)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
     @staticmethod
     def check_extension(filename: str | None) -> bool:
         supported_extensions = {".txt", ".csv", ".log", ".md", ".xlsx", ".docx"}
@@ -0,0 +1,251 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+
+import httpx
+import openai
+
+from config import settings
+
+T = TypeVar("T")
+
+IN_FLIGHT_POLL_SECONDS = 0.01
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+TRANSPORT_ERRORS = (
+    httpx.TransportError,
+    openai.APIConnectionError,
+)
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    requests_per_second: float
+    burst: int = 1
+    max_in_flight: int = 8
+
+
+class TokenBucket:
+    """Потокобезопасный token bucket: `rate` токенов в секунду, не больше `burst`."""
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        """Никто не получит токен раньше, чем через `seconds` (Retry-After)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _take(self) -> float:
+        """Берёт токен и возвращает 0, либо сколько секунд ждать до следующего."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            elapsed = now - max(self._updated, self._paused_until)
+            self._tokens = min(self.burst, self._tokens + max(elapsed, 0) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self) -> None:
+        while (wait := self._take()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        while (wait := self._take()) > 0:
+            await asyncio.sleep(wait)
+
+
+class OutboundLimiter:
+    """Общий на процесс лимит исходящих запросов к провайдеру.
+
+    Для каждой модели — свой token bucket (запросов в секунду) и семафор
+    (одновременных запросов). `call` повторяет запрос при 429/5xx и сетевых
+    ошибках с экспоненциальной задержкой и джиттером, учитывая Retry-After.
+    """
+
+    def __init__(
+        self,
+        default: RateLimit,
+        per_model: dict[str, RateLimit] | None = None,
+        max_retries: int = 4,
+        backoff_base_seconds: float = 0.5,
+        backoff_max_seconds: float = 30.0,
+    ) -> None:
+        self.default = default
+        self.per_model = per_model or {}
+        self.max_retries = max_retries
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self._buckets: dict[str, TokenBucket] = {}
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, model: str) -> RateLimit:
+        return self.per_model.get(model, self.default)
+
+    def _model_state(
+        self, model: str
+    ) -> tuple[TokenBucket, threading.BoundedSemaphore]:
+        with self._lock:
+            if model not in self._buckets:
+                limit = self.limit_for(model)
+                self._buckets[model] = TokenBucket(
+                    limit.requests_per_second, limit.burst
+                )
+                self._slots[model] = threading.BoundedSemaphore(limit.max_in_flight)
+            return self._buckets[model], self._slots[model]
+
+    @contextmanager
+    def slot(self, model: str) -> Iterator[None]:
+        bucket, in_flight = self._model_state(model)
+        with in_flight:
+            bucket.acquire()
+            yield
+
+    @asynccontextmanager
+    async def aslot(self, model: str) -> AsyncIterator[None]:
+        bucket, in_flight = self._model_state(model)
+        # Семафор общий с синхронными вызовами, поэтому ждём без блокировки loop
+        while not in_flight.acquire(blocking=False):
+            await asyncio.sleep(IN_FLIGHT_POLL_SECONDS)
+        try:
+            await bucket.acquire_async()
+            yield
+        finally:
+            in_flight.release()
+
+    def call(self, model: str, func: Callable[[], T]) -> T:
+        attempt = 0
+        while True:
+            with self.slot(model):
+                try:
+                    return func()
+                except Exception as exc:
+                    delay = self._retry_delay(model, exc, attempt)
+                    if delay is None:
+                        raise
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(self, model: str, func: Callable[[], Awaitable[T]]) -> T:
+        attempt = 0
+        while True:
+            async with self.aslot(model):
+                try:
+                    return await func()
+                except Exception as exc:
+                    delay = self._retry_delay(model, exc, attempt)
+                    if delay is None:
+                        raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def astream(
+        self, model: str, open_stream: Callable[[], AsyncIterator[T]]
+    ) -> AsyncIterator[T]:
+        """Как acall, но для потокового ответа: слот занят до конца потока,
+        повтор — только пока не получено ни одного элемента."""
+        attempt = 0
+        while True:
+            started = False
+            async with self.aslot(model):
+                try:
+                    async for item in open_stream():
+                        started = True
+                        yield item
+                    return
+                except Exception as exc:
+                    delay = None if started else self._retry_delay(model, exc, attempt)
+                    if delay is None:
+                        raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _retry_delay(self, model: str, exc: Exception, attempt: int) -> float | None:
+        """Пауза перед повтором или None, если повторять нельзя."""
+        if attempt >= self.max_retries or not is_retryable(exc):
+            return None
+        retry_after = retry_after_seconds(exc)
+        if retry_after is None:
+            return self.backoff_delay(attempt)
+        # Retry-After: 86400 не должен останавливать модель для всех на сутки
+        retry_after = min(retry_after, self.backoff_max_seconds)
+        self._model_state(model)[0].pause(retry_after)
+        return retry_after
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full jitter: случайная задержка от 0 до base * 2^attempt."""
+        ceiling = min(self.backoff_max_seconds, self.backoff_base_seconds * 2**attempt)
+        return random.uniform(0, ceiling)
+
+    @classmethod
+    def from_settings(cls) -> "OutboundLimiter":
+        default = RateLimit(
+            requests_per_second=settings.OPENROUTER_REQUESTS_PER_SECOND,
+            burst=settings.OPENROUTER_BURST,
+            max_in_flight=settings.OPENROUTER_MAX_IN_FLIGHT,
+        )
+        per_model = {
+            model: RateLimit(
+                requests_per_second=limits.get(
+                    "requests_per_second", default.requests_per_second
+                ),
+                burst=int(limits.get("burst", default.burst)),
+                max_in_flight=int(limits.get("max_in_flight", default.max_in_flight)),
+            )
+            for model, limits in settings.OPENROUTER_MODEL_LIMITS.items()
+        }
+        return cls(
+            default,
+            per_model,
+            max_retries=settings.OPENROUTER_MAX_RETRIES,
+            backoff_base_seconds=settings.OPENROUTER_BACKOFF_BASE_SECONDS,
+            backoff_max_seconds=settings.OPENROUTER_BACKOFF_MAX_SECONDS,
+        )
+
+
+def _response_of(exc: Exception) -> Any:
+    return getattr(exc, "response", None)
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, TRANSPORT_ERRORS):
+        return True
+    status = getattr(_response_of(exc), "status_code", None)
+    return status in RETRYABLE_STATUSES
+
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    """Retry-After из ответа: число секунд или HTTP-дата."""
+    headers = getattr(_response_of(exc), "headers", None)
+    value: str | None = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+openrouter_limiter = OutboundLimiter.from_settings()
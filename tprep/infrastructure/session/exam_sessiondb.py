@@ -0,0 +1,27 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID as PG_UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from tprep.infrastructure.models import Base
+
+
+class ExamSessionDB(Base):
+    __tablename__ = "exam_sessions"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    user_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE")
+    )
+    exam_id: Mapped[UUID] = mapped_column(
+        PG_UUID(as_uuid=True), ForeignKey("exams.id", ondelete="CASCADE")
+    )
+    questions: Mapped[list[int]] = mapped_column(ARRAY(BigInteger), nullable=False)
+    answers: Mapped[dict[str, bool]] = mapped_column(
+        JSONB, nullable=False, default=dict
+    )
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (Index("idx_exam_sessions_created_at", "created_at"),)
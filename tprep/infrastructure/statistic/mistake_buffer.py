@@ -0,0 +1,85 @@
+import time
+from threading import Lock
+from uuid import UUID
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from config import settings
+from tprep.infrastructure.database import SessionLocal
+from tprep.infrastructure.statistic.stat_repo import MistakeKey, StatRepo
+
+
+class MistakeBuffer:
+    """Копит ошибки по (user_id, card_id, exam_id) и пишет их одним upsert'ом.
+
+    Сброс происходит, когда накопилось `max_pending` ключей, прошло
+    `flush_interval_seconds` с прошлого сброса, либо по явному вызову `flush`.
+    """
+
+    def __init__(
+        self,
+        max_pending: int,
+        flush_interval_seconds: float,
+        session_factory: sessionmaker[Session] = SessionLocal,
+    ) -> None:
+        self.max_pending = max_pending
+        self.flush_interval_seconds = flush_interval_seconds
+        self._session_factory = session_factory
+        self._pending: dict[MistakeKey, int] = {}
+        self._lock = Lock()
+        self._last_flush = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(
+        self, user_id: UUID, card_id: int, exam_id: UUID, db: Session | None = None
+    ) -> None:
+        key = (user_id, card_id, exam_id)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            due = (
+                len(self._pending) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval_seconds
+            )
+        if due:
+            self.try_flush(db)
+
+    def flush(self, db: Session | None = None) -> int:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        try:
+            if db is not None:
+                StatRepo.add_mistakes(pending, db)
+            else:
+                with self._session_factory() as own_db:
+                    StatRepo.add_mistakes(pending, own_db)
+        except Exception:
+            if db is not None:
+                # Сессия запроса должна остаться рабочей после упавшего upsert
+                db.rollback()
+            # Не теряем инкременты: вернём их в буфер до следующего сброса
+            with self._lock:
+                for key, count in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + count
+            raise
+        return len(pending)
+
+    def try_flush(self, db: Session | None = None) -> int:
+        """flush для пути запроса: ошибка сброса общего буфера не должна
+        ронять чужой ответ, инкременты дозапишет фоновый flush_mistakes."""
+        try:
+            return self.flush(db)
+        except Exception as e:
+            print(f"Failed to flush mistake statistics: {e}")
+            return 0
+
+
+mistake_buffer = MistakeBuffer(
+    max_pending=settings.STATS_FLUSH_MAX_PENDING,
+    flush_interval_seconds=settings.STATS_FLUSH_INTERVAL_SECONDS,
+)
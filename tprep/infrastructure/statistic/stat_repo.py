@@ -1,35 +1,52 @@
 from uuid import UUID
 
-from fastapi import Depends
+from sqlalchemy import BigInteger, column, select, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert
 from sqlalchemy.orm import Session
 
-from tprep.infrastructure.database import get_db
-from tprep.infrastructure import Card, Statistic
+from tprep.infrastructure import Card, Statistic, User
+
+MistakeKey = tuple[UUID, int, UUID]
 
 
 class StatRepo:
     @staticmethod
-    def inc_mistakes(
-        user_id: UUID, card_id: int, db: Session = Depends(get_db)
-    ) -> None:
-        stat = (
-            db.query(Statistic)
-            .filter(Statistic.user_id == user_id, Statistic.card_id == card_id)
-            .first()
-        )
+    def add_mistakes(increments: dict[MistakeKey, int], db: Session) -> None:
+        """Прибавляет ошибки для набора (user_id, card_id, exam_id) одним запросом.
 
-        if stat:
-            stat.mistakes_count += 1
-        else:
-            # Получаем exam_id из карточки
-            card = db.query(Card).filter(Card.card_id == card_id).first()
-            if card:
-                stat = Statistic(
-                    user_id=user_id,
-                    card_id=card_id,
-                    exam_id=card.exam_id,
-                    mistakes_count=1,
-                )
-                db.add(stat)
+        Строки для уже удалённых карточек или пользователей пропускаются.
+        """
+        if not increments:
+            return
 
+        rows = values(
+            column("user_id", PG_UUID(as_uuid=True)),
+            column("card_id", BigInteger),
+            column("exam_id", PG_UUID(as_uuid=True)),
+            column("mistakes_count", BigInteger),
+            name="increments",
+        ).data(
+            [
+                (user_id, card_id, exam_id, count)
+                for (user_id, card_id, exam_id), count in increments.items()
+            ]
+        )
+        source = (
+            select(
+                rows.c.user_id, rows.c.card_id, rows.c.exam_id, rows.c.mistakes_count
+            )
+            .join(Card, Card.card_id == rows.c.card_id)
+            .join(User, User.id == rows.c.user_id)
+        )
+        stmt = insert(Statistic).from_select(
+            ["user_id", "card_id", "exam_id", "mistakes_count"], source
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_statistics_user_card_exam",
+            set_={
+                "mistakes_count": Statistic.mistakes_count
+                + stmt.excluded.mistakes_count
+            },
+        )
+        db.execute(stmt)
         db.commit()
@@ -0,0 +1,98 @@
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, ParamSpec, TypeVar
+
+from config import settings
+from tprep.infrastructure.exceptions.worker_pool_busy import WorkerPoolBusy
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+
+@dataclass
+class WorkerPoolStats:
+    name: str
+    max_workers: int
+    max_queue: int | None
+    queued: int
+    running: int
+    completed: int
+    rejected: int
+
+
+class WorkerPool:
+    """Ограниченный пул потоков для блокирующей работы из async-роутов.
+
+    Не больше `max_workers` задач выполняются одновременно; если в очереди
+    уже `max_queue` задач, новая отклоняется с WorkerPoolBusy.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int | None = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def submit(
+        self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+    ) -> Future[T]:
+        """Ставит задачу в пул, не дожидаясь результата."""
+        with self._lock:
+            if self.max_queue is not None and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise WorkerPoolBusy(f"Worker pool '{self.name}' queue is full")
+            self._queued += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix=self.name
+                )
+            executor = self._executor
+
+        def task() -> T:
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+
+        return executor.submit(task)
+
+    def stats(self) -> WorkerPoolStats:
+        with self._lock:
+            return WorkerPoolStats(
+                name=self.name,
+                max_workers=self.max_workers,
+                max_queue=self.max_queue,
+                queued=self._queued,
+                running=self._running,
+                completed=self._completed,
+                rejected=self._rejected,
+            )
+
+    def shutdown(self) -> None:
+        # Потоки создаются заново при следующем run(), пул можно переиспользовать
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+upload_pool = WorkerPool(
+    "upload",
+    max_workers=settings.UPLOAD_WORKERS,
+    max_queue=settings.UPLOAD_MAX_QUEUE,
+)
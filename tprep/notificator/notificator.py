@@ -1,28 +1,17 @@
 import time
-from datetime import datetime, timezone
-from typing import Any, Generator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, sessionmaker
 from pywebpush import webpush, WebPushException
 
 from tprep.app.requests_models import Notification
-from tprep.infrastructure import NotificationDB, User
-from tprep.infrastructure.database import get_db
+from tprep.infrastructure import User
+from tprep.infrastructure.database import SessionLocal
 from tprep.infrastructure.notification.notification_repo import NotificationRepo
 from config import settings
 
-BATCH_SIZE = 1000
-INTERVAL_SECONDS = 30
-
-
-def fetch_due_notifications(
-    db: Session, batch_size: int = BATCH_SIZE
-) -> Generator[Notification, Any, None]:
-    now = datetime.now(timezone.utc)
-    query = db.query(NotificationDB).filter(NotificationDB.time <= now)
-
-    for notif in query.yield_per(batch_size):
-        yield Notification.from_db_model(notif)
+RETRYABLE_PUSH_STATUSES = frozenset({429, 500, 502, 503, 504})
 
 
 def send_push(user: User, notification: Notification) -> None:
@@ -45,28 +34,83 @@ def send_push(user: User, notification: Notification) -> None:
             f"[{datetime.now()}] Sent notification {notification.id} to user {user.id}"
         )
     except WebPushException as e:
+        status = getattr(e.response, "status_code", None)
+        if status is None or status in RETRYABLE_PUSH_STATUSES:
+            # Временный сбой сервиса: уведомление отложат и отправят ещё раз
+            raise
+        # 404/410 — подписки больше нет, прочие 4xx повтор не исправит
         print(
             f"[{datetime.now()}] Failed to send notification {notification.id} to user {user.id}: {e}"
         )
 
 
-def process_notifications() -> None:
-    # TODO поправить костыль с бдшкой и использовать собственный метод для получения юзера
-    db_gen = get_db()
-    session = next(db_gen)
+def _deliver(job: tuple[User, Notification]) -> bool:
+    """False — уведомление отложат и попробуют снова позже."""
+    user, notification = job
     try:
-        for notification in fetch_due_notifications(session):
-            user = session.query(User).filter(User.id == notification.user_id).first()
-            if not user:
-                continue
-
-            send_push(user, notification)
-
-            NotificationRepo.delete_notification(
-                notification.user_id, notification.exam_id, session
-            )
-    finally:
-        next(db_gen, None)
+        send_push(user, notification)
+        return True
+    except Exception as e:
+        print(f"[{datetime.now()}] Will retry notification {notification.id}: {e}")
+        return False
+
+
+def process_batch(
+    db: Session, executor: ThreadPoolExecutor, batch_size: int
+) -> tuple[int, int]:
+    """Захватывает пачку наступивших уведомлений, рассылает её параллельно
+    и удаляет доставленные одним коммитом. Недоставленные откладываются
+    с растущей задержкой, после NOTIFICATOR_MAX_ATTEMPTS неудач — удаляются.
+    Возвращает (захвачено, доставлено)."""
+    claimed = NotificationRepo.claim_due_notifications(batch_size, db)
+    if not claimed:
+        db.commit()
+        return 0, 0
+
+    jobs = [(row.user, Notification.from_db_model(row)) for row in claimed]
+    delivered = list(executor.map(_deliver, jobs))
+    done_ids = [row.id for row, ok in zip(claimed, delivered) if ok]
+    failed = [row for row, ok in zip(claimed, delivered) if not ok]
+    max_attempts = settings.NOTIFICATOR_MAX_ATTEMPTS
+    retry = [row for row in failed if row.attempts + 1 < max_attempts]
+    dropped_ids = [row.id for row in failed if row.attempts + 1 >= max_attempts]
+    for notification_id in dropped_ids:
+        print(
+            f"[{datetime.now()}] Dropping notification {notification_id} "
+            f"after {max_attempts} failed attempts"
+        )
+    NotificationRepo.delete_notifications_by_ids(done_ids + dropped_ids, db)
+    # Недоставленные уходят из головы очереди и не блокируют более новые
+    NotificationRepo.postpone_notifications(
+        retry, timedelta(seconds=settings.NOTIFICATOR_RETRY_DELAY_SECONDS), db
+    )
+    db.commit()
+    return len(claimed), len(done_ids)
+
+
+def process_notifications(
+    session_factory: sessionmaker[Session] = SessionLocal,
+    batch_size: int | None = None,
+    send_workers: int | None = None,
+) -> int:
+    """Разбирает наступившие уведомления пачками, пока они есть.
+
+    Пачки захватываются через SKIP LOCKED, поэтому несколько реплик
+    нотификатора работают одновременно и не шлют одно уведомление дважды.
+    """
+    batch_size = batch_size or settings.NOTIFICATOR_BATCH_SIZE
+    send_workers = send_workers or settings.NOTIFICATOR_SEND_WORKERS
+    total = 0
+    with ThreadPoolExecutor(
+        max_workers=send_workers, thread_name_prefix="notificator"
+    ) as executor:
+        while True:
+            with session_factory() as db:
+                claimed, delivered = process_batch(db, executor, batch_size)
+            total += delivered
+            # Неполная пачка — очередь разобрана; недоставленные уже отложены на будущее
+            if claimed < batch_size:
+                return total
 
 
 def main_loop() -> None:
@@ -75,7 +119,7 @@ def main_loop() -> None:
             process_notifications()
         except Exception as e:
             print(f"[{datetime.now()}] Error in Notificator: {e}")
-        time.sleep(INTERVAL_SECONDS)
+        time.sleep(settings.NOTIFICATOR_INTERVAL_SECONDS)
 
 
 if __name__ == "__main__":